@@ -3,8 +3,11 @@ from typing import Optional
 from jose import JWTError, jwt
 from passlib.context import CryptContext
 from fastapi import HTTPException, status, Depends
+from fastapi.concurrency import run_in_threadpool
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from sqlalchemy.orm import Session
+import hmac
+import os
 import re
 import html
 
@@ -16,6 +19,10 @@ SECRET_KEY = "your-secret-key-change-in-production"  # Change in production!
 ALGORITHM = "HS256"
 ACCESS_TOKEN_EXPIRE_MINUTES = 30
 
+# Static bearer token Prometheus sends when scraping /metrics. Without it
+# only admins, with their own access token, can read the metrics.
+METRICS_TOKEN = os.getenv("METRICS_TOKEN", "")
+
 # Password hashing
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 
@@ -66,6 +73,11 @@ def get_current_user(
     if payload is None:
         raise credentials_exception
     
+    # Scoped tokens (such as profiling tokens) are only accepted where
+    # their scope is checked, never as a login session
+    if payload.get("scope") is not None:
+        raise credentials_exception
+    
     user_id: int = payload.get("sub")
     if user_id is None:
         raise credentials_exception
@@ -91,6 +103,17 @@ def get_current_admin_user(current_user: User = Depends(get_current_user)) -> Us
         )
     return current_user
 
+async def require_metrics_access(
+    credentials: HTTPAuthorizationCredentials = Depends(security),
+    db: Session = Depends(get_db)
+):
+    """Allow the METRICS_TOKEN scrape token or an admin's access token"""
+    # Async, so scrapes with the token take no threadpool thread and still
+    # get through while the threadpool is saturated
+    if METRICS_TOKEN and hmac.compare_digest(credentials.credentials.encode(), METRICS_TOKEN.encode()):
+        return
+    get_current_admin_user(await run_in_threadpool(get_current_user, credentials, db))
+
 # Input validation and sanitization
 def validate_password(password: str) -> bool:
     """Validate password strength"""
@@ -102,10 +125,6 @@ def validate_password(password: str) -> bool:
     has_lower = bool(re.search(r'[a-z]', password))
     has_digit = bool(re.search(r'\d', password))
     has_special = bool(re.search(r'[!@#$%^&*(),.?":{}|<>]', password))
-    print("Has upper: ", has_upper)
-    print("Has lower: ", has_lower)
-    print("Has digit: ", has_digit)
-    print("Has special: ", has_special)
     
     return has_upper and has_lower and has_digit and has_special
 
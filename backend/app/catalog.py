@@ -0,0 +1,125 @@
+import asyncio
+import logging
+import threading
+from typing import Dict, Optional, Tuple
+
+from sqlalchemy.engine import Connection
+from sqlalchemy.orm import Session
+
+from .database import SessionLocal
+from .models import CatalogVersion, MealPlan
+from .schemas import MealPlan as MealPlanSchema
+
+logger = logging.getLogger(__name__)
+
+CATALOG_NAME = "meal_plans"
+
+# Seconds between checks of the shared version by each worker process
+CATALOG_POLL_SECONDS = 1
+
+class CatalogSnapshot:
+    """Immutable view of every meal plan at one catalog version"""
+
+    __slots__ = ("version", "by_id", "by_type", "newest_first", "active_newest_first")
+
+    def __init__(self, version: int, plans: Tuple[MealPlanSchema, ...]):
+        self.version = version
+        self.by_id: Dict[int, MealPlanSchema] = {plan.id: plan for plan in plans}
+        by_type = {}
+        for plan in sorted(plans, key=lambda plan: plan.id):
+            if plan.is_active:
+                by_type.setdefault(plan.plan_type, []).append(plan)
+        self.by_type: Dict[str, Tuple[MealPlanSchema, ...]] = {
+            plan_type: tuple(type_plans) for plan_type, type_plans in by_type.items()
+        }
+        self.newest_first = tuple(sorted(plans, key=lambda plan: plan.created_at, reverse=True))
+        self.active_newest_first = tuple(plan for plan in self.newest_first if plan.is_active)
+
+class MealPlanCatalog:
+    """Process-local meal plan catalog, swapped as a whole when the version changes"""
+
+    def __init__(self):
+        self._snapshot: Optional[CatalogSnapshot] = None
+        self._lock = threading.Lock()
+
+    @property
+    def snapshot(self) -> CatalogSnapshot:
+        snapshot = self._snapshot
+        if snapshot is None:
+            snapshot = self.load()
+        return snapshot
+
+    @property
+    def version(self) -> int:
+        return self.snapshot.version
+
+    def load(self, db: Optional[Session] = None) -> CatalogSnapshot:
+        """Read the version and all meal plans, then swap in the new snapshot"""
+        own_session = db is None
+        db = db or SessionLocal()
+        try:
+            with self._lock:
+                version = read_catalog_version(db)
+                plans = []
+                for meal_plan in db.query(MealPlan).all():
+                    plan = MealPlanSchema.model_validate({
+                        "id": meal_plan.id,
+                        "name": meal_plan.name,
+                        "description": meal_plan.description,
+                        "price_per_meal": meal_plan.price_per_meal,
+                        "plan_type": meal_plan.plan_type,
+                        "features": meal_plan.features,
+                        "is_active": meal_plan.is_active,
+                        "created_at": meal_plan.created_at,
+                        "updated_at": meal_plan.updated_at
+                    })
+                    plans.append(plan)
+                snapshot = CatalogSnapshot(version, tuple(plans))
+                self._snapshot = snapshot
+                return snapshot
+        finally:
+            if own_session:
+                db.close()
+
+    def refresh_if_changed(self):
+        """Reload only if another process has bumped the shared version"""
+        db = SessionLocal()
+        try:
+            if self._snapshot is None or read_catalog_version(db) != self._snapshot.version:
+                self.load(db)
+        finally:
+            db.close()
+
+def read_catalog_version(db: Session, name: str = CATALOG_NAME) -> int:
+    """Primary-key read of a shared version (the meal plan catalog by default)"""
+    row = db.get(CatalogVersion, name)
+    return row.version if row else 0
+
+def bump_catalog_version(db: Session, name: str = CATALOG_NAME):
+    """Increment a shared version in the caller's transaction"""
+    updated = db.query(CatalogVersion).filter(CatalogVersion.name == name).update(
+        {CatalogVersion.version: CatalogVersion.version + 1}, synchronize_session=False
+    )
+    if not updated:
+        db.add(CatalogVersion(name=name, version=1))
+
+def bump_version_on_connection(connection: Connection, name: str):
+    """Increment a shared version with Core statements, e.g. from a mapper event"""
+    table = CatalogVersion.__table__
+    result = connection.execute(
+        table.update().where(table.c.name == name).values(version=table.c.version + 1)
+    )
+    if not result.rowcount:
+        connection.execute(table.insert().values(name=name, version=1))
+
+async def poll_catalog_version():
+    """Keep this process's catalog in step with writes made by other workers"""
+    loop = asyncio.get_running_loop()
+    while True:
+        await asyncio.sleep(CATALOG_POLL_SECONDS)
+        try:
+            await loop.run_in_executor(None, meal_plan_catalog.refresh_if_changed)
+        except Exception:
+            logger.exception("Meal plan catalog refresh failed")
+
+meal_plan_catalog = MealPlanCatalog()
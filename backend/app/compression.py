@@ -0,0 +1,172 @@
+import zlib
+from typing import Optional
+
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from .response_cache import COMPRESSION_MIN_SIZE, brotli, negotiate_encoding
+
+# Levels for compressing on the fly. Cached bodies are compressed once at
+# the maximum level instead (see response_cache.CachedBody).
+GZIP_LEVEL = 6
+BROTLI_QUALITY = 4
+
+# Content types worth compressing; images, archives and the like are skipped
+COMPRESSIBLE_TYPES = ("application/json", "application/x-ndjson", "text/")
+
+# Live streams are passed through so every event is delivered immediately
+EXCLUDED_TYPES = ("text/event-stream",)
+
+def is_compressible(headers: Headers) -> bool:
+    content_type = headers.get("content-type", "")
+    return content_type.startswith(COMPRESSIBLE_TYPES) and not content_type.startswith(EXCLUDED_TYPES)
+
+def vary_on_encoding(headers: MutableHeaders):
+    """Add Accept-Encoding to Vary unless it is already listed"""
+    listed = {value.strip().lower() for value in headers.get("vary", "").split(",")}
+    if not listed & {"accept-encoding", "*"}:
+        headers.add_vary_header("Accept-Encoding")
+
+class Compressor:
+    """Incremental gzip or brotli encoder"""
+
+    def __init__(self, encoding: str):
+        self.encoding = encoding
+        if encoding == "br":
+            self._brotli = brotli.Compressor(quality=BROTLI_QUALITY)
+        else:
+            self._zlib = zlib.compressobj(GZIP_LEVEL, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+
+    def compress(self, data: bytes, flush: bool = False) -> bytes:
+        """Encode a chunk; flush makes everything so far decodable by the client"""
+        if self.encoding == "br":
+            return self._brotli.process(data) + (self._brotli.flush() if flush else b"")
+        return self._zlib.compress(data) + (self._zlib.flush(zlib.Z_SYNC_FLUSH) if flush else b"")
+
+    def finish(self, data: bytes = b"") -> bytes:
+        if self.encoding == "br":
+            return self._brotli.process(data) + self._brotli.finish()
+        return self._zlib.compress(data) + self._zlib.flush(zlib.Z_FINISH)
+
+class CompressionMiddleware:
+    """Compress responses with gzip or brotli, as negotiated with the client.
+
+    Whole bodies below COMPRESSION_MIN_SIZE are sent as-is. Streamed bodies
+    are compressed chunk by chunk. Responses that already carry a
+    Content-Encoding, such as cached bodies served in a precompressed
+    variant, pass through untouched. Every response of a compressible type
+    carries Vary: Accept-Encoding, including the ones sent uncompressed,
+    so shared caches never hand an identity body to a client that asked
+    for gzip or the other way round.
+    """
+
+    def __init__(self, app: ASGIApp, minimum_size: int = COMPRESSION_MIN_SIZE):
+        self.app = app
+        self.minimum_size = minimum_size
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        accept_encoding = Headers(scope=scope).get("accept-encoding", "")
+        await CompressedResponder(self.app, accept_encoding, self.minimum_size)(scope, receive, send)
+
+class CompressedResponder:
+    """Per-request state of CompressionMiddleware"""
+
+    def __init__(self, app: ASGIApp, accept_encoding: str, minimum_size: int):
+        self.app = app
+        self.accept_encoding = accept_encoding
+        self.minimum_size = minimum_size
+        self.send: Optional[Send] = None
+        self.start: Optional[Message] = None
+        self.compressor: Optional[Compressor] = None
+        self.passthrough = False
+        # Whether the client accepts any encoding at all
+        self.negotiable = negotiate_encoding(accept_encoding, minimum_size) != "identity"
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        self.send = send
+        await self.app(scope, receive, self.send_compressed)
+
+    def _should_compress(self, headers: Headers, status: int) -> bool:
+        return (
+            self.negotiable
+            and status >= 200
+            and status not in (204, 206, 304)
+            and "content-encoding" not in headers
+            and "content-range" not in headers
+            and is_compressible(headers)
+        )
+
+    def _identity_start(self, message: Message) -> Message:
+        """The start message for a body sent as-is"""
+        headers = MutableHeaders(raw=list(message["headers"]))
+        if not is_compressible(headers):
+            return message
+        vary_on_encoding(headers)
+        return {**message, "headers": headers.raw}
+
+    def _encoded_start(self, encoding: str, length: Optional[int]) -> Message:
+        headers = MutableHeaders(raw=list(self.start["headers"]))
+        headers["Content-Encoding"] = encoding
+        vary_on_encoding(headers)
+        if length is None:
+            del headers["Content-Length"]
+        else:
+            headers["Content-Length"] = str(length)
+        etag = headers.get("etag")
+        if etag and etag.endswith('"'):
+            # Each representation needs its own strong ETag
+            headers["ETag"] = f'{etag[:-1]}-{encoding}"'
+        return {**self.start, "headers": headers.raw}
+
+    async def send_compressed(self, message: Message):
+        message_type = message["type"]
+
+        if message_type == "http.response.start":
+            self.start = message
+            self.passthrough = not self._should_compress(
+                Headers(raw=message["headers"]), message["status"]
+            )
+            if self.passthrough:
+                await self.send(self._identity_start(message))
+            return
+
+        if self.passthrough or message_type != "http.response.body":
+            if self.start is not None and not self.passthrough:
+                # e.g. http.response.pathsend: the body never passes through here
+                await self.send(self._identity_start(self.start))
+                self.passthrough = True
+            await self.send(message)
+            return
+
+        body = message.get("body", b"")
+        more_body = message.get("more_body", False)
+
+        if self.compressor is None:
+            if not more_body:
+                # Whole body in one message
+                encoding = "identity"
+                if len(body) >= self.minimum_size:
+                    encoding = negotiate_encoding(self.accept_encoding, len(body))
+                if encoding == "identity":
+                    self.passthrough = True
+                    await self.send(self._identity_start(self.start))
+                    await self.send(message)
+                    return
+                compressed = Compressor(encoding).finish(body)
+                await self.send(self._encoded_start(encoding, len(compressed)))
+                await self.send({"type": "http.response.body", "body": compressed})
+                return
+
+            encoding = negotiate_encoding(self.accept_encoding, self.minimum_size)
+            self.compressor = Compressor(encoding)
+            await self.send(self._encoded_start(encoding, None))
+
+        if more_body:
+            chunk = self.compressor.compress(body, flush=True)
+            if chunk:
+                await self.send({"type": "http.response.body", "body": chunk, "more_body": True})
+        else:
+            await self.send({"type": "http.response.body", "body": self.compressor.finish(body)})
\ No newline at end of file
@@ -0,0 +1,152 @@
+import asyncio
+import os
+import re
+from collections import deque
+from typing import Deque, Dict, Optional
+
+import anyio
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+def env_int(name: str, default: int) -> int:
+    value = os.getenv(name)
+    return int(value) if value else default
+
+# Threads running sync endpoints and dependencies in each worker process
+# (anyio's default is 40)
+THREADPOOL_SIZE = env_int("THREADPOOL_SIZE", 40)
+
+# (concurrent requests, queued requests) per route group. Override with
+# CONCURRENCY_<GROUP> and CONCURRENCY_<GROUP>_QUEUE, e.g. CONCURRENCY_AUTH=4;
+# a limit of 0 turns limiting off for the group. The limits add up to less
+# than the threadpool, so a saturated group cannot take every thread.
+DEFAULT_ROUTE_GROUP_LIMITS = {
+    "auth": (8, 32),
+    "public": (16, 128),
+    "admin": (4, 8),
+    "writes": (8, 32)
+}
+
+# Longest a request waits in a group's queue before it is turned away
+QUEUE_TIMEOUT_SECONDS = float(os.getenv("CONCURRENCY_QUEUE_TIMEOUT_SECONDS", "5"))
+
+# Sent in Retry-After with 503 responses
+RETRY_AFTER_SECONDS = env_int("CONCURRENCY_RETRY_AFTER_SECONDS", 2)
+
+# First matching pattern wins; requests matching none are "writes", or
+# "public" for GET and HEAD. Health checks, metrics scrapes and the
+# long-lived live dashboard stream are never limited.
+ROUTE_GROUP_RULES = [
+    (None, re.compile(r"^/(health|metrics)$|^/dashboard/admin/live$")),
+    ("admin", re.compile(r"^/(dashboard|profiling)/|^/auth/users|/admin/|^/testimonials/\d+/(approve|reject)$")),
+    ("auth", re.compile(r"^/auth/"))
+]
+READ_METHODS = {"GET", "HEAD"}
+
+BUSY_BODY = b'{"detail":"Server is busy, please retry later"}'
+
+def route_group(method: str, path: str) -> Optional[str]:
+    for group, pattern in ROUTE_GROUP_RULES:
+        if pattern.search(path):
+            return group
+    return "public" if method in READ_METHODS else "writes"
+
+class ConcurrencyLimit:
+    """Concurrency limit with a bounded FIFO wait queue.
+
+    Only used from the event loop thread, so it needs no lock.
+    """
+
+    def __init__(self, name: str, limit: int, queue_size: int, queue_timeout: float = QUEUE_TIMEOUT_SECONDS):
+        self.name = name
+        self.limit = limit
+        self.queue_size = queue_size
+        self.queue_timeout = queue_timeout
+        self.active = 0
+        self.rejected = 0
+        self._waiters: Deque[asyncio.Future] = deque()
+
+    @property
+    def queued(self) -> int:
+        return len(self._waiters)
+
+    async def acquire(self) -> bool:
+        """Take a slot, waiting in the queue if needed; False if the request should be shed"""
+        if self.active < self.limit and not self._waiters:
+            self.active += 1
+            return True
+        if len(self._waiters) >= self.queue_size:
+            self.rejected += 1
+            return False
+
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters.append(waiter)
+        try:
+            await asyncio.wait_for(waiter, self.queue_timeout)
+        except (asyncio.TimeoutError, asyncio.CancelledError) as e:
+            if waiter.done() and not waiter.cancelled():
+                # The slot was handed over just as the wait ended
+                self.release()
+            elif waiter in self._waiters:
+                self._waiters.remove(waiter)
+            if isinstance(e, asyncio.CancelledError):
+                raise
+            self.rejected += 1
+            return False
+        return True
+
+    def release(self):
+        # Hand the slot straight to the next waiter, so active stays the same
+        while self._waiters:
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                waiter.set_result(None)
+                return
+        self.active -= 1
+
+def route_group_limits() -> Dict[str, ConcurrencyLimit]:
+    limits = {}
+    for name, (limit, queue_size) in DEFAULT_ROUTE_GROUP_LIMITS.items():
+        limit = env_int(f"CONCURRENCY_{name.upper()}", limit)
+        if limit > 0:
+            limits[name] = ConcurrencyLimit(name, limit, env_int(f"CONCURRENCY_{name.upper()}_QUEUE", queue_size))
+    return limits
+
+route_limits = route_group_limits()
+
+def configure_threadpool():
+    """Size the threadpool of the running event loop (call from startup)"""
+    anyio.to_thread.current_default_thread_limiter().total_tokens = THREADPOOL_SIZE
+
+class ConcurrencyLimitMiddleware:
+    """Limit concurrent requests per route group and shed load with 503.
+
+    A burst of logins or admin exports then queues behind its own group's
+    limit instead of taking every threadpool thread from public reads.
+    """
+
+    def __init__(self, app: ASGIApp, limits: Optional[Dict[str, ConcurrencyLimit]] = None):
+        self.app = app
+        self.limits = route_limits if limits is None else limits
+        self.busy_headers = [
+            (b"content-type", b"application/json"),
+            (b"content-length", str(len(BUSY_BODY)).encode()),
+            (b"retry-after", str(RETRY_AFTER_SECONDS).encode())
+        ]
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        limit = self.limits.get(route_group(scope["method"], scope["path"]))
+        if limit is None:
+            await self.app(scope, receive, send)
+            return
+
+        if not await limit.acquire():
+            await send({"type": "http.response.start", "status": 503, "headers": self.busy_headers})
+            await send({"type": "http.response.body", "body": BUSY_BODY})
+            return
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            limit.release()
\ No newline at end of file
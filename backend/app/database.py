@@ -1,15 +1,21 @@
-from sqlalchemy import create_engine
+from fastapi import Depends
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import create_engine, inspect, text
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
+import anyio
 import os
 
+from .metrics import InstrumentedQueuePool
+
 # Database URL - using SQLite for development
 DATABASE_URL = "sqlite:///./sea_catering.db"
 
 # Create SQLAlchemy engine
 engine = create_engine(
     DATABASE_URL, 
-    connect_args={"check_same_thread": False}  # Only needed for SQLite
+    connect_args={"check_same_thread": False},  # Only needed for SQLite
+    poolclass=InstrumentedQueuePool  # Records checkout wait and hold times for /metrics
 )
 
 # Create SessionLocal class
@@ -18,10 +24,78 @@ SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 # Create Base class
 Base = declarative_base()
 
-# Dependency to get database session
-def get_db():
-    db = SessionLocal()
+# Run once when a column is added to an existing table, to fill it in for
+# the rows written before it existed
+COLUMN_BACKFILLS = {
+    ("subscriptions", "cancelled_at"):
+        "UPDATE subscriptions SET cancelled_at = COALESCE(updated_at, created_at) WHERE NOT is_active"
+}
+
+def add_missing_columns(bind):
+    """Add nullable model columns that are missing from existing tables.
+
+    create_all() only creates missing tables, so a database created before
+    a column was added to a model would fail on every query that uses it.
+    """
+    inspector = inspect(bind)
+    with bind.begin() as connection:
+        for table in Base.metadata.sorted_tables:
+            if not inspector.has_table(table.name):
+                continue
+            existing = {column["name"] for column in inspector.get_columns(table.name)}
+            for column in table.columns:
+                if column.name in existing or not column.nullable:
+                    continue
+                column_type = column.type.compile(dialect=bind.dialect)
+                connection.execute(text(f"ALTER TABLE {table.name} ADD COLUMN {column.name} {column_type}"))
+                backfill = COLUMN_BACKFILLS.get((table.name, column.name))
+                if backfill:
+                    connection.execute(text(backfill))
+
+class LazySession:
+    """Stands in for a Session and only creates it when first used.
+
+    Every Session attribute is forwarded to the real session, so routes
+    keep annotating it as `db: Session`.
+
+    Requests that are rejected before their first query (bad token,
+    validation errors, early 404s) never create a Session, and closing
+    them costs nothing.
+    """
+
+    __slots__ = ("_session",)
+
+    def __init__(self):
+        self._session = None
+
+    @property
+    def in_use(self) -> bool:
+        return self._session is not None
+
+    def __getattr__(self, name):
+        if self._session is None:
+            self._session = SessionLocal()
+        return getattr(self._session, name)
+
+    def close(self):
+        if self._session is not None:
+            self._session.close()
+
+async def open_session():
+    db = LazySession()
     try:
         yield db
     finally:
-        db.close() 
\ No newline at end of file
+        if db.in_use:
+            # Closing rolls back the open transaction, which blocks; finish it
+            # even if the request was cancelled so the connection goes back
+            with anyio.CancelScope(shield=True):
+                await run_in_threadpool(db.close)
+
+# Dependency to get database session. The session is shared by every
+# dependency of a request (get_current_user and the endpoint get the same
+# one) and closed, returning its connection to the pool, as soon as the
+# endpoint's response is built instead of after it has been sent. Async,
+# so resolving it takes no threadpool thread.
+async def get_db(db: LazySession = Depends(open_session, scope="function")) -> LazySession:
+    return db
\ No newline at end of file
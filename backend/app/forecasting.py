@@ -0,0 +1,310 @@
+import json
+import threading
+from collections import OrderedDict
+from datetime import date, datetime, timedelta
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy import Date, func, and_, or_, case
+from sqlalchemy.orm import Session
+
+from .models import Subscription
+
+# Index matches date.weekday()
+DAY_NAMES = ['monday', 'tuesday', 'wednesday', 'thursday', 'friday', 'saturday', 'sunday']
+
+MEAL_TYPES = ['breakfast', 'lunch', 'dinner']
+
+PLANS = ['diet', 'protein', 'royal']
+
+# Used by calculate_total_price to turn a weekly selection into a monthly price
+WEEKS_PER_MONTH = 4.3
+
+# Production counts kept per day (bounded, least recently used first out)
+# with the subscriptions version they were computed at: counts for days
+# that had ended never change, the rest only hold until the next
+# subscription write that can change a manifest
+PRODUCTION_CACHE_DAYS = 400
+_production_cache: "OrderedDict[date, Tuple[Optional[int], dict]]" = OrderedDict()
+_production_cache_lock = threading.Lock()
+_first_day: Optional[date] = None
+
+def _parse_list(value: str, cache: Dict[str, list]) -> list:
+    """Parse a JSON list column, reusing results for repeated values"""
+    parsed = cache.get(value)
+    if parsed is None:
+        parsed = cache[value] = json.loads(value)
+    return parsed
+
+def _active_filter():
+    """Active subscriptions; a pause with no end date keeps one out of the active set"""
+    return and_(
+        Subscription.is_active == True,
+        ~and_(Subscription.pause_start_date.isnot(None), Subscription.pause_end_date.is_(None))
+    )
+
+def _grouped(db: Session, columns: list, criteria):
+    """Run one aggregate query, yielding (columns..., days, meal_types, count, price_sum)"""
+    group_columns = columns + [Subscription.delivery_days, Subscription.meal_types]
+    rows = db.query(
+        *group_columns,
+        func.count(Subscription.id),
+        func.sum(Subscription.total_price)
+    ).filter(*criteria).group_by(*group_columns)
+
+    list_cache = {}
+    split = len(columns)
+    for row in rows:
+        delivery_days, meal_types, count, price_sum = row[split:]
+        yield tuple(row[:split]) + (
+            _parse_list(delivery_days, list_cache),
+            _parse_list(meal_types, list_cache),
+            count,
+            price_sum
+        )
+
+def _delivery_groups(db: Session, *columns):
+    """Aggregate active subscriptions into groups sharing a delivery pattern.
+
+    Yields (extra column values..., days, meal_types, count, price_sum).
+    """
+    return _grouped(db, list(columns), [_active_filter()])
+
+def _paused_groups(db: Session, start_date: date, end_date: date, *columns):
+    """Aggregate active subscriptions whose pause window overlaps the range.
+
+    Kept separate from _delivery_groups so that pause dates only split the
+    (usually small) set of paused subscriptions into groups.
+    Yields (pause_start, pause_end, extra column values..., days, meal_types, count, price_sum).
+    """
+    return _grouped(
+        db,
+        [Subscription.pause_start_date, Subscription.pause_end_date] + list(columns),
+        [
+            _active_filter(),
+            Subscription.pause_start_date <= end_date,
+            Subscription.pause_end_date >= start_date
+        ]
+    )
+
+def _weekdays(days: list, cache: Dict[tuple, list]) -> list:
+    """Map delivery day names to date.weekday() numbers"""
+    key = tuple(days)
+    weekdays = cache.get(key)
+    if weekdays is None:
+        weekdays = cache[key] = sorted({DAY_NAMES.index(day) for day in days if day in DAY_NAMES})
+    return weekdays
+
+def forecast_revenue(db: Session, start_date: date, end_date: date) -> List[dict]:
+    """Project revenue and meal volume per day for active subscriptions.
+
+    Each subscription earns its monthly price spread over its delivery
+    days (total_price / (delivery days x 4.3) per delivery) and nothing on
+    days inside a scheduled pause window.
+    """
+    horizon = (end_date - start_date).days + 1
+    weekday_revenue = [0.0] * 7
+    weekday_meals = [0] * 7
+    weekday_deliveries = [0] * 7
+
+    weekday_cache = {}
+    for days, meal_types, count, price_sum in _delivery_groups(db):
+        weekdays = _weekdays(days, weekday_cache)
+        if not weekdays:
+            continue
+        revenue = price_sum / (len(weekdays) * WEEKS_PER_MONTH)
+        meals = count * len(meal_types)
+        for weekday in weekdays:
+            weekday_revenue[weekday] += revenue
+            weekday_meals[weekday] += meals
+            weekday_deliveries[weekday] += count
+
+    # Paused days are taken back out through per-weekday difference arrays,
+    # so each pause window costs O(delivery days) regardless of its length
+    revenue_diff = [[0.0] * (horizon + 1) for _ in range(7)]
+    meals_diff = [[0] * (horizon + 1) for _ in range(7)]
+    deliveries_diff = [[0] * (horizon + 1) for _ in range(7)]
+    for paused_from, paused_to, days, meal_types, count, price_sum in _paused_groups(db, start_date, end_date):
+        weekdays = _weekdays(days, weekday_cache)
+        if not weekdays:
+            continue
+        revenue = price_sum / (len(weekdays) * WEEKS_PER_MONTH)
+        meals = count * len(meal_types)
+        first = (max(paused_from, start_date) - start_date).days
+        stop = (min(paused_to, end_date) - start_date).days + 1
+        for weekday in weekdays:
+            revenue_diff[weekday][first] -= revenue
+            revenue_diff[weekday][stop] += revenue
+            meals_diff[weekday][first] -= meals
+            meals_diff[weekday][stop] += meals
+            deliveries_diff[weekday][first] -= count
+            deliveries_diff[weekday][stop] += count
+
+    paused_revenue = [0.0] * 7
+    paused_meals = [0] * 7
+    paused_deliveries = [0] * 7
+    forecast = []
+    for offset in range(horizon):
+        day = start_date + timedelta(days=offset)
+        for weekday in range(7):
+            paused_revenue[weekday] += revenue_diff[weekday][offset]
+            paused_meals[weekday] += meals_diff[weekday][offset]
+            paused_deliveries[weekday] += deliveries_diff[weekday][offset]
+        weekday = day.weekday()
+        forecast.append({
+            "date": day,
+            "revenue": round(weekday_revenue[weekday] + paused_revenue[weekday], 2),
+            "meals": weekday_meals[weekday] + paused_meals[weekday],
+            "deliveries": weekday_deliveries[weekday] + paused_deliveries[weekday]
+        })
+    return forecast
+
+def _empty_portions() -> Dict[str, Dict[str, int]]:
+    return {plan: {meal_type: 0 for meal_type in MEAL_TYPES} for plan in PLANS}
+
+def _day_start(day: date) -> datetime:
+    return datetime.combine(day, datetime.min.time())
+
+def _production_groups(db: Session, start_date: date, end_date: date, paused: bool):
+    """Aggregate subscriptions that deliver on at least one day of the range.
+
+    A subscription delivers from the day it was created until the day
+    before it was cancelled, so past days only count subscriptions that
+    existed then. Yields (first day or None, stop day or None, [pause
+    start, pause end,] plan, days, meal_types, count, price_sum); the
+    first and stop days are only set when they fall inside the range.
+    """
+    range_start, range_end = _day_start(start_date + timedelta(days=1)), _day_start(end_date + timedelta(days=1))
+    first_day = case(
+        (Subscription.created_at >= range_start, func.date(Subscription.created_at, type_=Date)),
+        else_=None
+    )
+    stop_day = case(
+        (
+            and_(Subscription.is_active == False, Subscription.cancelled_at < range_end),
+            func.date(Subscription.cancelled_at, type_=Date)
+        ),
+        else_=None
+    )
+    criteria = [
+        Subscription.created_at < range_end,
+        or_(Subscription.is_active == True, Subscription.cancelled_at >= range_start)
+    ]
+    columns = [first_day, stop_day]
+    if paused:
+        # An open-ended pause lasts past the end of the range
+        columns += [Subscription.pause_start_date, Subscription.pause_end_date]
+        criteria += [
+            Subscription.pause_start_date <= end_date,
+            or_(Subscription.pause_end_date.is_(None), Subscription.pause_end_date >= start_date)
+        ]
+    return _grouped(db, columns + [Subscription.plan], criteria)
+
+def _compute_production(db: Session, start_date: date, end_date: date) -> Dict[date, dict]:
+    """Count portions per day x plan x meal type for subscriptions delivering that day"""
+    horizon = (end_date - start_date).days + 1
+
+    # Portions per (weekday, plan, meal type) through difference arrays over
+    # the range, so subscriptions starting, stopping or pausing inside it
+    # cost O(delivery days) each regardless of how long they run
+    diffs = {}
+    weekday_cache = {}
+
+    def add(first: date, stop: date, plan: str, days: list, meal_types: list, count: int):
+        first_offset = (max(first or start_date, start_date) - start_date).days
+        stop_offset = (min(stop, end_date + timedelta(days=1)) - start_date).days if stop else horizon
+        if plan not in PLANS or first_offset >= stop_offset:
+            return
+        for weekday in _weekdays(days, weekday_cache):
+            for meal_type in meal_types:
+                if meal_type in MEAL_TYPES:
+                    diff = diffs.get((weekday, plan, meal_type))
+                    if diff is None:
+                        diff = diffs[(weekday, plan, meal_type)] = [0] * (horizon + 1)
+                    diff[first_offset] += count
+                    diff[stop_offset] -= count
+
+    for first, stop, plan, days, meal_types, count, price_sum in _production_groups(db, start_date, end_date, False):
+        add(first, stop, plan, days, meal_types, count)
+
+    # Paused days are taken back out over the part of the pause window in
+    # which the subscription was delivering
+    for first, stop, paused_from, paused_to, plan, days, meal_types, count, price_sum in _production_groups(
+        db, start_date, end_date, True
+    ):
+        paused_stop = paused_to + timedelta(days=1) if paused_to else None
+        add(
+            max(first or start_date, paused_from),
+            min(day for day in (stop, paused_stop) if day is not None) if stop or paused_stop else None,
+            plan, days, meal_types, -count
+        )
+
+    running = dict.fromkeys(diffs, 0)
+    result = {}
+    for offset in range(horizon):
+        day = start_date + timedelta(days=offset)
+        for key, diff in diffs.items():
+            running[key] += diff[offset]
+        weekday = day.weekday()
+        portions = {
+            plan: {meal_type: running.get((weekday, plan, meal_type), 0) for meal_type in MEAL_TYPES}
+            for plan in PLANS
+        }
+        result[day] = {
+            "date": day,
+            "portions": portions,
+            "total_portions": sum(sum(meals.values()) for meals in portions.values())
+        }
+    return result
+
+def _first_subscription_day(db: Session) -> Optional[date]:
+    """Day the first subscription was created; kept once known, as it never moves"""
+    global _first_day
+    if _first_day is None:
+        first = db.query(func.min(Subscription.created_at)).scalar()
+        if isinstance(first, str):
+            first = datetime.fromisoformat(first)
+        _first_day = first.date() if first else None
+    return _first_day
+
+def forecast_production(
+    db: Session, start_date: date, end_date: date, version: Optional[int] = None, today: Optional[date] = None
+) -> List[dict]:
+    """Kitchen portion counts per day x plan x meal type.
+
+    Days before the first subscription was created are left out, as there
+    is no data for them. Days that ended before today are cached once
+    computed: subscriptions created or cancelled later do not change them.
+    Today and future days are cached for the subscriptions version read
+    before the call, and computed fresh when no version is given.
+    """
+    today = today or date.today()
+    first_day = _first_subscription_day(db)
+    if first_day is None or end_date < first_day:
+        return []
+    start_date = max(start_date, first_day)
+    days = [start_date + timedelta(days=offset) for offset in range((end_date - start_date).days + 1)]
+
+    def current(day: date) -> bool:
+        entry_version = _production_cache[day][0]
+        return entry_version == version if entry_version is not None else day < today
+
+    with _production_cache_lock:
+        cached = {day: _production_cache[day][1] for day in days if day in _production_cache and current(day)}
+        for day in cached:
+            _production_cache.move_to_end(day)
+
+    missing = [day for day in days if day not in cached]
+    if missing:
+        computed = _compute_production(db, missing[0], missing[-1])
+        with _production_cache_lock:
+            for day, counts in computed.items():
+                if day < today:
+                    _production_cache[day] = (None, counts)
+                elif version is not None:
+                    _production_cache[day] = (version, counts)
+                _production_cache.move_to_end(day)
+            while len(_production_cache) > PRODUCTION_CACHE_DAYS:
+                _production_cache.popitem(last=False)
+        cached.update((day, counts) for day, counts in computed.items() if day not in cached)
+
+    return [cached[day] for day in days]
\ No newline at end of file
@@ -0,0 +1,166 @@
+import asyncio
+import json
+import threading
+import time
+from datetime import date, datetime
+from typing import Optional, Tuple
+
+from sqlalchemy import func, and_, or_
+
+from .database import SessionLocal
+from .models import Subscription
+
+# Seconds between full recounts from the database. Writes keep the counters
+# current in between; the recount picks up pause windows that start or end
+# on their own and resets the "new today" counter at midnight.
+RESYNC_SECONDS = 300
+
+# Maximum number of undelivered events kept per subscriber
+SUBSCRIBER_QUEUE_SIZE = 16
+
+def subscription_contribution(subscription: Subscription, today: Optional[date] = None) -> Tuple[int, int, float]:
+    """Return the (active, paused, mrr) contribution of a subscription"""
+    today = today or date.today()
+    if not subscription.is_active:
+        return 0, 0, 0.0
+    if subscription.pause_start_date is None:
+        return 1, 0, subscription.total_price
+    if subscription.pause_end_date is None:
+        return 0, 0, 0.0
+    if subscription.pause_start_date <= today <= subscription.pause_end_date:
+        return 0, 1, 0.0
+    return 1, 0, subscription.total_price
+
+class DashboardCounters:
+    """In-process dashboard counters shared by every live dashboard subscriber"""
+
+    def __init__(self, resync_seconds: int = RESYNC_SECONDS):
+        self.resync_seconds = resync_seconds
+        self.version = 0
+        self.db_loads = 0
+        self._lock = threading.Lock()
+        self._values = None
+        self._day = None
+        self._synced_at = 0.0
+        self._subscribers = set()
+
+    def _load(self) -> dict:
+        """Recount all counters with aggregate queries"""
+        today = date.today()
+        db = SessionLocal()
+        try:
+            is_running = and_(
+                Subscription.is_active == True,
+                or_(
+                    Subscription.pause_start_date.is_(None),
+                    and_(
+                        Subscription.pause_start_date.isnot(None),
+                        Subscription.pause_end_date.isnot(None),
+                        or_(
+                            Subscription.pause_end_date < today,
+                            Subscription.pause_start_date > today
+                        )
+                    )
+                )
+            )
+            active, mrr = db.query(
+                func.count(Subscription.id),
+                func.coalesce(func.sum(Subscription.total_price), 0.0)
+            ).filter(is_running).one()
+            paused = db.query(func.count(Subscription.id)).filter(
+                Subscription.is_active == True,
+                Subscription.pause_start_date.isnot(None),
+                Subscription.pause_end_date.isnot(None),
+                Subscription.pause_start_date <= today,
+                Subscription.pause_end_date >= today
+            ).scalar()
+            new_today = db.query(func.count(Subscription.id)).filter(
+                Subscription.created_at >= datetime.combine(today, datetime.min.time())
+            ).scalar()
+        finally:
+            db.close()
+
+        self.db_loads += 1
+        return {
+            "active_subscriptions": active,
+            "paused_subscriptions": paused,
+            "new_today": new_today,
+            "monthly_recurring_revenue": float(mrr)
+        }
+
+    def current(self) -> dict:
+        """Return the current counters, recounting from the database when stale"""
+        with self._lock:
+            stale = (
+                self._values is None
+                or self._day != date.today()
+                or time.monotonic() - self._synced_at >= self.resync_seconds
+            )
+            if stale:
+                previous = self._values
+                self._values = self._load()
+                self._day = date.today()
+                self._synced_at = time.monotonic()
+                if previous is not None and previous != self._values:
+                    self._publish(previous)
+            return dict(self._values)
+
+    def apply(self, before: Tuple[int, int, float], after: Tuple[int, int, float], created: bool = False):
+        """Apply a subscription write, given its contribution before and after"""
+        with self._lock:
+            if self._values is None:
+                # Nothing is being served yet; the first reader loads from the database
+                return
+            previous = dict(self._values)
+            self._values["active_subscriptions"] += after[0] - before[0]
+            self._values["paused_subscriptions"] += after[1] - before[1]
+            self._values["monthly_recurring_revenue"] += after[2] - before[2]
+            if created:
+                self._values["new_today"] += 1
+            if previous != self._values:
+                self._publish(previous)
+
+    def subscribe(self) -> asyncio.Queue:
+        """Register a subscriber on the running event loop"""
+        queue = asyncio.Queue(maxsize=SUBSCRIBER_QUEUE_SIZE)
+        with self._lock:
+            self._subscribers.add((asyncio.get_running_loop(), queue))
+        return queue
+
+    def unsubscribe(self, queue: asyncio.Queue):
+        """Remove a subscriber"""
+        with self._lock:
+            self._subscribers = {entry for entry in self._subscribers if entry[1] is not queue}
+
+    @property
+    def subscriber_count(self) -> int:
+        return len(self._subscribers)
+
+    def format_event(self, values: dict, previous: Optional[dict] = None) -> str:
+        """Encode counters and their deltas as a Server-Sent Event"""
+        previous = previous or values
+        payload = {
+            "version": self.version,
+            "counters": values,
+            "deltas": {key: values[key] - previous[key] for key in values}
+        }
+        return f"event: counters\nid: {self.version}\ndata: {json.dumps(payload)}\n\n"
+
+    def _publish(self, previous: dict):
+        """Encode the change once and hand it to every subscriber (lock held)"""
+        self.version += 1
+        event = self.format_event(dict(self._values), previous)
+        for loop, queue in list(self._subscribers):
+            try:
+                loop.call_soon_threadsafe(_offer, queue, event)
+            except RuntimeError:
+                # Event loop already closed; the subscriber is gone
+                self._subscribers.discard((loop, queue))
+
+def _offer(queue: asyncio.Queue, event: str):
+    """Queue an event, dropping the oldest one if the subscriber is lagging"""
+    if queue.full():
+        queue.get_nowait()
+    queue.put_nowait(event)
+
+dashboard_counters = DashboardCounters()
@@ -0,0 +1,148 @@
+import json
+import logging
+import os
+import queue
+import re
+import sys
+import uuid
+from contextvars import ContextVar
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener
+from typing import Optional
+
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+# Same variable run.py passes to uvicorn
+LOG_LEVEL = os.getenv("LOG_LEVEL", "info").upper()
+
+# Records waiting for the writer thread; when the sink cannot keep up,
+# further records are dropped instead of blocking requests
+LOG_QUEUE_SIZE = int(os.getenv("LOG_QUEUE_SIZE", "10000"))
+
+REQUEST_ID_HEADER = b"x-request-id"
+
+# Incoming ids are echoed back and logged, so only short plain ones are kept
+VALID_REQUEST_ID = re.compile(r"^[A-Za-z0-9._-]{1,64}$")
+
+# Correlation id of the request being handled; anyio copies it into the
+# threadpool threads that run sync endpoints
+request_id_var: ContextVar[str] = ContextVar("request_id", default="-")
+
+# Attributes every LogRecord has; anything else came from extra={...}
+_RECORD_ATTRIBUTES = set(vars(logging.makeLogRecord({}))) | {"message", "request_id"}
+
+class JSONFormatter(logging.Formatter):
+    """One JSON object per line, with the request id and any extra fields"""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "time": datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+            "request_id": getattr(record, "request_id", "-"),
+            "pid": record.process,
+            "thread": record.threadName
+        }
+        for name, value in vars(record).items():
+            if name not in _RECORD_ATTRIBUTES:
+                entry[name] = value
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            entry["exception"] = record.exc_text
+        return json.dumps(entry, default=str)
+
+_traceback_formatter = logging.Formatter()
+
+class DeferredQueueHandler(QueueHandler):
+    """QueueHandler that leaves message formatting to the writer thread.
+
+    The stock handler renders the message on the calling thread. Here only
+    the request id is captured, so a log call costs a record and a queue
+    put. Arguments are formatted later, so pass values that are not
+    mutated afterwards.
+    """
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        record.request_id = request_id_var.get()
+        if record.exc_info and not record.exc_text:
+            # Tracebacks hold frames alive; render them while they are current
+            record.exc_text = _traceback_formatter.formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+    def enqueue(self, record: logging.LogRecord):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            pass
+
+_listener: Optional[QueueListener] = None
+_listener_pid: Optional[int] = None
+
+def configure_logging(stream=None):
+    """Route the "app" loggers through a queue to a writer thread.
+
+    Called from the app's startup, so every worker process gets its own
+    writer thread; threads do not survive the fork in run.py.
+    """
+    global _listener, _listener_pid
+    if _listener is not None and _listener_pid == os.getpid():
+        return
+    sink = logging.StreamHandler(stream or sys.stdout)
+    sink.setFormatter(JSONFormatter())
+    log_queue = queue.Queue(LOG_QUEUE_SIZE)
+
+    logger = logging.getLogger("app")
+    logger.handlers = [DeferredQueueHandler(log_queue)]
+    logger.setLevel(LOG_LEVEL)
+    logger.propagate = False
+
+    _listener = QueueListener(log_queue, sink)
+    _listener_pid = os.getpid()
+    _listener.start()
+
+def stop_logging():
+    """Write out queued records and stop the writer thread"""
+    global _listener
+    if _listener is not None and _listener_pid == os.getpid():
+        _listener.stop()
+    _listener = None
+
+class RequestIdMiddleware:
+    """Give every request a correlation id, from X-Request-ID or a new one.
+
+    The id is set for log records made while handling the request and
+    returned in the X-Request-ID response header.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        request_id = None
+        for name, value in scope["headers"]:
+            if name == REQUEST_ID_HEADER:
+                candidate = value.decode("latin-1")
+                if VALID_REQUEST_ID.match(candidate):
+                    request_id = candidate
+                break
+        if request_id is None:
+            request_id = uuid.uuid4().hex
+        encoded = request_id.encode()
+
+        async def send_with_request_id(message: Message):
+            if message["type"] == "http.response.start":
+                message = {**message, "headers": list(message["headers"]) + [(REQUEST_ID_HEADER, encoded)]}
+            await send(message)
+
+        token = request_id_var.set(request_id)
+        try:
+            await self.app(scope, receive, send_with_request_id)
+        finally:
+            request_id_var.reset(token)
\ No newline at end of file
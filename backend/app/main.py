@@ -1,20 +1,85 @@
-from fastapi import FastAPI
+from fastapi import Depends, FastAPI, Request, Response
+from fastapi.exception_handlers import request_validation_exception_handler
+from fastapi.exceptions import RequestValidationError
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.middleware.trustedhost import TrustedHostMiddleware
 from contextlib import asynccontextmanager
+import asyncio
+import anyio
 
-from .database import engine
+from .auth import require_metrics_access
+from .database import add_missing_columns, engine
 from .models import Base
-from .routes import subscriptions, testimonials, meal_plans, auth, dashboard
+from .manifests import precompute_manifests
+from .search import setup_testimonial_search
+from .moderation import moderation_worker, MODERATION_WORKER
+from .catalog import meal_plan_catalog, poll_catalog_version
+from .response_cache import static_json_response
+from .compression import CompressionMiddleware
+from .metrics import MetricsMiddleware, render_metrics
+from .profiling import ProfilingMiddleware
+from .logs import RequestIdMiddleware, configure_logging, stop_logging
+from .concurrency import ConcurrencyLimitMiddleware, configure_threadpool, route_limits
+from .responses import FastJSONRoute
+from .routes import subscriptions, testimonials, meal_plans, auth, dashboard, profiling
+from .schemas import reword_errors
 
 # Create database tables
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     # Startup
+    configure_logging()
+    configure_threadpool()
     Base.metadata.create_all(bind=engine)
+    add_missing_columns(engine)
+    setup_testimonial_search(engine)
+    meal_plan_catalog.load()
+    catalog_task = asyncio.create_task(poll_catalog_version())
+    manifest_task = asyncio.create_task(precompute_manifests())
+    if MODERATION_WORKER == "thread":
+        moderation_worker.start()
     yield
     # Shutdown
-    pass
+    catalog_task.cancel()
+    manifest_task.cancel()
+    moderation_worker.stop()
+    stop_logging()
+
+# Static payloads, encoded once per app version
+ROOT_INFO = {
+    "message": "Welcome to SEA Catering API v2.0",
+    "version": "2.0.0",
+    "features": [
+        "User Authentication & Authorization",
+        "Secure Subscription Management",
+        "Testimonial System with Approval",
+        "Meal Plan Management",
+        "Input Validation & Sanitization",
+        "XSS & SQL Injection Protection"
+    ],
+    "docs": "/docs",
+    "endpoints": {
+        "authentication": "/api/v1/auth",
+        "subscriptions": "/api/v1/subscriptions",
+        "testimonials": "/api/v1/testimonials",
+        "meal_plans": "/api/v1/meal-plans"
+    }
+}
+
+SECURITY_INFO = {
+    "security_features": {
+        "authentication": "JWT-based authentication",
+        "authorization": "Role-based access control",
+        "password_hashing": "bcrypt with salt",
+        "input_validation": "Pydantic validation",
+        "input_sanitization": "HTML escaping and pattern matching",
+        "sql_injection_protection": "Parameterized queries with SQLAlchemy",
+        "xss_protection": "Input sanitization and output encoding",
+        "csrf_protection": "JWT tokens prevent CSRF",
+        "cors": "Configured CORS middleware",
+        "trusted_hosts": "Host validation middleware"
+    }
+}
 
 # Create FastAPI app
 app = FastAPI(
@@ -24,12 +89,18 @@ app = FastAPI(
     lifespan=lifespan
 )
 
+# Routes without a response_model render with orjson (see app/responses.py)
+app.router.route_class = FastJSONRoute
+
 # Add security middleware
 app.add_middleware(
     TrustedHostMiddleware, 
     allowed_hosts=["localhost", "127.0.0.1", "*.yourdomain.com"]
 )
 
+# Shed load per route group with 503, inside CORS so browsers can read it
+app.add_middleware(ConcurrencyLimitMiddleware)
+
 # Add CORS middleware
 app.add_middleware(
     CORSMiddleware,
@@ -39,52 +110,49 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Compress responses for clients that accept gzip or brotli
+app.add_middleware(CompressionMiddleware)
+
+# Profile requests carrying an admin's X-Profile token
+app.add_middleware(ProfilingMiddleware)
+
+# Correlation id for log records and the X-Request-ID response header
+app.add_middleware(RequestIdMiddleware)
+
+# Outermost, so request latency covers every other middleware
+app.add_middleware(MetricsMiddleware)
+
 # Include routers
 app.include_router(auth.router)
 app.include_router(subscriptions.router)
 app.include_router(testimonials.router)
 app.include_router(meal_plans.router)
 app.include_router(dashboard.router)
+app.include_router(profiling.router)
+
+@app.exception_handler(RequestValidationError)
+async def validation_exception_handler(request: Request, exc: RequestValidationError):
+    """FastAPI's 422 response, with field errors in the API's own wording"""
+    return await request_validation_exception_handler(
+        request, RequestValidationError(reword_errors(exc.errors(), exc.body), body=exc.body)
+    )
 
 @app.get("/")
-async def root():
-    return {
-        "message": "Welcome to SEA Catering API v2.0",
-        "version": "2.0.0",
-        "features": [
-            "User Authentication & Authorization",
-            "Secure Subscription Management",
-            "Testimonial System with Approval",
-            "Meal Plan Management",
-            "Input Validation & Sanitization",
-            "XSS & SQL Injection Protection"
-        ],
-        "docs": "/docs",
-        "endpoints": {
-            "authentication": "/api/v1/auth",
-            "subscriptions": "/api/v1/subscriptions",
-            "testimonials": "/api/v1/testimonials",
-            "meal_plans": "/api/v1/meal-plans"
-        }
-    }
+async def root(request: Request):
+    return static_json_response(request, ("static", "root", app.version), lambda: ROOT_INFO)
+
+@app.get("/metrics", dependencies=[Depends(require_metrics_access)])
+async def metrics():
+    """Request, database pool and threadpool metrics of this worker process (Prometheus format)"""
+    return Response(
+        content=render_metrics(engine, anyio.to_thread.current_default_thread_limiter(), route_limits.values()),
+        media_type="text/plain; version=0.0.4"
+    )
 
 @app.get("/health")
 async def health_check():
     return {"status": "healthy", "message": "SEA Catering API is running securely"}
 
 @app.get("/security")
-async def security_info():
-    return {
-        "security_features": {
-            "authentication": "JWT-based authentication",
-            "authorization": "Role-based access control",
-            "password_hashing": "bcrypt with salt",
-            "input_validation": "Pydantic validation",
-            "input_sanitization": "HTML escaping and pattern matching",
-            "sql_injection_protection": "Parameterized queries with SQLAlchemy",
-            "xss_protection": "Input sanitization and output encoding",
-            "csrf_protection": "JWT tokens prevent CSRF",
-            "cors": "Configured CORS middleware",
-            "trusted_hosts": "Host validation middleware"
-        }
-    } 
\ No newline at end of file
+async def security_info(request: Request):
+    return static_json_response(request, ("static", "security", app.version), lambda: SECURITY_INFO)
\ No newline at end of file
@@ -0,0 +1,306 @@
+import asyncio
+import csv
+import gzip
+import io
+import json
+import logging
+import os
+import shutil
+import threading
+from datetime import date, timedelta
+from typing import BinaryIO, Iterator, Optional, Tuple
+
+from sqlalchemy import and_, or_, event, inspect
+from sqlalchemy.orm import Session
+
+from .catalog import read_catalog_version, bump_version_on_connection
+from .database import SessionLocal
+from .forecasting import DAY_NAMES
+from .models import Subscription
+from .response_cache import GZIP_LEVEL, accepted_encodings, brotli
+
+logger = logging.getLogger(__name__)
+
+# Directory holding precomputed manifest files
+MANIFEST_DIR = "./manifests"
+
+# Rows fetched per round trip and encoded per streamed chunk
+MANIFEST_BATCH_SIZE = 1000
+
+# Seconds between checks that tomorrow's snapshot is current
+PRECOMPUTE_INTERVAL_SECONDS = 300
+
+# Shared version bumped by every subscription write that can change a manifest
+MANIFEST_VERSION = "subscriptions"
+
+# Subscription columns that are written to a manifest or decide who is on it
+MANIFEST_COLUMNS = (
+    "name", "phone", "plan", "meal_types", "allergies",
+    "delivery_days", "is_active", "pause_start_date", "pause_end_date"
+)
+
+MANIFEST_FIELDS = ["subscription_id", "name", "phone", "plan", "meal_types", "allergies"]
+
+MEDIA_TYPES = {
+    "csv": "text/csv",
+    "ndjson": "application/x-ndjson"
+}
+
+# File suffix of each snapshot variant, in order of preference; the
+# compressed ones are written next to the plain file and served as-is
+SNAPSHOT_SUFFIXES = {"br": ".br", "gzip": ".gz", "identity": ""}
+
+# Below the cached-body maximum of 11, which is too slow for manifests of many MB
+SNAPSHOT_BROTLI_QUALITY = 9
+
+# Bytes read per chunk when compressing or serving a snapshot
+SNAPSHOT_CHUNK_SIZE = 64 * 1024
+
+def compress_file(source: str, target: str, encoding: str):
+    """Write a gzip or brotli copy of a file, chunk by chunk"""
+    with open(source, "rb") as src, open(target, "wb") as dst:
+        if encoding == "gzip":
+            with gzip.GzipFile(fileobj=dst, mode="wb", compresslevel=GZIP_LEVEL, mtime=0) as compressed:
+                shutil.copyfileobj(src, compressed, SNAPSHOT_CHUNK_SIZE)
+            return
+        compressor = brotli.Compressor(quality=SNAPSHOT_BROTLI_QUALITY)
+        while chunk := src.read(SNAPSHOT_CHUNK_SIZE):
+            dst.write(compressor.process(chunk))
+        dst.write(compressor.finish())
+
+def iter_file(file: BinaryIO) -> Iterator[bytes]:
+    """Read an opened snapshot to the end, then close it"""
+    try:
+        while chunk := file.read(SNAPSHOT_CHUNK_SIZE):
+            yield chunk
+    finally:
+        file.close()
+
+class ManifestSnapshots:
+    """Tracks which on-disk manifest snapshots are still current.
+
+    Every subscription write that can change a manifest bumps the shared
+    subscriptions version in the same transaction. Snapshot files are named after the version they were
+    built at, so every worker process can tell whether one is current.
+    Each snapshot is stored plain and precompressed with gzip (and brotli
+    when installed), so serving one never compresses on the fly.
+    """
+
+    def __init__(self):
+        self._build_lock = threading.Lock()
+
+    def path(self, day: date, fmt: str, version: int) -> str:
+        return os.path.join(MANIFEST_DIR, f"manifest-{day.isoformat()}-v{version}.{fmt}")
+
+    def current_path(self, db: Session, day: date, fmt: str) -> Optional[str]:
+        """Return the snapshot path if it is ready and up to date"""
+        path = self.path(day, fmt, read_catalog_version(db, MANIFEST_VERSION))
+        return path if os.path.exists(path) else None
+
+    def open_current(
+        self, db: Session, day: date, fmt: str, accept_encoding: str
+    ) -> Optional[Tuple[BinaryIO, str, int]]:
+        """Open the current snapshot in the best accepted encoding.
+
+        Returns (file, encoding, size), or None when there is no current
+        snapshot. The file is opened here, so a newer build removing it
+        afterwards cannot cut the response short.
+        """
+        path = self.current_path(db, day, fmt)
+        if path is None:
+            return None
+        accepted = accepted_encodings(accept_encoding)
+        wildcard = accepted.get("*", 0.0)
+        for encoding, suffix in SNAPSHOT_SUFFIXES.items():
+            if encoding != "identity" and accepted.get(encoding, wildcard) <= 0:
+                continue
+            try:
+                file = open(path + suffix, "rb")
+            except FileNotFoundError:
+                # Not built with this encoding, or removed since current_path()
+                continue
+            return file, encoding, os.fstat(file.fileno()).st_size
+        return None
+
+    def build(self, day: date, fmt: str):
+        """Write the manifest for a day to disk, replacing the old files atomically"""
+        os.makedirs(MANIFEST_DIR, exist_ok=True)
+        db = SessionLocal()
+        # Read before the rows: a write committed in between only makes the
+        # file newer than its name says, never older
+        path = self.path(day, fmt, read_catalog_version(db, MANIFEST_VERSION))
+        encodings = [encoding for encoding in ("gzip", "br") if encoding != "br" or brotli is not None]
+        # Per process, since several workers may build the same snapshot
+        tmp_paths = {
+            encoding: f"{path}{SNAPSHOT_SUFFIXES[encoding]}.{os.getpid()}.tmp"
+            for encoding in ["identity"] + encodings
+        }
+        try:
+            with open(tmp_paths["identity"], "w", encoding="utf-8", newline="") as f:
+                for chunk in iter_manifest(db, day, fmt):
+                    f.write(chunk)
+            for encoding in encodings:
+                compress_file(tmp_paths["identity"], tmp_paths[encoding], encoding)
+                os.replace(tmp_paths[encoding], path + SNAPSHOT_SUFFIXES[encoding])
+            # Last, since the plain file is what marks the snapshot as current
+            os.replace(tmp_paths["identity"], path)
+        finally:
+            db.close()
+            for tmp_path in tmp_paths.values():
+                if os.path.exists(tmp_path):
+                    os.remove(tmp_path)
+        self._remove_superseded(day, fmt, path)
+
+    def _remove_superseded(self, day: date, fmt: str, current: str):
+        """Delete older versions of this snapshot and snapshots for days that have passed"""
+        prefix = f"manifest-{day.isoformat()}-v"
+        for filename in os.listdir(MANIFEST_DIR):
+            if not filename.startswith("manifest-") or filename.endswith(".tmp"):
+                continue
+            path = os.path.join(MANIFEST_DIR, filename)
+            snapshot = filename
+            for suffix in SNAPSHOT_SUFFIXES.values():
+                if suffix and snapshot.endswith(suffix):
+                    snapshot = snapshot[:-len(suffix)]
+            superseded = (
+                snapshot.startswith(prefix)
+                and snapshot.endswith(f".{fmt}")
+                and os.path.join(MANIFEST_DIR, snapshot) != current
+            )
+            if superseded or filename[len("manifest-"):len("manifest-") + 10] < date.today().isoformat():
+                try:
+                    os.remove(path)
+                except FileNotFoundError:
+                    pass
+
+    def ensure(self, day: date):
+        """Build any snapshot for the day that is missing or stale"""
+        with self._build_lock:
+            db = SessionLocal()
+            try:
+                missing = [fmt for fmt in MEDIA_TYPES if self.current_path(db, day, fmt) is None]
+            finally:
+                db.close()
+            for fmt in missing:
+                self.build(day, fmt)
+
+manifest_snapshots = ManifestSnapshots()
+
+def _pauses_from_today(start: Optional[date], end: Optional[date]) -> bool:
+    """Whether a pause window takes the subscription off any manifest from today on"""
+    return start is not None and (end is None or end >= date.today())
+
+def changes_manifests(target: Subscription) -> bool:
+    """Whether an update can change a manifest for today or later, the only days with snapshots.
+
+    Writes that only touch other columns, such as the price or cancelled_at,
+    and pause windows moved entirely within the past leave every snapshot
+    current, so they need not bump the shared version.
+    """
+    state = inspect(target)
+    changed = {name for name in MANIFEST_COLUMNS if state.attrs[name].history.has_changes()}
+    if not changed <= {"pause_start_date", "pause_end_date"}:
+        return True
+
+    for name in ("pause_start_date", "pause_end_date"):
+        history = state.attrs[name].history
+        if history.added and not history.deleted:
+            # Set without the old value loaded, so the old window is unknown
+            return True
+
+    def before(name: str):
+        history = state.attrs[name].history
+        values = history.deleted or history.unchanged
+        return values[0] if values else None
+
+    return (
+        _pauses_from_today(before("pause_start_date"), before("pause_end_date"))
+        or _pauses_from_today(target.pause_start_date, target.pause_end_date)
+    )
+
+@event.listens_for(Subscription, "after_insert")
+@event.listens_for(Subscription, "after_delete")
+def _subscription_added_or_removed(mapper, connection, target):
+    bump_version_on_connection(connection, MANIFEST_VERSION)
+
+@event.listens_for(Subscription, "after_update")
+def _subscription_changed(mapper, connection, target):
+    if changes_manifests(target):
+        bump_version_on_connection(connection, MANIFEST_VERSION)
+
+def manifest_query(db: Session, day: date):
+    """Subscriptions delivering on a day: active, scheduled that weekday and not paused"""
+    weekday = DAY_NAMES[day.weekday()]
+    return db.query(
+        Subscription.id,
+        Subscription.name,
+        Subscription.phone,
+        Subscription.plan,
+        Subscription.meal_types,
+        Subscription.allergies
+    ).filter(
+        Subscription.is_active == True,
+        Subscription.delivery_days.like(f'%"{weekday}"%'),
+        or_(
+            Subscription.pause_start_date.is_(None),
+            and_(
+                Subscription.pause_end_date.isnot(None),
+                or_(
+                    Subscription.pause_end_date < day,
+                    Subscription.pause_start_date > day
+                )
+            )
+        )
+    ).order_by(Subscription.id).execution_options(
+        # Server-side cursor where the driver supports it (psycopg2)
+        stream_results=True,
+        yield_per=MANIFEST_BATCH_SIZE
+    )
+
+def iter_manifest(db: Session, day: date, fmt: str = "csv") -> Iterator[str]:
+    """Yield the manifest for a day as encoded chunks of at most one batch"""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    if fmt == "csv":
+        writer.writerow(MANIFEST_FIELDS)
+
+    rows = 0
+    for subscription_id, name, phone, plan, meal_types, allergies in manifest_query(db, day):
+        if fmt == "csv":
+            writer.writerow([subscription_id, name, phone, plan, " ".join(json.loads(meal_types)), allergies or ""])
+        else:
+            buffer.write(json.dumps({
+                "subscription_id": subscription_id,
+                "name": name,
+                "phone": phone,
+                "plan": plan,
+                "meal_types": json.loads(meal_types),
+                "allergies": allergies
+            }))
+            buffer.write("\n")
+        rows += 1
+        if rows % MANIFEST_BATCH_SIZE == 0:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+
+    if buffer.tell():
+        yield buffer.getvalue()
+
+def stream_manifest(day: date, fmt: str) -> Iterator[str]:
+    """Stream a manifest with a session owned by the stream itself"""
+    db = SessionLocal()
+    try:
+        yield from iter_manifest(db, day, fmt)
+    finally:
+        db.close()
+
+async def precompute_manifests():
+    """Keep tomorrow's manifest snapshot current (runs for the app's lifetime)"""
+    loop = asyncio.get_running_loop()
+    while True:
+        try:
+            await loop.run_in_executor(None, manifest_snapshots.ensure, date.today() + timedelta(days=1))
+        except Exception:
+            logger.exception("Manifest precompute failed")
+        await asyncio.sleep(PRECOMPUTE_INTERVAL_SECONDS)
@@ -0,0 +1,92 @@
+import csv
+import io
+import json
+from typing import Dict, List
+
+from sqlalchemy import func
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session
+
+from .models import MealPlan
+from .schemas import MealPlanCreate
+
+# Rows per INSERT statement, well under SQLite's bound-parameter limit
+UPSERT_CHUNK_SIZE = 500
+
+# Columns overwritten when a plan with the same name already exists;
+# is_active is left alone so an import never re-enables a retired plan
+UPSERT_COLUMNS = ["description", "price_per_meal", "plan_type", "features"]
+
+def parse_features(value: str) -> List[str]:
+    """CSV features cell: a JSON array, or feature names separated by '|'"""
+    value = (value or "").strip()
+    if not value:
+        return []
+    if value.startswith("["):
+        return json.loads(value)
+    return [feature.strip() for feature in value.split("|") if feature.strip()]
+
+def parse_meal_plans(content: str, file_format: str) -> List[MealPlanCreate]:
+    """Validate meal plans from JSON (a list, or {"meal_plans": [...]}) or CSV text"""
+    if file_format == "json":
+        data = json.loads(content)
+        if isinstance(data, dict):
+            data = data.get("meal_plans", [])
+        rows = data
+    elif file_format == "csv":
+        rows = []
+        for row in csv.DictReader(io.StringIO(content)):
+            row["features"] = parse_features(row.get("features"))
+            rows.append(row)
+    else:
+        raise ValueError(f"Unsupported import format: {file_format}")
+
+    meal_plans = []
+    for number, row in enumerate(rows, start=1):
+        try:
+            meal_plans.append(MealPlanCreate(**row))
+        except Exception as e:
+            raise ValueError(f"Meal plan {number}: {str(e)}")
+    return meal_plans
+
+def _insert(db: Session):
+    dialect_name = db.get_bind().dialect.name
+    if dialect_name == "sqlite":
+        return sqlite.insert
+    if dialect_name == "postgresql":
+        return postgresql.insert
+    raise ValueError(f"Meal plan import is not supported on {dialect_name}")
+
+def upsert_meal_plans(db: Session, meal_plans: List[MealPlanCreate]) -> Dict[str, int]:
+    """Insert or update meal plans by name with INSERT ... ON CONFLICT.
+
+    Runs in the caller's transaction; the caller bumps the catalog version
+    and commits. When a name appears twice the last entry wins.
+    """
+    insert = _insert(db)
+    rows = {}
+    for meal_plan in meal_plans:
+        rows[meal_plan.name] = {
+            "name": meal_plan.name,
+            "description": meal_plan.description,
+            "price_per_meal": meal_plan.price_per_meal,
+            "plan_type": meal_plan.plan_type,
+            "features": meal_plan.features if meal_plan.features else None,
+            "is_active": True
+        }
+    names = list(rows)
+    rows = list(rows.values())
+
+    existing = 0
+    for start in range(0, len(names), UPSERT_CHUNK_SIZE):
+        existing += db.query(func.count(MealPlan.id)).filter(
+            MealPlan.name.in_(names[start:start + UPSERT_CHUNK_SIZE])
+        ).scalar()
+
+    for start in range(0, len(rows), UPSERT_CHUNK_SIZE):
+        statement = insert(MealPlan.__table__).values(rows[start:start + UPSERT_CHUNK_SIZE])
+        set_ = {column: statement.excluded[column] for column in UPSERT_COLUMNS}
+        set_["updated_at"] = func.now()
+        db.execute(statement.on_conflict_do_update(index_elements=["name"], set_=set_))
+
+    return {"created": len(rows) - existing, "updated": existing, "total": len(rows)}
\ No newline at end of file
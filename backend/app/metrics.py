@@ -0,0 +1,228 @@
+import bisect
+import threading
+import time
+from typing import Dict, List, Tuple
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from sqlalchemy.pool import QueuePool
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+# Upper bounds (seconds) of the request latency histogram buckets
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+# Upper bounds (seconds) of the DB pool checkout wait buckets
+POOL_WAIT_BUCKETS = (0.0001, 0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0, 30.0)
+
+# Upper bounds (seconds) of the buckets for how long a connection stays checked out
+POOL_HOLD_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 5.0, 30.0)
+
+# Label for requests that matched no route, so unknown URLs cannot
+# create a new series each
+UNMATCHED_ROUTE = "unmatched"
+
+class Histogram:
+    """Cumulative-bucket histogram in the Prometheus sense.
+
+    observe() takes no lock: callers either record from the event loop
+    thread only, or hold their own lock.
+    """
+
+    __slots__ = ("bounds", "counts", "sum", "count")
+
+    def __init__(self, bounds: Tuple[float, ...]):
+        self.bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float):
+        self.counts[bisect.bisect_left(self.bounds, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def cumulative(self) -> List[Tuple[str, int]]:
+        """(le, count) pairs including +Inf"""
+        total = 0
+        buckets = []
+        for bound, count in zip(self.bounds + (float("inf"),), self.counts):
+            total += count
+            buckets.append(("+Inf" if bound == float("inf") else repr(bound), total))
+        return buckets
+
+class RequestMetrics:
+    """Per-process HTTP and database metrics"""
+
+    def __init__(self):
+        self.requests: Dict[Tuple[str, str, int], int] = {}
+        self.latency: Dict[Tuple[str, str], Histogram] = {}
+        self.in_progress = 0
+        self.pool_wait = Histogram(POOL_WAIT_BUCKETS)
+        self.pool_hold = Histogram(POOL_HOLD_BUCKETS)
+        self._pool_lock = threading.Lock()
+
+    def record_request(self, method: str, route: str, status: int, seconds: float):
+        key = (method, route, status)
+        self.requests[key] = self.requests.get(key, 0) + 1
+        histogram = self.latency.get((method, route))
+        if histogram is None:
+            histogram = self.latency[(method, route)] = Histogram(LATENCY_BUCKETS)
+        histogram.observe(seconds)
+
+    def record_pool_wait(self, seconds: float):
+        # Checkouts happen on threadpool threads, unlike request recording
+        with self._pool_lock:
+            self.pool_wait.observe(seconds)
+
+    def record_pool_hold(self, seconds: float):
+        with self._pool_lock:
+            self.pool_hold.observe(seconds)
+
+request_metrics = RequestMetrics()
+
+class InstrumentedQueuePool(QueuePool):
+    """QueuePool that records how long each checkout waited for a connection.
+
+    How long each connection stays checked out is recorded by the checkout
+    and checkin listeners below.
+    """
+
+    def connect(self):
+        start = time.perf_counter()
+        try:
+            return super().connect()
+        finally:
+            request_metrics.record_pool_wait(time.perf_counter() - start)
+
+# Registered on the class, so pools recreated by engine.dispose() keep them
+@event.listens_for(InstrumentedQueuePool, "checkout")
+def _start_hold(dbapi_connection, connection_record, connection_proxy):
+    connection_record.info["checked_out_at"] = time.perf_counter()
+
+@event.listens_for(InstrumentedQueuePool, "checkin")
+def _end_hold(dbapi_connection, connection_record):
+    start = connection_record.info.pop("checked_out_at", None)
+    if start is not None:
+        request_metrics.record_pool_hold(time.perf_counter() - start)
+
+class MetricsMiddleware:
+    """Count requests and time them by method, route template and status"""
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status = 500
+
+        async def send_with_status(message: Message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        metrics = request_metrics
+        metrics.in_progress += 1
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            metrics.in_progress -= 1
+            route = scope.get("route")
+            metrics.record_request(
+                scope["method"],
+                getattr(route, "path", UNMATCHED_ROUTE),
+                status,
+                time.perf_counter() - start
+            )
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+def _labels(**labels) -> str:
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in labels.items()) + "}"
+
+def _histogram_lines(name: str, histogram: Histogram, **labels) -> List[str]:
+    lines = [f"{name}_bucket{_labels(**labels, le=le)} {count}" for le, count in histogram.cumulative()]
+    lines.append(f"{name}_sum{_labels(**labels)} {histogram.sum}")
+    lines.append(f"{name}_count{_labels(**labels)} {histogram.count}")
+    return lines
+
+def render_metrics(engine: Engine, threadpool_limiter=None, route_limits=()) -> str:
+    """All metrics of this process in the Prometheus text exposition format"""
+    metrics = request_metrics
+    lines = [
+        "# HELP http_requests_total Requests handled, by method, route template and status.",
+        "# TYPE http_requests_total counter"
+    ]
+    for (method, route, status), count in sorted(metrics.requests.items()):
+        lines.append(f"http_requests_total{_labels(method=method, route=route, status=status)} {count}")
+
+    lines += [
+        "# HELP http_request_duration_seconds Request latency, by method and route template.",
+        "# TYPE http_request_duration_seconds histogram"
+    ]
+    for (method, route), histogram in sorted(metrics.latency.items()):
+        lines += _histogram_lines("http_request_duration_seconds", histogram, method=method, route=route)
+
+    lines += [
+        "# HELP http_requests_in_progress Requests currently being handled.",
+        "# TYPE http_requests_in_progress gauge",
+        f"http_requests_in_progress {metrics.in_progress}",
+        "# HELP db_pool_checkout_wait_seconds Time spent waiting for a database connection.",
+        "# TYPE db_pool_checkout_wait_seconds histogram"
+    ]
+    with metrics._pool_lock:
+        lines += _histogram_lines("db_pool_checkout_wait_seconds", metrics.pool_wait)
+        lines += [
+            "# HELP db_pool_connection_hold_seconds Time a connection stayed checked out before it was returned.",
+            "# TYPE db_pool_connection_hold_seconds histogram"
+        ]
+        lines += _histogram_lines("db_pool_connection_hold_seconds", metrics.pool_hold)
+
+    pool = engine.pool
+    if isinstance(pool, QueuePool):
+        lines += [
+            "# HELP db_pool_size Configured connection pool size.",
+            "# TYPE db_pool_size gauge",
+            f"db_pool_size {pool.size()}",
+            "# HELP db_pool_checked_out Connections currently checked out.",
+            "# TYPE db_pool_checked_out gauge",
+            f"db_pool_checked_out {pool.checkedout()}",
+            "# HELP db_pool_overflow Connections open beyond the pool size.",
+            "# TYPE db_pool_overflow gauge",
+            f"db_pool_overflow {max(pool.overflow(), 0)}"
+        ]
+
+    if threadpool_limiter is not None:
+        statistics = threadpool_limiter.statistics()
+        lines += [
+            "# HELP threadpool_threads Threads available to sync endpoints and dependencies.",
+            "# TYPE threadpool_threads gauge",
+            f"threadpool_threads {int(threadpool_limiter.total_tokens)}",
+            "# HELP threadpool_threads_busy Threads currently running sync work.",
+            "# TYPE threadpool_threads_busy gauge",
+            f"threadpool_threads_busy {statistics.borrowed_tokens}",
+            "# HELP threadpool_tasks_waiting Sync calls queued for a free thread.",
+            "# TYPE threadpool_tasks_waiting gauge",
+            f"threadpool_tasks_waiting {statistics.tasks_waiting}"
+        ]
+
+    if route_limits:
+        series = [
+            ("route_group_limit", "Concurrent requests allowed per route group.", "gauge", "limit"),
+            ("route_group_in_progress", "Requests holding a slot of the route group.", "gauge", "active"),
+            ("route_group_queue_depth", "Requests waiting for a slot of the route group.", "gauge", "queued"),
+            ("route_group_rejected_total", "Requests answered with 503 because the route group was saturated.", "counter", "rejected")
+        ]
+        for name, help_text, kind, attribute in series:
+            lines += [f"# HELP {name} {help_text}", f"# TYPE {name} {kind}"]
+            for limit in route_limits:
+                lines.append(f"{name}{_labels(group=limit.name)} {getattr(limit, attribute)}")
+
+    return "\n".join(lines) + "\n"
\ No newline at end of file
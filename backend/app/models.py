@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Text, Float, DateTime, Boolean, ForeignKey, Date
+from sqlalchemy import Column, Integer, String, Text, Float, DateTime, Boolean, ForeignKey, Date, JSON
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from .database import Base
@@ -34,6 +34,7 @@ class Subscription(Base):
     is_active = Column(Boolean, default=True)
     pause_start_date = Column(Date, nullable=True)  # New field for pause start date
     pause_end_date = Column(Date, nullable=True)    # New field for pause end date
+    cancelled_at = Column(DateTime(timezone=True), nullable=True)  # Set when deactivated; churn is dated by it
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
 
@@ -54,6 +55,32 @@ class Testimonial(Base):
     # Relationships
     user = relationship("User", back_populates="testimonials")
 
+class TestimonialScore(Base):
+    __tablename__ = "testimonial_scores"
+
+    # Written by the moderation worker after a testimonial is submitted
+    testimonial_id = Column(Integer, ForeignKey("testimonials.id", ondelete="CASCADE"), primary_key=True)
+    score = Column(Float, nullable=False)  # 0 (looks fine) to 1 (likely spam)
+    reasons = Column(Text, nullable=True)  # JSON list of triggered heuristics
+    content_hash = Column(String(64), nullable=False, index=True)
+    scored_at = Column(DateTime(timezone=True), server_default=func.now())
+
+class TestimonialStats(Base):
+    __tablename__ = "testimonial_stats"
+
+    # Single row (id 1) maintained alongside every testimonial write
+    id = Column(Integer, primary_key=True)
+    total = Column(Integer, nullable=False, default=0)
+    approved = Column(Integer, nullable=False, default=0)
+    pending = Column(Integer, nullable=False, default=0)
+    rating_sum = Column(Integer, nullable=False, default=0)  # Sum of approved ratings
+    star_1 = Column(Integer, nullable=False, default=0)  # Approved testimonials per rating
+    star_2 = Column(Integer, nullable=False, default=0)
+    star_3 = Column(Integer, nullable=False, default=0)
+    star_4 = Column(Integer, nullable=False, default=0)
+    star_5 = Column(Integer, nullable=False, default=0)
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+
 class MealPlan(Base):
     __tablename__ = "meal_plans"
 
@@ -62,7 +89,14 @@ class MealPlan(Base):
     description = Column(Text, nullable=False)
     price_per_meal = Column(Float, nullable=False)
     plan_type = Column(String(50), nullable=False)  # diet, protein, royal
-    features = Column(Text, nullable=True)  # JSON string of features
+    features = Column(JSON(none_as_null=True), nullable=True)  # List of features
     is_active = Column(Boolean, default=True)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
-    updated_at = Column(DateTime(timezone=True), onupdate=func.now()) 
\ No newline at end of file
+    updated_at = Column(DateTime(timezone=True), onupdate=func.now()) 
+
+class CatalogVersion(Base):
+    __tablename__ = "catalog_versions"
+
+    # Bumped on every change so each worker process knows when to reload its copy
+    name = Column(String(50), primary_key=True)
+    version = Column(Integer, nullable=False, default=0)
\ No newline at end of file
@@ -0,0 +1,217 @@
+import bisect
+import hashlib
+import html
+import json
+import logging
+import os
+import re
+import threading
+from collections import deque
+from datetime import timedelta
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy import exists
+from sqlalchemy.orm import Session
+
+from .database import SessionLocal
+from .models import Testimonial, TestimonialScore
+
+logger = logging.getLogger(__name__)
+
+# "thread" scores testimonials in a background thread of the API process;
+# "external" leaves it to a separate `python moderation_worker.py` process
+MODERATION_WORKER = os.getenv("MODERATION_WORKER", "thread")
+
+# Testimonials scored per transaction
+SCORE_BATCH_SIZE = 200
+
+# Seconds the worker sleeps when no new testimonials arrive
+POLL_INTERVAL_SECONDS = 5
+
+# Recent submissions kept in memory for near-duplicate detection
+FINGERPRINT_WINDOW = 1000
+
+# Jaccard similarity of word shingles above which a message is a near duplicate
+NEAR_DUPLICATE_THRESHOLD = 0.8
+
+# Submissions per user per hour above which each new one is suspicious
+RATE_LIMIT_PER_HOUR = 3
+
+LINK_PATTERN = re.compile(r'https?://|www\.|\b[\w-]+\.(com|net|org|io|xyz|info|ru)\b', re.IGNORECASE)
+REPEATED_CHARACTERS_PATTERN = re.compile(r'(.)\1{4,}')
+
+def normalize_text(text: str) -> str:
+    """Lowercase, unescape and collapse a message to its words"""
+    return " ".join(re.findall(r"\w+", html.unescape(text).lower()))
+
+def content_hash(text: str) -> str:
+    return hashlib.sha256(normalize_text(text).encode()).hexdigest()
+
+def shingles(text: str, size: int = 3) -> frozenset:
+    """Hashed word shingles of a normalized message"""
+    words = normalize_text(text).split()
+    if len(words) < size:
+        return frozenset([hash(" ".join(words))])
+    return frozenset(hash(" ".join(words[i:i + size])) for i in range(len(words) - size + 1))
+
+def similarity(a: frozenset, b: frozenset) -> float:
+    if not a or not b:
+        return 0.0
+    return len(a & b) / len(a | b)
+
+def score_message(
+    name: str,
+    message: str,
+    is_duplicate: bool,
+    is_near_duplicate: bool,
+    recent_submissions: int
+) -> Tuple[float, List[str]]:
+    """Combine the heuristics into a score between 0 and 1"""
+    score = 0.0
+    reasons = []
+    text = html.unescape(f"{name} {message}")
+
+    if is_duplicate:
+        score += 0.6
+        reasons.append("duplicate")
+    elif is_near_duplicate:
+        score += 0.4
+        reasons.append("near_duplicate")
+    if LINK_PATTERN.search(text):
+        score += 0.4
+        reasons.append("link")
+    if REPEATED_CHARACTERS_PATTERN.search(text):
+        score += 0.2
+        reasons.append("repeated_characters")
+    letters = [character for character in text if character.isalpha()]
+    if len(letters) >= 20 and sum(character.isupper() for character in letters) / len(letters) > 0.7:
+        score += 0.2
+        reasons.append("shouting")
+    if recent_submissions > RATE_LIMIT_PER_HOUR:
+        score += 0.3
+        reasons.append("submission_rate")
+
+    return min(score, 1.0), reasons
+
+class ModerationWorker:
+    """Scores unscored testimonials in batches, off the request path"""
+
+    def __init__(self):
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._fingerprints = deque(maxlen=FINGERPRINT_WINDOW)
+
+    def notify(self):
+        """Wake the worker after a testimonial is created"""
+        self._wake.set()
+
+    def start(self):
+        if self._thread is None or not self._thread.is_alive():
+            self._stop.clear()
+            self._thread = threading.Thread(target=self.run, name="moderation-worker", daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._wake.set()
+        if self._thread is not None:
+            self._thread.join(timeout=POLL_INTERVAL_SECONDS)
+
+    def run(self):
+        """Score batches until stopped, sleeping when there is nothing to do"""
+        while not self._stop.is_set():
+            try:
+                scored = self.score_pending()
+            except Exception:
+                logger.exception("Moderation worker failed")
+                scored = 0
+            if scored < SCORE_BATCH_SIZE:
+                self._wake.wait(POLL_INTERVAL_SECONDS)
+                self._wake.clear()
+
+    def score_pending(self) -> int:
+        """Score one batch of unscored testimonials; returns how many were scored"""
+        db = SessionLocal()
+        try:
+            testimonials = db.query(Testimonial).outerjoin(
+                TestimonialScore, TestimonialScore.testimonial_id == Testimonial.id
+            ).filter(
+                TestimonialScore.testimonial_id.is_(None)
+            ).order_by(Testimonial.id).limit(SCORE_BATCH_SIZE).all()
+            if not testimonials:
+                return 0
+
+            rows = self._score_batch(db, testimonials)
+            db.bulk_insert_mappings(TestimonialScore, rows)
+            # A testimonial rejected while its batch was being scored is already
+            # deleted, and SQLite does not enforce the ON DELETE CASCADE, so drop
+            # its score in the same transaction instead of leaving an orphan row
+            db.query(TestimonialScore).filter(
+                TestimonialScore.testimonial_id.in_([row["testimonial_id"] for row in rows]),
+                ~exists().where(Testimonial.id == TestimonialScore.testimonial_id)
+            ).delete(synchronize_session=False)
+            db.commit()
+            return len(testimonials)
+        finally:
+            db.close()
+
+    def _score_batch(self, db: Session, testimonials: List[Testimonial]) -> List[Dict]:
+        hashes = {testimonial.id: content_hash(testimonial.message) for testimonial in testimonials}
+        seen_hashes = {
+            value for value, in db.query(TestimonialScore.content_hash).filter(
+                TestimonialScore.content_hash.in_(set(hashes.values()))
+            )
+        }
+        submissions = self._submission_times(db, testimonials)
+
+        rows = []
+        for testimonial in testimonials:
+            fingerprint = shingles(testimonial.message)
+            is_duplicate = hashes[testimonial.id] in seen_hashes
+            is_near_duplicate = any(
+                similarity(fingerprint, previous) >= NEAR_DUPLICATE_THRESHOLD
+                for previous in self._fingerprints
+            )
+            score, reasons = score_message(
+                testimonial.name,
+                testimonial.message,
+                is_duplicate,
+                is_near_duplicate,
+                self._submissions_in_hour(submissions, testimonial)
+            )
+            seen_hashes.add(hashes[testimonial.id])
+            self._fingerprints.append(fingerprint)
+            rows.append({
+                "testimonial_id": testimonial.id,
+                "score": score,
+                "reasons": json.dumps(reasons),
+                "content_hash": hashes[testimonial.id]
+            })
+        return rows
+
+    def _submission_times(self, db: Session, testimonials: List[Testimonial]) -> Dict[int, list]:
+        """Sorted creation times per user covering the hour before each testimonial, in one query"""
+        created = [testimonial.created_at for testimonial in testimonials if testimonial.created_at]
+        if not created:
+            return {}
+        submissions = {}
+        for user_id, created_at in db.query(Testimonial.user_id, Testimonial.created_at).filter(
+            Testimonial.user_id.in_({testimonial.user_id for testimonial in testimonials}),
+            Testimonial.created_at >= min(created) - timedelta(hours=1),
+            Testimonial.created_at <= max(created)
+        ).order_by(Testimonial.created_at):
+            submissions.setdefault(user_id, []).append(created_at)
+        return submissions
+
+    def _submissions_in_hour(self, submissions: Dict[int, list], testimonial: Testimonial) -> int:
+        """Submissions by the same user in the hour up to this testimonial"""
+        times = submissions.get(testimonial.user_id, [])
+        if not testimonial.created_at:
+            return 0
+        return (
+            bisect.bisect_right(times, testimonial.created_at)
+            - bisect.bisect_left(times, testimonial.created_at - timedelta(hours=1))
+        )
+
+moderation_worker = ModerationWorker()
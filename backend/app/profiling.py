@@ -0,0 +1,281 @@
+import itertools
+import os
+import random
+import sys
+import threading
+import time
+from collections import Counter, deque
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List, Optional, Tuple
+
+import fastapi
+import starlette
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from .auth import create_access_token, verify_token
+from .metrics import UNMATCHED_ROUTE, request_metrics
+
+# Request header carrying a profiling token from POST /profiling/token
+PROFILE_HEADER = b"x-profile"
+PROFILE_TOKEN_SCOPE = "profile"
+PROFILE_TOKEN_MINUTES = 15
+
+# Profiles kept per worker process; the oldest is dropped first
+PROFILE_BUFFER_SIZE = int(os.getenv("PROFILE_BUFFER_SIZE", "20"))
+
+# Fraction of requests profiled without a token (0 disables sampling)
+PROFILE_SAMPLE_RATE = float(os.getenv("PROFILE_SAMPLE_RATE", "0"))
+
+# Time between stack samples. The GIL switch interval is left alone, as it
+# applies to the whole process: while other threads run Python code the
+# sampler only gets the GIL every sys.getswitchinterval() (5ms by default),
+# so such stretches are sampled more coarsely. Samples are weighted by the
+# request's duration, so the time per frame stays right.
+SAMPLE_INTERVAL_SECONDS = 0.001
+
+# Name anyio gives the threadpool threads that run sync endpoints and dependencies
+THREADPOOL_THREAD_NAME = "AnyIO worker thread"
+
+# Samples are kept only when the stack is handling a request. Idle threadpool
+# threads and the event loop waiting in select() never run code from these.
+REQUEST_CODE_PATHS = tuple(
+    os.path.dirname(path) + os.sep for path in (fastapi.__file__, starlette.__file__, __file__)
+)
+
+def create_profiling_token(admin_id: int) -> str:
+    """Short-lived token that lets requests carrying it be profiled"""
+    return create_access_token(
+        {"sub": str(admin_id), "scope": PROFILE_TOKEN_SCOPE},
+        expires_delta=timedelta(minutes=PROFILE_TOKEN_MINUTES)
+    )
+
+def is_profiling_token(token: str) -> bool:
+    payload = verify_token(token)
+    return payload is not None and payload.get("scope") == PROFILE_TOKEN_SCOPE
+
+class StackSampler:
+    """Samples the Python stacks of the event loop and threadpool threads.
+
+    cProfile only sees the thread that enabled it, while sync endpoints and
+    dependencies run in the threadpool, so stacks are sampled from a
+    background thread instead. Requests handled concurrently show up in the
+    same profile; the concurrent request count is recorded alongside it.
+    Other threads, such as the moderation worker, are left out.
+    """
+
+    def __init__(self, loop_thread_id: int, interval: float = SAMPLE_INTERVAL_SECONDS):
+        self.loop_thread_id = loop_thread_id
+        self.interval = interval
+        self.stacks: Dict[int, Counter] = {}
+        self._sampled_threads: Dict[int, bool] = {}
+        self.samples = 0
+        self.thread_names: Dict[int, str] = {}
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="profiler", daemon=True)
+
+    def start(self):
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+        self.thread_names = {thread.ident: thread.name for thread in threading.enumerate()}
+
+    def _is_sampled(self, thread_id: int) -> bool:
+        sampled = self._sampled_threads.get(thread_id)
+        if sampled is None:
+            # Only looked up once per thread
+            names = {thread.ident: thread.name for thread in threading.enumerate()}
+            sampled = thread_id == self.loop_thread_id or names.get(thread_id) == THREADPOOL_THREAD_NAME
+            self._sampled_threads[thread_id] = sampled
+        return sampled
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            self.samples += 1
+            for thread_id, frame in sys._current_frames().items():
+                if not self._is_sampled(thread_id):
+                    continue
+                stack = []
+                busy = False
+                while frame is not None:
+                    code = frame.f_code
+                    stack.append(code)
+                    busy = busy or code.co_filename.startswith(REQUEST_CODE_PATHS)
+                    frame = frame.f_back
+                if busy:
+                    stacks = self.stacks.get(thread_id)
+                    if stacks is None:
+                        stacks = self.stacks[thread_id] = Counter()
+                    # Root first, as flame graphs expect
+                    stacks[tuple(reversed(stack))] += 1
+
+class RequestProfile:
+    """Sampled stacks of one request, with route and timing metadata"""
+
+    def __init__(self, profile_id: str, method: str, path: str, trigger: str, concurrent_requests: int):
+        self.id = profile_id
+        self.method = method
+        self.path = path
+        self.route = UNMATCHED_ROUTE
+        self.status = 500
+        self.trigger = trigger
+        self.concurrent_requests = concurrent_requests
+        self.started_at = datetime.now(timezone.utc)
+        self.duration_ms = 0.0
+        self.samples = 0
+        self.pid = os.getpid()
+        self.threads: List[Tuple[str, Counter]] = []
+
+    def summary(self) -> dict:
+        return {
+            "id": self.id,
+            "method": self.method,
+            "path": self.path,
+            "route": self.route,
+            "status": self.status,
+            "trigger": self.trigger,
+            "started_at": self.started_at.isoformat(),
+            "duration_ms": round(self.duration_ms, 2),
+            "samples": self.samples,
+            "concurrent_requests": self.concurrent_requests,
+            "pid": self.pid
+        }
+
+    def _sample_ms(self) -> float:
+        return self.duration_ms / self.samples if self.samples else SAMPLE_INTERVAL_SECONDS * 1000
+
+    def speedscope(self) -> dict:
+        """https://www.speedscope.app file format, one sampled profile per thread"""
+        frames = []
+        frame_index = {}
+        sample_ms = self._sample_ms()
+        profiles = []
+        for thread_name, stacks in self.threads:
+            samples, weights = [], []
+            for stack, count in stacks.most_common():
+                indexes = []
+                for code in stack:
+                    index = frame_index.get(code)
+                    if index is None:
+                        index = frame_index[code] = len(frames)
+                        frames.append({"name": code.co_name, "file": code.co_filename, "line": code.co_firstlineno})
+                    indexes.append(index)
+                samples.append(indexes)
+                weights.append(round(count * sample_ms, 3))
+            profiles.append({
+                "type": "sampled",
+                "name": thread_name,
+                "unit": "milliseconds",
+                "startValue": 0,
+                "endValue": round(sum(weights), 3),
+                "samples": samples,
+                "weights": weights
+            })
+        return {
+            "$schema": "https://www.speedscope.app/file-format-schema.json",
+            "name": f"{self.method} {self.path} ({self.duration_ms:.1f} ms)",
+            "exporter": "sea-catering",
+            "activeProfileIndex": 0,
+            "shared": {"frames": frames},
+            "profiles": profiles
+        }
+
+    def collapsed(self) -> str:
+        """Folded stacks ("thread;frame;frame count"), as read by flamegraph.pl"""
+        lines = []
+        for thread_name, stacks in self.threads:
+            for stack, count in stacks.most_common():
+                frames = ";".join(f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})" for code in stack)
+                lines.append(f"{thread_name};{frames} {count}")
+        return "\n".join(lines) + "\n"
+
+class ProfileStore:
+    """Bounded ring buffer of the most recent profiles of this process"""
+
+    def __init__(self, size: int = PROFILE_BUFFER_SIZE):
+        self._profiles = deque(maxlen=size)
+        self._lock = threading.Lock()
+        self._ids = itertools.count(1)
+
+    def next_id(self) -> str:
+        return f"{os.getpid()}-{next(self._ids)}"
+
+    def add(self, profile: RequestProfile):
+        with self._lock:
+            self._profiles.append(profile)
+
+    def list(self) -> List[RequestProfile]:
+        with self._lock:
+            return list(reversed(self._profiles))
+
+    def get(self, profile_id: str) -> Optional[RequestProfile]:
+        with self._lock:
+            for profile in self._profiles:
+                if profile.id == profile_id:
+                    return profile
+        return None
+
+profile_store = ProfileStore()
+
+# One profile at a time: the sampler sees every thread anyway
+_capture_lock = threading.Lock()
+
+class ProfilingMiddleware:
+    """Profile requests that carry a valid X-Profile token, or a random sample.
+
+    Requests without the header cost one scan of the header list.
+    """
+
+    def __init__(self, app: ASGIApp, sample_rate: float = PROFILE_SAMPLE_RATE):
+        self.app = app
+        self.sample_rate = sample_rate
+
+    def _trigger(self, scope: Scope) -> Optional[str]:
+        for name, value in scope["headers"]:
+            if name == PROFILE_HEADER:
+                return "token" if is_profiling_token(value.decode("latin-1")) else None
+        if self.sample_rate and random.random() < self.sample_rate:
+            return "sampled"
+        return None
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        trigger = self._trigger(scope)
+        if trigger is None or not _capture_lock.acquire(blocking=False):
+            await self.app(scope, receive, send)
+            return
+        try:
+            await self._profile(scope, receive, send, trigger)
+        finally:
+            _capture_lock.release()
+
+    async def _profile(self, scope: Scope, receive: Receive, send: Send, trigger: str):
+        profile = RequestProfile(
+            profile_store.next_id(), scope["method"], scope["path"], trigger,
+            concurrent_requests=max(request_metrics.in_progress - 1, 0)
+        )
+
+        async def send_with_profile_id(message: Message):
+            if message["type"] == "http.response.start":
+                profile.status = message["status"]
+                message = {**message, "headers": list(message["headers"]) + [(b"x-profile-id", profile.id.encode())]}
+            await send(message)
+
+        sampler = StackSampler(threading.get_ident())
+        start = time.perf_counter()
+        sampler.start()
+        try:
+            await self.app(scope, receive, send_with_profile_id)
+        finally:
+            sampler.stop()
+            profile.duration_ms = (time.perf_counter() - start) * 1000
+            profile.route = getattr(scope.get("route"), "path", UNMATCHED_ROUTE)
+            profile.samples = sampler.samples
+            profile.threads = [
+                (f"{sampler.thread_names.get(thread_id, 'thread')} {thread_id}", stacks)
+                for thread_id, stacks in sampler.stacks.items()
+            ]
+            profile_store.add(profile)
\ No newline at end of file
@@ -0,0 +1,176 @@
+import gzip
+import hashlib
+import json
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple
+
+from fastapi import Request, Response
+
+try:
+    import brotli
+except ImportError:  # brotli is optional; gzip is always available
+    brotli = None
+
+# Bodies smaller than this are sent uncompressed
+COMPRESSION_MIN_SIZE = 500
+
+GZIP_LEVEL = 9
+BROTLI_QUALITY = 11
+
+def json_body(content: Any) -> bytes:
+    """Encode content exactly as FastAPI's JSONResponse does"""
+    return json.dumps(
+        content,
+        ensure_ascii=False,
+        allow_nan=False,
+        indent=None,
+        separators=(",", ":")
+    ).encode("utf-8")
+
+def compress(body: bytes, encoding: str) -> bytes:
+    if encoding == "br":
+        return brotli.compress(body, quality=BROTLI_QUALITY)
+    if encoding == "gzip":
+        return gzip.compress(body, compresslevel=GZIP_LEVEL, mtime=0)
+    raise ValueError(f"Unsupported content encoding: {encoding}")
+
+def accepted_encodings(accept_encoding: str) -> Dict[str, float]:
+    """Parse an Accept-Encoding header into {coding: q}"""
+    accepted = {}
+    for part in accept_encoding.split(","):
+        coding, _, params = part.strip().partition(";")
+        if not coding:
+            continue
+        quality = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                quality = float(params[2:])
+            except ValueError:
+                quality = 0.0
+        accepted[coding.strip().lower()] = quality
+    return accepted
+
+def choose_encoding(request: Request, size: int) -> str:
+    """Pick br, gzip or identity for a body of the given size"""
+    return negotiate_encoding(request.headers.get("accept-encoding", ""), size)
+
+def negotiate_encoding(accept_encoding: str, size: int) -> str:
+    """Pick br, gzip or identity from an Accept-Encoding header value"""
+    if size < COMPRESSION_MIN_SIZE:
+        return "identity"
+    accepted = accepted_encodings(accept_encoding)
+    wildcard = accepted.get("*", 0.0)
+    for coding in ("br", "gzip"):
+        if coding == "br" and brotli is None:
+            continue
+        if accepted.get(coding, wildcard) > 0:
+            return coding
+    return "identity"
+
+class CachedBody:
+    """An encoded response body together with its strong ETag.
+
+    Compressed variants are produced on first use and kept with the body,
+    so each one is computed once per cached entry.
+    """
+
+    __slots__ = ("body", "etag", "media_type", "_variants", "_lock")
+
+    def __init__(self, body: bytes, media_type: str = "application/json"):
+        self.body = body
+        self.etag = '"' + hashlib.blake2b(body, digest_size=16).hexdigest() + '"'
+        self.media_type = media_type
+        self._variants: Dict[str, Tuple[bytes, str]] = {}
+        self._lock = threading.Lock()
+
+    def variant(self, encoding: str) -> Tuple[bytes, str]:
+        """Return (body, etag) for a content encoding"""
+        if encoding == "identity":
+            return self.body, self.etag
+        variant = self._variants.get(encoding)
+        if variant is None:
+            with self._lock:
+                variant = self._variants.get(encoding)
+                if variant is None:
+                    # Each representation needs its own strong ETag
+                    variant = (compress(self.body, encoding), f'{self.etag[:-1]}-{encoding}"')
+                    self._variants[encoding] = variant
+        return variant
+
+    def precompress(self) -> "CachedBody":
+        """Compute the compressed variants up front"""
+        if len(self.body) >= COMPRESSION_MIN_SIZE:
+            self.variant("gzip")
+            if brotli is not None:
+                self.variant("br")
+        return self
+
+class ResponseCache:
+    """Bounded in-memory cache of encoded response bodies.
+
+    Keys are tuples whose first element names the group of entries, so
+    everything rendered for one route can be dropped at once.
+    """
+
+    def __init__(self, max_entries: int = 512):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[tuple, CachedBody]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: tuple) -> Optional[CachedBody]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+            return entry
+
+    def set(self, key: tuple, entry: CachedBody) -> CachedBody:
+        with self._lock:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return entry
+
+    def get_or_render(self, key: tuple, render: Callable[[], bytes]) -> CachedBody:
+        """Return the cached body for key, rendering and storing it on a miss"""
+        entry = self.get(key)
+        if entry is None:
+            entry = self.set(key, CachedBody(render()))
+        return entry
+
+    def invalidate(self, group: Hashable):
+        """Drop every entry whose key starts with group"""
+        with self._lock:
+            for key in [key for key in self._entries if key[0] == group]:
+                del self._entries[key]
+
+def etag_matches(request: Request, etag: str) -> bool:
+    """Check an If-None-Match header against a strong ETag"""
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    candidates = [candidate.strip() for candidate in header.split(",")]
+    return "*" in candidates or etag in candidates or f"W/{etag}" in candidates
+
+def cached_response(request: Request, entry: CachedBody) -> Response:
+    """Serve a cached body in the best accepted encoding, or 304 Not Modified"""
+    encoding = choose_encoding(request, len(entry.body))
+    body, etag = entry.variant(encoding)
+    headers = {"ETag": etag, "Vary": "Accept-Encoding"}
+    if etag_matches(request, etag):
+        return Response(status_code=304, headers=headers)
+    if encoding != "identity":
+        headers["Content-Encoding"] = encoding
+    return Response(content=body, media_type=entry.media_type, headers=headers)
+
+def static_json_response(request: Request, key: tuple, content: Callable[[], Any]) -> Response:
+    """Serve JSON that only changes with the version in key, encoding it once"""
+    entry = response_cache.get(key)
+    if entry is None:
+        entry = response_cache.set(key, CachedBody(json_body(content())).precompress())
+    return cached_response(request, entry)
+
+response_cache = ResponseCache()
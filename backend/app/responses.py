@@ -0,0 +1,38 @@
+from typing import Any
+
+from fastapi.datastructures import Default, DefaultPlaceholder
+from fastapi.responses import JSONResponse
+from fastapi.routing import APIRoute
+
+try:
+    import orjson
+except ImportError:  # orjson is optional; the stdlib encoder is used without it
+    orjson = None
+
+class FastJSONResponse(JSONResponse):
+    """JSONResponse rendered with orjson when it is installed.
+
+    The bytes match JSONResponse: compact separators, UTF-8 instead of
+    \\u escapes, and datetime/date values as isoformat() strings. orjson
+    spells floats of 1e16 and above (or below 1e-4) without the "+" and
+    leading zero Python uses (1e16 vs 1e+16); no value this API returns
+    is in that range.
+    """
+
+    def render(self, content: Any) -> bytes:
+        if orjson is None:
+            return super().render(content)
+        return orjson.dumps(content, option=orjson.OPT_NON_STR_KEYS)
+
+class FastJSONRoute(APIRoute):
+    """Route whose default response class is FastJSONResponse.
+
+    The default stays a placeholder, so on FastAPI versions that serialize
+    response_model routes straight to bytes through Pydantic that faster
+    path is kept; only routes without a response_model use the class.
+    """
+
+    def __init__(self, *args, **kwargs):
+        if isinstance(kwargs.get("response_class"), DefaultPlaceholder):
+            kwargs["response_class"] = Default(FastJSONResponse)
+        super().__init__(*args, **kwargs)
\ No newline at end of file
@@ -2,10 +2,12 @@ from fastapi import APIRouter, Depends, HTTPException, status
 from fastapi.security import HTTPBearer
 from sqlalchemy.orm import Session
 from datetime import timedelta
+import logging
 import re
 from typing import Dict, Union, Any, List
 
 from ..database import get_db
+from ..responses import FastJSONRoute
 from ..models import User
 from ..schemas import UserCreate, UserLogin, User as UserSchema, Token, UserResponse
 from ..auth import (
@@ -19,7 +21,9 @@ from ..auth import (
     sanitize_input
 )
 
-router = APIRouter(prefix="/auth", tags=["authentication"])
+logger = logging.getLogger(__name__)
+
+router = APIRouter(prefix="/auth", tags=["authentication"], route_class=FastJSONRoute)
 
 @router.post("/register", response_model=UserResponse)
 def register_user(user: UserCreate, db: Session = Depends(get_db)):
@@ -223,8 +227,8 @@ def get_all_users(
             "total": total
         }
         
-    except Exception as e:
-        print("Error 213", e)
+    except Exception:
+        logger.exception("Failed to retrieve users")
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail="Failed to retrieve users"
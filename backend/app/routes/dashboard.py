@@ -1,16 +1,50 @@
-from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from fastapi.responses import StreamingResponse
+from fastapi.concurrency import run_in_threadpool
 from sqlalchemy.orm import Session
-from sqlalchemy import func, and_, or_
+from sqlalchemy import func, and_, or_, case
 from typing import Optional
 from datetime import datetime, date, timedelta
+import asyncio
 import json
 
 from ..database import get_db
+from ..responses import FastJSONRoute
 from ..models import Subscription, User
-from ..schemas import AdminDashboardResponse, DashboardMetrics
+from ..schemas import (
+    AdminDashboardResponse,
+    DashboardMetrics,
+    CohortRetention,
+    CohortAnalyticsResponse,
+    ForecastDay,
+    RevenueForecastResponse,
+    ProductionDay,
+    ProductionForecastResponse
+)
 from ..auth import get_current_admin_user
+from ..catalog import read_catalog_version
+from ..live_metrics import dashboard_counters
+from ..forecasting import forecast_revenue, forecast_production
+from ..manifests import manifest_snapshots, stream_manifest, iter_file, MEDIA_TYPES, MANIFEST_VERSION
 
-router = APIRouter(prefix="/dashboard", tags=["dashboard"])
+router = APIRouter(prefix="/dashboard", tags=["dashboard"], route_class=FastJSONRoute)
+
+# Seconds between keep-alive comments on the live counters stream
+LIVE_HEARTBEAT_SECONDS = 15
+
+# Longest date range accepted by the production forecast
+MAX_PRODUCTION_DAYS = 92
+
+def _month_bucket(column, dialect_name: str):
+    """SQL expression truncating a timestamp column to a 'YYYY-MM' label"""
+    if dialect_name == "postgresql":
+        return func.to_char(column, "YYYY-MM")
+    return func.strftime("%Y-%m", column)
+
+def _month_index(label: str) -> int:
+    """Convert a 'YYYY-MM' label to a sequential month number"""
+    year, month = label.split("-")
+    return int(year) * 12 + int(month) - 1
 
 @router.get("/admin/metrics", response_model=AdminDashboardResponse)
 def get_admin_dashboard_metrics(
@@ -162,4 +196,226 @@ def get_paused_subscriptions_count(
         }
         
     except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Error retrieving paused subscriptions count: {str(e)}") 
\ No newline at end of file
+        raise HTTPException(status_code=500, detail=f"Error retrieving paused subscriptions count: {str(e)}") 
+
+@router.get("/admin/analytics/cohorts", response_model=CohortAnalyticsResponse)
+def get_cohort_retention(
+    months: int = Query(12, ge=1, le=60, description="Number of signup months to include"),
+    plan: Optional[str] = Query(None, description="Restrict to a single plan (diet, protein, royal)"),
+    current_admin: User = Depends(get_current_admin_user),
+    db: Session = Depends(get_db)
+):
+    """Get retention matrix and churn rates per signup month and plan cohort"""
+    try:
+        today = date.today()
+        current_month = today.year * 12 + today.month - 1
+        first_month = current_month - months + 1
+        cohort_start = date(first_month // 12, first_month % 12 + 1, 1)
+
+        # Aggregate in the database so only one row per
+        # (cohort, plan, status, churn month) group reaches Python
+        dialect_name = db.get_bind().dialect.name
+        cohort = _month_bucket(Subscription.created_at, dialect_name)
+        # Churn is dated by the cancellation, not updated_at, which any
+        # later edit bumps. Rows cancelled before cancelled_at existed and
+        # never backfilled count as churned in their signup month.
+        churn_month = case(
+            (Subscription.is_active == True, None),
+            else_=_month_bucket(func.coalesce(Subscription.cancelled_at, Subscription.created_at), dialect_name)
+        )
+        paused = case(
+            (
+                and_(
+                    Subscription.is_active == True,
+                    Subscription.pause_start_date <= today,
+                    Subscription.pause_end_date >= today
+                ),
+                1
+            ),
+            else_=0
+        )
+
+        query = db.query(
+            cohort.label("cohort"),
+            Subscription.plan,
+            churn_month.label("churn_month"),
+            func.count(Subscription.id),
+            func.sum(paused)
+        ).filter(
+            Subscription.created_at >= datetime.combine(cohort_start, datetime.min.time())
+        )
+        if plan:
+            query = query.filter(Subscription.plan == plan)
+
+        rows = query.group_by(cohort, Subscription.plan, churn_month).all()
+
+        cells = {}
+        for cohort_label, plan_name, churn_label, count, paused_count in rows:
+            cell = cells.setdefault((cohort_label, plan_name), {"size": 0, "paused": 0, "churn": {}})
+            cell["size"] += count
+            cell["paused"] += paused_count or 0
+            if churn_label is not None:
+                offset = max(_month_index(churn_label) - _month_index(cohort_label), 0)
+                cell["churn"][offset] = cell["churn"].get(offset, 0) + count
+
+        cohorts = []
+        for (cohort_label, plan_name), cell in sorted(cells.items()):
+            age = current_month - _month_index(cohort_label)
+            retained = []
+            remaining = cell["size"]
+            for offset in range(age + 1):
+                remaining -= cell["churn"].get(offset, 0)
+                retained.append(remaining)
+            churned = cell["size"] - remaining
+            cohorts.append(CohortRetention(
+                cohort=cohort_label,
+                plan=plan_name,
+                size=cell["size"],
+                retained=retained,
+                retention=[round(r / cell["size"], 4) for r in retained],
+                churned=churned,
+                churn_rate=round(churned / cell["size"], 4),
+                paused=cell["paused"]
+            ))
+
+        return CohortAnalyticsResponse(
+            success=True,
+            message="Cohort retention retrieved successfully",
+            months=months,
+            cohorts=cohorts
+        )
+
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error retrieving cohort retention: {str(e)}")
+
+@router.get("/admin/live")
+async def stream_dashboard_counters(
+    current_admin: User = Depends(get_current_admin_user),
+    db: Session = Depends(get_db)
+):
+    """Stream active/paused/new-today/MRR counters as Server-Sent Events (admin only)"""
+    # get_db returns the connection used for authentication before the
+    # stream starts, so an open stream holds none
+    async def event_stream():
+        queue = dashboard_counters.subscribe()
+        try:
+            values = await run_in_threadpool(dashboard_counters.current)
+            yield dashboard_counters.format_event(values)
+            while True:
+                try:
+                    yield await asyncio.wait_for(queue.get(), timeout=LIVE_HEARTBEAT_SECONDS)
+                except asyncio.TimeoutError:
+                    # Triggers the periodic recount if due; any change reaches the queue
+                    await run_in_threadpool(dashboard_counters.current)
+                    yield ": keep-alive\n\n"
+        finally:
+            dashboard_counters.unsubscribe(queue)
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+@router.get("/admin/forecast/revenue", response_model=RevenueForecastResponse)
+def get_revenue_forecast(
+    weeks: int = Query(4, ge=1, le=26, description="Number of weeks to forecast"),
+    start_date: Optional[date] = Query(None, description="First forecast day (YYYY-MM-DD), defaults to today"),
+    current_admin: User = Depends(get_current_admin_user),
+    db: Session = Depends(get_db)
+):
+    """Forecast daily revenue and meal volume, excluding scheduled pause windows"""
+    try:
+        if not start_date:
+            start_date = date.today()
+        end_date = start_date + timedelta(weeks=weeks) - timedelta(days=1)
+
+        days = [ForecastDay(**day) for day in forecast_revenue(db, start_date, end_date)]
+
+        return RevenueForecastResponse(
+            success=True,
+            message="Revenue forecast retrieved successfully",
+            start_date=start_date,
+            end_date=end_date,
+            total_revenue=round(sum(day.revenue for day in days), 2),
+            total_meals=sum(day.meals for day in days),
+            days=days
+        )
+
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error retrieving revenue forecast: {str(e)}")
+
+@router.get("/admin/forecast/production", response_model=ProductionForecastResponse)
+def get_production_forecast(
+    start_date: Optional[date] = Query(None, description="First day (YYYY-MM-DD), defaults to today"),
+    end_date: Optional[date] = Query(None, description="Last day (YYYY-MM-DD), defaults to a week after start"),
+    current_admin: User = Depends(get_current_admin_user),
+    db: Session = Depends(get_db)
+):
+    """Get kitchen portion counts per day, plan and meal type"""
+    try:
+        if not start_date:
+            start_date = date.today()
+        if not end_date:
+            end_date = start_date + timedelta(days=6)
+
+        if start_date > end_date:
+            raise HTTPException(status_code=400, detail="Start date must be before end date")
+        if (end_date - start_date).days + 1 > MAX_PRODUCTION_DAYS:
+            raise HTTPException(status_code=400, detail=f"Date range cannot exceed {MAX_PRODUCTION_DAYS} days")
+
+        # Production from today on changes exactly when a manifest can
+        version = read_catalog_version(db, MANIFEST_VERSION)
+        days = [ProductionDay(**day) for day in forecast_production(db, start_date, end_date, version)]
+
+        return ProductionForecastResponse(
+            success=True,
+            message="Production forecast retrieved successfully",
+            start_date=start_date,
+            end_date=end_date,
+            days=days
+        )
+
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error retrieving production forecast: {str(e)}")
+
+@router.get("/admin/manifest")
+def get_delivery_manifest(
+    request: Request,
+    delivery_date: Optional[date] = Query(None, description="Delivery date (YYYY-MM-DD), defaults to today"),
+    format: str = Query("csv", pattern="^(csv|ndjson)$", description="Output format: csv or ndjson"),
+    current_admin: User = Depends(get_current_admin_user),
+    db: Session = Depends(get_db)
+):
+    """Get the delivery manifest for a date as CSV or NDJSON (admin only)"""
+    if not delivery_date:
+        delivery_date = date.today()
+
+    # Streamed with its own session; get_db returns this one's connection
+    # before the response is sent
+    snapshot = manifest_snapshots.open_current(
+        db, delivery_date, format, request.headers.get("accept-encoding", "")
+    )
+
+    filename = f"manifest-{delivery_date.isoformat()}.{format}"
+    headers = {"Content-Disposition": f'attachment; filename="{filename}"'}
+
+    if snapshot:
+        # Sent as stored; with Content-Encoding set the compression middleware passes it through
+        file, encoding, size = snapshot
+        headers.update({"Content-Length": str(size), "Vary": "Accept-Encoding"})
+        if encoding != "identity":
+            headers["Content-Encoding"] = encoding
+        return StreamingResponse(iter_file(file), media_type=MEDIA_TYPES[format], headers=headers)
+
+    return StreamingResponse(
+        stream_manifest(delivery_date, format),
+        media_type=MEDIA_TYPES[format],
+        headers=headers
+    )
\ No newline at end of file
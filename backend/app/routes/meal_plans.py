@@ -1,13 +1,26 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, File, HTTPException, Request, UploadFile
 from sqlalchemy.orm import Session
 from typing import List
-import json
 
 from ..database import get_db
-from ..models import MealPlan
-from ..schemas import MealPlanCreate, MealPlan as MealPlanSchema, MealPlanResponse, ListResponse
+from ..responses import FastJSONRoute
+from ..models import MealPlan, User
+from ..schemas import MealPlanCreate, MealPlan as MealPlanSchema, MealPlanResponse, ListResponse, MealPlanImportResponse
+from ..auth import get_current_admin_user
+from ..catalog import meal_plan_catalog, bump_catalog_version
+from ..meal_plan_import import parse_meal_plans, upsert_meal_plans
+from ..response_cache import response_cache, cached_response, static_json_response, CachedBody
 
-router = APIRouter(prefix="/meal-plans", tags=["meal-plans"])
+router = APIRouter(prefix="/meal-plans", tags=["meal-plans"], route_class=FastJSONRoute)
+
+PLAN_PRICES = {
+    "diet": 30000,
+    "protein": 40000,
+    "royal": 60000
+}
+
+# Bump when the price list or formula changes
+PRICES_VERSION = 1
 
 @router.post("/", response_model=MealPlanResponse)
 def create_meal_plan(meal_plan: MealPlanCreate, db: Session = Depends(get_db)):
@@ -18,95 +31,111 @@ def create_meal_plan(meal_plan: MealPlanCreate, db: Session = Depends(get_db)):
             description=meal_plan.description,
             price_per_meal=meal_plan.price_per_meal,
             plan_type=meal_plan.plan_type,
-            features=json.dumps(meal_plan.features) if meal_plan.features else None
+            features=meal_plan.features if meal_plan.features else None
         )
         
         db.add(db_meal_plan)
+        bump_catalog_version(db)
         db.commit()
         db.refresh(db_meal_plan)
         
-        # Convert JSON string back to list for response
-        if db_meal_plan.features:
-            db_meal_plan.features = json.loads(db_meal_plan.features)
+        snapshot = meal_plan_catalog.load(db)
         
         return MealPlanResponse(
             success=True,
             message="Meal plan created successfully",
-            meal_plan=db_meal_plan
+            meal_plan=snapshot.by_id[db_meal_plan.id]
         )
         
     except Exception as e:
         db.rollback()
         raise HTTPException(status_code=400, detail=str(e))
 
+@router.post("/import", response_model=MealPlanImportResponse)
+def import_meal_plans(
+    file: UploadFile = File(...),
+    db: Session = Depends(get_db),
+    current_admin: User = Depends(get_current_admin_user)
+):
+    """Upsert meal plans by name from a JSON or CSV file in one transaction (Admin only)"""
+    try:
+        file_format = "csv" if (file.filename or "").lower().endswith(".csv") else "json"
+        meal_plans = parse_meal_plans(file.file.read().decode("utf-8-sig"), file_format)
+        if not meal_plans:
+            raise HTTPException(status_code=400, detail="No meal plans found in file")
+
+        counts = upsert_meal_plans(db, meal_plans)
+        bump_catalog_version(db)
+        db.commit()
+        snapshot = meal_plan_catalog.load(db)
+
+        return MealPlanImportResponse(
+            success=True,
+            message=f"Imported {counts['total']} meal plans",
+            catalog_version=snapshot.version,
+            **counts
+        )
+
+    except HTTPException:
+        raise
+    except Exception as e:
+        db.rollback()
+        raise HTTPException(status_code=400, detail=str(e))
+
 @router.get("/", response_model=ListResponse)
 def get_meal_plans(
+    request: Request,
     active_only: bool = True, 
     skip: int = 0, 
-    limit: int = 100, 
-    db: Session = Depends(get_db)
+    limit: int = 100
 ):
     """Get meal plans with optional active filter"""
     try:
-        query = db.query(MealPlan)
-        
-        if active_only:
-            query = query.filter(MealPlan.is_active == True)
-        
-        meal_plans = query.order_by(MealPlan.created_at.desc()).offset(skip).limit(limit).all()
-        
-        # Convert JSON strings back to lists
-        for plan in meal_plans:
-            if plan.features:
-                plan.features = json.loads(plan.features)
-        
-        total = query.count()
-        
-        return ListResponse(
-            success=True,
-            message="Meal plans retrieved successfully",
-            data=meal_plans,
-            total=total
-        )
+        # Served from the in-memory catalog; the encoded page is reused
+        # until the catalog version changes
+        snapshot = meal_plan_catalog.snapshot
+        key = ("meal-plans:list", snapshot.version, active_only, skip, limit)
+        entry = response_cache.get(key)
+        if entry is None:
+            plans = snapshot.active_newest_first if active_only else snapshot.newest_first
+            body = ListResponse(
+                success=True,
+                message="Meal plans retrieved successfully",
+                data=list(plans[skip:skip + limit]),
+                total=len(plans)
+            ).model_dump_json().encode()
+            entry = response_cache.set(key, CachedBody(body).precompress())
+        
+        return cached_response(request, entry)
         
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
 
 @router.get("/{meal_plan_id}", response_model=MealPlanResponse)
-def get_meal_plan(meal_plan_id: int, db: Session = Depends(get_db)):
+def get_meal_plan(meal_plan_id: int):
     """Get a specific meal plan by ID"""
     try:
-        meal_plan = db.query(MealPlan).filter(MealPlan.id == meal_plan_id).first()
+        meal_plan = meal_plan_catalog.snapshot.by_id.get(meal_plan_id)
         
         if not meal_plan:
             raise HTTPException(status_code=404, detail="Meal plan not found")
         
-        # Convert JSON string back to list
-        if meal_plan.features:
-            meal_plan.features = json.loads(meal_plan.features)
-        
         return MealPlanResponse(
             success=True,
             message="Meal plan retrieved successfully",
             meal_plan=meal_plan
         )
         
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
 
 @router.get("/type/{plan_type}", response_model=ListResponse)
-def get_meal_plans_by_type(plan_type: str, db: Session = Depends(get_db)):
+def get_meal_plans_by_type(plan_type: str):
     """Get meal plans by type (diet, protein, royal)"""
     try:
-        meal_plans = db.query(MealPlan).filter(
-            MealPlan.plan_type == plan_type,
-            MealPlan.is_active == True
-        ).all()
-        
-        # Convert JSON strings back to lists
-        for plan in meal_plans:
-            if plan.features:
-                plan.features = json.loads(plan.features)
+        meal_plans = list(meal_plan_catalog.snapshot.by_type.get(plan_type, ()))
         
         return ListResponse(
             success=True,
@@ -128,7 +157,9 @@ def deactivate_meal_plan(meal_plan_id: int, db: Session = Depends(get_db)):
             raise HTTPException(status_code=404, detail="Meal plan not found")
         
         meal_plan.is_active = False
+        bump_catalog_version(db)
         db.commit()
+        meal_plan_catalog.load(db)
         
         return {"success": True, "message": "Meal plan deactivated successfully"}
         
@@ -146,7 +177,9 @@ def activate_meal_plan(meal_plan_id: int, db: Session = Depends(get_db)):
             raise HTTPException(status_code=404, detail="Meal plan not found")
         
         meal_plan.is_active = True
+        bump_catalog_version(db)
         db.commit()
+        meal_plan_catalog.load(db)
         
         return {"success": True, "message": "Meal plan activated successfully"}
         
@@ -155,14 +188,10 @@ def activate_meal_plan(meal_plan_id: int, db: Session = Depends(get_db)):
         raise HTTPException(status_code=400, detail=str(e))
 
 @router.get("/prices/")
-def get_plan_prices():
+def get_plan_prices(request: Request):
     """Get current plan prices"""
-    return {
+    return static_json_response(request, ("meal-plans:prices", PRICES_VERSION), lambda: {
         "success": True,
-        "prices": {
-            "diet": 30000,
-            "protein": 40000,
-            "royal": 60000
-        },
+        "prices": PLAN_PRICES,
         "formula": "Total Price = Plan Price × Number of Meal Types × Number of Delivery Days × 4.3"
-    } 
\ No newline at end of file
+    }) 
\ No newline at end of file
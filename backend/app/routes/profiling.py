@@ -0,0 +1,52 @@
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import PlainTextResponse
+
+from ..responses import FastJSONResponse, FastJSONRoute
+from ..models import User
+from ..auth import get_current_admin_user
+from ..profiling import PROFILE_BUFFER_SIZE, PROFILE_TOKEN_MINUTES, create_profiling_token, profile_store
+
+router = APIRouter(prefix="/profiling", tags=["profiling"], route_class=FastJSONRoute)
+
+@router.post("/token")
+def create_profile_token(current_admin: User = Depends(get_current_admin_user)):
+    """Issue a short-lived token; requests sent with it in X-Profile are profiled (admin only)"""
+    return {
+        "success": True,
+        "message": f"Send the token in the X-Profile header; it expires in {PROFILE_TOKEN_MINUTES} minutes",
+        "token": create_profiling_token(current_admin.id),
+        "header": "X-Profile",
+        "expires_in": PROFILE_TOKEN_MINUTES * 60
+    }
+
+@router.get("/profiles")
+def list_profiles(current_admin: User = Depends(get_current_admin_user)):
+    """Most recent profiles kept by the worker that answers, newest first (admin only)"""
+    profiles = profile_store.list()
+    return {
+        "success": True,
+        "message": f"Profiles retrieved successfully (the last {PROFILE_BUFFER_SIZE} of this worker are kept)",
+        "data": [profile.summary() for profile in profiles],
+        "total": len(profiles)
+    }
+
+@router.get("/profiles/{profile_id}")
+def download_profile(
+    profile_id: str,
+    format: str = Query("speedscope", pattern="^(speedscope|collapsed)$", description="speedscope JSON or collapsed stacks"),
+    current_admin: User = Depends(get_current_admin_user)
+):
+    """Download a profile for speedscope.app or flamegraph.pl (admin only)"""
+    profile = profile_store.get(profile_id)
+    if profile is None:
+        raise HTTPException(status_code=404, detail="Profile not found; it may have been dropped or taken by another worker")
+
+    if format == "collapsed":
+        return PlainTextResponse(
+            profile.collapsed(),
+            headers={"Content-Disposition": f'attachment; filename="profile-{profile_id}.txt"'}
+        )
+    return FastJSONResponse(
+        profile.speedscope(),
+        headers={"Content-Disposition": f'attachment; filename="profile-{profile_id}.speedscope.json"'}
+    )
\ No newline at end of file
@@ -1,15 +1,21 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Response, status
+from sqlalchemy import func
 from sqlalchemy.orm import Session
 from typing import List
 import json
+import logging
 from datetime import date
 
 from ..database import get_db
+from ..responses import FastJSONRoute
 from ..models import Subscription, User
-from ..schemas import SubscriptionBase, Subscription as SubscriptionSchema, SubscriptionResponse, ListResponse, PauseSubscriptionRequest
+from ..schemas import SubscriptionBase, Subscription as SubscriptionSchema, SubscriptionList, SubscriptionResponse, ListResponse, PauseSubscriptionRequest
 from ..auth import get_current_user, get_current_admin_user, sanitize_input
+from ..live_metrics import dashboard_counters, subscription_contribution
 
-router = APIRouter(prefix="/subscriptions", tags=["subscriptions"])
+logger = logging.getLogger(__name__)
+
+router = APIRouter(prefix="/subscriptions", tags=["subscriptions"], route_class=FastJSONRoute)
 
 def calculate_total_price(plan: str, meal_types: List[str], delivery_days: List[str]) -> float:
     """Calculate total price based on the formula"""
@@ -60,10 +66,7 @@ def create_subscription(
         db.add(db_subscription)
         db.commit()
         db.refresh(db_subscription)
-        
-        # Convert JSON strings back to lists for response
-        db_subscription.meal_types = json.loads(db_subscription.meal_types)
-        db_subscription.delivery_days = json.loads(db_subscription.delivery_days)
+        dashboard_counters.apply((0, 0, 0.0), subscription_contribution(db_subscription), created=True)
         
         return SubscriptionResponse(
             success=True,
@@ -85,16 +88,12 @@ def get_user_subscriptions(
         subscriptions = db.query(Subscription).filter(
             Subscription.user_id == current_user.id
         ).order_by(Subscription.created_at.desc()).all()
-        print("subscriptions 88", subscriptions)
-        # Convert JSON strings back to lists
-        for sub in subscriptions:
-            print("sub 88", sub)
-            sub.meal_types = json.loads(sub.meal_types)
-            sub.delivery_days = json.loads(sub.delivery_days)
-            print("delivery days 94", sub.delivery_days)
-        total = len(subscriptions)
-        print("Hasil return")
-        return subscriptions
+        logger.debug("Returning %d subscriptions for user %s", len(subscriptions), current_user.id)
+        # One pydantic-core pass over the rows, JSON columns included
+        return Response(
+            content=SubscriptionList.dump_json(SubscriptionList.validate_python(subscriptions, from_attributes=True)),
+            media_type="application/json"
+        )
         
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
@@ -115,10 +114,6 @@ def get_subscription(
         if not subscription:
             raise HTTPException(status_code=404, detail="Subscription not found")
         
-        # Convert JSON strings back to lists
-        subscription.meal_types = json.loads(subscription.meal_types)
-        subscription.delivery_days = json.loads(subscription.delivery_days)
-        
         return SubscriptionResponse(
             success=True,
             message="Subscription retrieved successfully",
@@ -146,8 +141,12 @@ def deactivate_subscription(
         if not subscription:
             raise HTTPException(status_code=404, detail="Subscription not found")
         
+        before = subscription_contribution(subscription)
+        if subscription.is_active:
+            subscription.cancelled_at = func.now()
         subscription.is_active = False
         db.commit()
+        dashboard_counters.apply(before, subscription_contribution(subscription))
         
         return {"success": True, "message": "Subscription deactivated successfully"}
         
@@ -209,9 +208,11 @@ def pause_subscription(
         if pause_request.pause_start_date < date.today():
             raise HTTPException(status_code=400, detail="Pause start date cannot be in the past")
         
+        before = subscription_contribution(subscription)
         subscription.pause_start_date = pause_request.pause_start_date
         subscription.pause_end_date = pause_request.pause_end_date
         db.commit()
+        dashboard_counters.apply(before, subscription_contribution(subscription))
         
         return {
             "success": True, 
@@ -246,9 +247,11 @@ def resume_subscription(
         if not subscription.pause_start_date or not subscription.pause_end_date:
             raise HTTPException(status_code=400, detail="Subscription is not paused")
         
+        before = subscription_contribution(subscription)
         subscription.pause_start_date = None
         subscription.pause_end_date = None
         db.commit()
+        dashboard_counters.apply(before, subscription_contribution(subscription))
         
         return {
             "success": True, 
@@ -273,14 +276,12 @@ def get_all_subscriptions(
     try:
         subscriptions = db.query(Subscription).offset(skip).limit(limit).all()
         
-        # Convert JSON strings back to lists
-        for sub in subscriptions:
-            sub.meal_types = json.loads(sub.meal_types)
-            sub.delivery_days = json.loads(sub.delivery_days)
-        
         total = db.query(Subscription).count()
         
-        return subscriptions
+        return Response(
+            content=SubscriptionList.dump_json(SubscriptionList.validate_python(subscriptions, from_attributes=True)),
+            media_type="application/json"
+        )
         
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
@@ -298,10 +299,6 @@ def get_any_subscription(
         if not subscription:
             raise HTTPException(status_code=404, detail="Subscription not found")
         
-        # Convert JSON strings back to lists
-        subscription.meal_types = json.loads(subscription.meal_types)
-        subscription.delivery_days = json.loads(subscription.delivery_days)
-        
         return SubscriptionResponse(
             success=True,
             message="Subscription retrieved successfully",
@@ -326,8 +323,12 @@ def admin_deactivate_subscription(
         if not subscription:
             raise HTTPException(status_code=404, detail="Subscription not found")
         
+        before = subscription_contribution(subscription)
+        if subscription.is_active:
+            subscription.cancelled_at = func.now()
         subscription.is_active = False
         db.commit()
+        dashboard_counters.apply(before, subscription_contribution(subscription))
         
         return {"success": True, "message": "Subscription deactivated successfully"}
         
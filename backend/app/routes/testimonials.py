@@ -1,13 +1,61 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, status
 from sqlalchemy.orm import Session
-from typing import List
+from typing import List, Optional, Tuple
 
 from ..database import get_db
-from ..models import Testimonial, User
-from ..schemas import TestimonialCreate, Testimonial as TestimonialSchema, TestimonialResponse, ListResponse
+from ..responses import FastJSONRoute
+from ..models import Testimonial, TestimonialScore, User
+from ..schemas import (
+    TestimonialCreate,
+    TestimonialResponse,
+    TestimonialSearchResponse,
+    TestimonialList,
+    PendingTestimonialList,
+    TestimonialBulkRequest,
+    TestimonialBulkResponse,
+    ListResponse
+)
 from ..auth import get_current_user, get_current_admin_user, sanitize_input
+from ..response_cache import response_cache, cached_response
+from ..catalog import read_catalog_version, bump_catalog_version
+from ..testimonial_stats import (
+    testimonial_contribution,
+    sum_contributions,
+    apply_stats_delta,
+    read_testimonial_stats
+)
+from ..search import search_testimonials
+from ..moderation import moderation_worker
 
-router = APIRouter(prefix="/testimonials", tags=["testimonials"])
+router = APIRouter(prefix="/testimonials", tags=["testimonials"], route_class=FastJSONRoute)
+
+# Response cache group holding rendered pages of the approved feed, and the
+# shared version bumped whenever the approved set changes
+FEED_CACHE_GROUP = "testimonials:feed"
+
+# Ids per UPDATE/DELETE statement in bulk moderation (below SQLite's variable limit)
+BULK_CHUNK_SIZE = 500
+
+# Most testimonials a filter selects in one bulk request; the response says
+# how many more match, and repeating the request works through them
+BULK_FILTER_LIMIT = 5000
+
+def render_testimonials(db: Session, approved_only: bool, skip: int, limit: int) -> bytes:
+    """Query one page of testimonials and encode it as a ListResponse body"""
+    query = db.query(Testimonial)
+    
+    if approved_only:
+        query = query.filter(Testimonial.is_approved == True)
+    
+    testimonials = query.order_by(Testimonial.created_at.desc()).offset(skip).limit(limit).all()
+    total = query.count()
+    
+    return ListResponse(
+        success=True,
+        message="Testimonials retrieved successfully",
+        data=TestimonialList.validate_python(testimonials, from_attributes=True),
+        total=total
+    ).model_dump_json().encode()
 
 @router.post("/", response_model=TestimonialResponse)
 def create_testimonial(
@@ -30,9 +78,13 @@ def create_testimonial(
         )
         
         db.add(db_testimonial)
+        apply_stats_delta(db, None, testimonial_contribution(False, db_testimonial.rating))
         db.commit()
         db.refresh(db_testimonial)
         
+        # Spam scoring happens in the moderation worker, not on this request
+        moderation_worker.notify()
+        
         return TestimonialResponse(
             success=True,
             message="Testimonial submitted successfully and pending approval",
@@ -45,27 +97,30 @@ def create_testimonial(
 
 @router.get("/", response_model=ListResponse)
 def get_testimonials(
+    request: Request,
     approved_only: bool = True, 
-    skip: int = 0, 
-    limit: int = 100, 
+    # Bounded, since both are part of the shared response cache key
+    skip: int = Query(0, ge=0), 
+    limit: int = Query(10, ge=1, le=100), 
     db: Session = Depends(get_db)
 ):
     """Get testimonials with optional approval filter (public endpoint)"""
     try:
-        query = db.query(Testimonial)
-        
-        if approved_only:
-            query = query.filter(Testimonial.is_approved == True)
+        if not approved_only:
+            return Response(
+                content=render_testimonials(db, approved_only, skip, limit),
+                media_type="application/json"
+            )
         
-        testimonials = query.order_by(Testimonial.created_at.desc()).offset(skip).limit(limit).all()
-        total = query.count()
-        
-        return ListResponse(
-            success=True,
-            message="Testimonials retrieved successfully",
-            data=testimonials,
-            total=total
+        # The approved feed only changes on approve/reject, so pages are
+        # rendered once and served from memory until then
+        # Keyed by the shared feed version, so approvals handled by other
+        # worker processes are picked up too
+        entry = response_cache.get_or_render(
+            (FEED_CACHE_GROUP, read_catalog_version(db, FEED_CACHE_GROUP), skip, limit),
+            lambda: render_testimonials(db, approved_only, skip, limit)
         )
+        return cached_response(request, entry)
         
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
@@ -84,7 +139,7 @@ def get_user_testimonials(
         return ListResponse(
             success=True,
             message="User testimonials retrieved successfully",
-            data=testimonials,
+            data=TestimonialList.validate_python(testimonials, from_attributes=True),
             total=len(testimonials)
         )
         
@@ -134,9 +189,20 @@ def approve_testimonial(
         if not testimonial:
             raise HTTPException(status_code=404, detail="Testimonial not found")
         
+        was_approved = testimonial.is_approved
         testimonial.is_approved = True
+        apply_stats_delta(
+            db,
+            testimonial_contribution(was_approved, testimonial.rating),
+            testimonial_contribution(True, testimonial.rating)
+        )
+        if not was_approved:
+            bump_catalog_version(db, FEED_CACHE_GROUP)
         db.commit()
         
+        if not was_approved:
+            response_cache.invalidate(FEED_CACHE_GROUP)
+        
         return {"success": True, "message": "Testimonial approved successfully"}
         
     except HTTPException:
@@ -158,9 +224,17 @@ def reject_testimonial(
         if not testimonial:
             raise HTTPException(status_code=404, detail="Testimonial not found")
         
+        was_approved = testimonial.is_approved
+        db.query(TestimonialScore).filter(TestimonialScore.testimonial_id == testimonial_id).delete()
         db.delete(testimonial)
+        apply_stats_delta(db, testimonial_contribution(was_approved, testimonial.rating), None)
+        if was_approved:
+            bump_catalog_version(db, FEED_CACHE_GROUP)
         db.commit()
         
+        if was_approved:
+            response_cache.invalidate(FEED_CACHE_GROUP)
+        
         return {"success": True, "message": "Testimonial rejected and deleted"}
         
     except HTTPException:
@@ -169,18 +243,151 @@ def reject_testimonial(
         db.rollback()
         raise HTTPException(status_code=400, detail=str(e))
 
+def _bulk_target_ids(db: Session, request: TestimonialBulkRequest) -> Tuple[List[int], int]:
+    """Ids named in the request, or pending testimonials matching its filter.
+    
+    Also returns how many more testimonials match the filter than were selected.
+    """
+    if request.ids is not None:
+        return list(dict.fromkeys(request.ids)), 0
+    
+    if request.rating is None and request.created_before is None:
+        raise HTTPException(status_code=400, detail="Provide ids or at least one filter")
+    
+    query = db.query(Testimonial.id).filter(Testimonial.is_approved == False)
+    if request.rating is not None:
+        query = query.filter(Testimonial.rating == request.rating)
+    if request.created_before is not None:
+        query = query.filter(Testimonial.created_at < request.created_before)
+    ids = [testimonial_id for testimonial_id, in query.order_by(Testimonial.id).limit(BULK_FILTER_LIMIT + 1)]
+    if len(ids) <= BULK_FILTER_LIMIT:
+        return ids, 0
+    return ids[:BULK_FILTER_LIMIT], query.count() - BULK_FILTER_LIMIT
+
+def _moderate_in_bulk(db: Session, ids: List[int], approve: bool, remaining: int = 0) -> TestimonialBulkResponse:
+    """Approve or reject testimonials chunk by chunk inside a single transaction"""
+    outcomes = {testimonial_id: "not_found" for testimonial_id in ids}
+    before, after = [], []
+    
+    for start in range(0, len(ids), BULK_CHUNK_SIZE):
+        chunk = ids[start:start + BULK_CHUNK_SIZE]
+        rows = db.query(Testimonial.id, Testimonial.is_approved, Testimonial.rating).filter(
+            Testimonial.id.in_(chunk)
+        ).all()
+        
+        if approve:
+            pending = [row.id for row in rows if not row.is_approved]
+            if pending:
+                db.query(Testimonial).filter(Testimonial.id.in_(pending)).update(
+                    {Testimonial.is_approved: True}, synchronize_session=False
+                )
+            for row in rows:
+                if row.is_approved:
+                    outcomes[row.id] = "already_approved"
+                else:
+                    outcomes[row.id] = "approved"
+                    before.append(testimonial_contribution(False, row.rating))
+                    after.append(testimonial_contribution(True, row.rating))
+        else:
+            found = [row.id for row in rows]
+            if found:
+                db.query(TestimonialScore).filter(TestimonialScore.testimonial_id.in_(found)).delete(
+                    synchronize_session=False
+                )
+                db.query(Testimonial).filter(Testimonial.id.in_(found)).delete(synchronize_session=False)
+            for row in rows:
+                outcomes[row.id] = "rejected"
+                before.append(testimonial_contribution(row.is_approved, row.rating))
+    
+    # The approved set only changes when an approved row is added or removed
+    feed_changed = any(contribution["approved"] for contribution in before + after)
+    apply_stats_delta(db, sum_contributions(before), sum_contributions(after))
+    if feed_changed:
+        bump_catalog_version(db, FEED_CACHE_GROUP)
+    db.commit()
+    
+    if feed_changed:
+        response_cache.invalidate(FEED_CACHE_GROUP)
+    
+    counts = {}
+    for status_name in outcomes.values():
+        counts[status_name] = counts.get(status_name, 0) + 1
+    
+    message = f"{len(ids)} testimonials processed"
+    if remaining:
+        message += f"; {remaining} more match the filter, repeat the request to process them"
+    
+    return TestimonialBulkResponse(
+        success=True,
+        message=message,
+        counts=counts,
+        remaining=remaining,
+        results=[{"id": testimonial_id, "status": status_name} for testimonial_id, status_name in outcomes.items()]
+    )
+
+@router.put("/admin/bulk/approve", response_model=TestimonialBulkResponse)
+def bulk_approve_testimonials(
+    bulk_request: TestimonialBulkRequest,
+    current_admin: User = Depends(get_current_admin_user),
+    db: Session = Depends(get_db)
+):
+    """Approve many testimonials by id or filter in one transaction (admin only)"""
+    try:
+        ids, remaining = _bulk_target_ids(db, bulk_request)
+        return _moderate_in_bulk(db, ids, approve=True, remaining=remaining)
+        
+    except HTTPException:
+        raise
+    except Exception as e:
+        db.rollback()
+        raise HTTPException(status_code=400, detail=str(e))
+
+@router.put("/admin/bulk/reject", response_model=TestimonialBulkResponse)
+def bulk_reject_testimonials(
+    bulk_request: TestimonialBulkRequest,
+    current_admin: User = Depends(get_current_admin_user),
+    db: Session = Depends(get_db)
+):
+    """Reject and delete many testimonials by id or filter in one transaction (admin only)"""
+    try:
+        ids, remaining = _bulk_target_ids(db, bulk_request)
+        return _moderate_in_bulk(db, ids, approve=False, remaining=remaining)
+        
+    except HTTPException:
+        raise
+    except Exception as e:
+        db.rollback()
+        raise HTTPException(status_code=400, detail=str(e))
+
 @router.get("/admin/pending", response_model=ListResponse)
 def get_pending_testimonials(
     skip: int = 0, 
     limit: int = 100, 
+    sort: str = Query("newest", pattern="^(newest|score|spam)$", description="newest, score (cleanest first) or spam (most suspicious first)"),
     current_admin: User = Depends(get_current_admin_user),
     db: Session = Depends(get_db)
 ):
     """Get pending testimonials for admin approval"""
     try:
-        testimonials = db.query(Testimonial).filter(
-            Testimonial.is_approved == False
-        ).order_by(Testimonial.created_at.desc()).offset(skip).limit(limit).all()
+        # Plain rows rather than ORM objects; pydantic-core reads their columns
+        query = db.query(
+            *Testimonial.__table__.c,
+            TestimonialScore.score.label("spam_score"),
+            TestimonialScore.reasons.label("spam_reasons")
+        ).outerjoin(
+            TestimonialScore, TestimonialScore.testimonial_id == Testimonial.id
+        ).filter(Testimonial.is_approved == False)
+        
+        # Testimonials the worker has not scored yet come last
+        if sort == "score":
+            query = query.order_by(TestimonialScore.score.is_(None), TestimonialScore.score.asc(), Testimonial.created_at.desc())
+        elif sort == "spam":
+            query = query.order_by(TestimonialScore.score.is_(None), TestimonialScore.score.desc(), Testimonial.created_at.desc())
+        else:
+            query = query.order_by(Testimonial.created_at.desc())
+        
+        rows = query.offset(skip).limit(limit).all()
+        testimonials = PendingTestimonialList.validate_python(rows, from_attributes=True)
         
         total = db.query(Testimonial).filter(Testimonial.is_approved == False).count()
         
@@ -194,26 +401,48 @@ def get_pending_testimonials(
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
 
+@router.get("/admin/search", response_model=TestimonialSearchResponse)
+def search_testimonials_admin(
+    q: str = Query(..., min_length=1, max_length=200, description="Words to search for in name and message"),
+    rating: Optional[int] = Query(None, ge=1, le=5),
+    approved: Optional[bool] = None,
+    cursor: Optional[str] = None,
+    limit: int = Query(20, ge=1, le=100),
+    current_admin: User = Depends(get_current_admin_user),
+    db: Session = Depends(get_db)
+):
+    """Full-text search over testimonials, best matches first (admin only)"""
+    try:
+        results, next_cursor = search_testimonials(db, q, rating, approved, cursor, limit)
+        
+        return TestimonialSearchResponse(
+            success=True,
+            message="Testimonials retrieved successfully",
+            data=results,
+            next_cursor=next_cursor
+        )
+        
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
 @router.get("/stats/")
 def get_testimonial_stats(db: Session = Depends(get_db)):
     """Get testimonial statistics (public endpoint)"""
     try:
-        total = db.query(Testimonial).count()
-        approved = db.query(Testimonial).filter(Testimonial.is_approved == True).count()
-        pending = db.query(Testimonial).filter(Testimonial.is_approved == False).count()
-        
-        # Calculate average rating
-        avg_rating = db.query(Testimonial).filter(Testimonial.is_approved == True).with_entities(
-            db.func.avg(Testimonial.rating)
-        ).scalar() or 0
+        # Counters are maintained by create/approve/reject, so this is a primary-key read
+        stats = read_testimonial_stats(db)
+        avg_rating = stats.rating_sum / stats.approved if stats.approved else 0
         
         return {
             "success": True,
             "stats": {
-                "total": total,
-                "approved": approved,
-                "pending": pending,
-                "average_rating": round(float(avg_rating), 1)
+                "total": stats.total,
+                "approved": stats.approved,
+                "pending": stats.pending,
+                "average_rating": round(float(avg_rating), 1),
+                "rating_distribution": {
+                    str(star): getattr(stats, f"star_{star}") for star in range(1, 6)
+                }
             }
         }
         
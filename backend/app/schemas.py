@@ -1,42 +1,106 @@
-from pydantic import BaseModel, validator, EmailStr
-from typing import List, Optional
+from pydantic import BaseModel, ConfigDict, EmailStr, Field, Json, StringConstraints, TypeAdapter, ValidationInfo, field_validator
+from typing import Annotated, Dict, List, Literal, Optional, Union, get_args
 from datetime import datetime, date
-import json
 import re
 
+# Field types checked by pydantic-core itself; only the phone and password
+# checks below still run Python code per value
+
+# Only letters, spaces, and common punctuation
+PersonName = Annotated[str, StringConstraints(
+    strip_whitespace=True, min_length=2, max_length=100, pattern=r"^[a-zA-Z\s\-'.]+$"
+)]
+PlanType = Literal['diet', 'protein', 'royal']
+MealType = Literal['breakfast', 'lunch', 'dinner']
+DeliveryDay = Literal['monday', 'tuesday', 'wednesday', 'thursday', 'friday', 'saturday', 'sunday']
+MealTypes = Annotated[List[MealType], Field(min_length=1)]
+DeliveryDays = Annotated[List[DeliveryDay], Field(min_length=1)]
+Rating = Annotated[int, Field(ge=1, le=5)]
+
+# The API's own wording for failed field constraints, by field name and
+# pydantic error type. Request errors are reworded with it in main.py, so
+# the checks stay in pydantic-core. {input} is the rejected value.
+FIELD_MESSAGES = {
+    ("full_name", "string_too_short"): "Full name must be at least 2 characters long",
+    ("full_name", "string_too_long"): "Full name must be less than 100 characters",
+    ("full_name", "string_pattern_mismatch"): "Full name contains invalid characters",
+    ("password", "string_too_short"): "Password must be at least 8 characters long",
+    ("name", "string_too_short"): "Name must be at least 2 characters long",
+    ("name", "string_too_long"): "Name must be less than 100 characters",
+    ("name", "string_pattern_mismatch"): "Name contains invalid characters",
+    ("plan", "literal_error"): f"Plan must be one of: {list(get_args(PlanType))}",
+    ("meal_types", "too_short"): "At least one meal type must be selected",
+    ("meal_types", "literal_error"): "Invalid meal type: {input}",
+    ("delivery_days", "too_short"): "At least one delivery day must be selected",
+    ("delivery_days", "literal_error"): "Invalid delivery day: {input}",
+    ("allergies", "string_too_long"): "Allergies field must be less than 500 characters",
+    ("message", "string_too_short"): "Message must be at least 10 characters long",
+    ("message", "string_too_long"): "Message must be less than 1000 characters",
+    ("rating", "greater_than_equal"): "Rating must be between 1 and 5",
+    ("rating", "less_than_equal"): "Rating must be between 1 and 5",
+    ("description", "string_too_short"): "Description must be at least 10 characters long",
+    ("description", "string_too_long"): "Description must be less than 500 characters",
+    ("price_per_meal", "greater_than"): "Price must be greater than 0",
+    ("plan_type", "literal_error"): f"Plan type must be one of: {list(get_args(PlanType))}",
+}
+
+def reword_errors(errors: list, body=None) -> list:
+    """Give errors covered by FIELD_MESSAGES the value_error form the API always returned"""
+    reworded, fields_done = [], set()
+    for error in errors:
+        loc = tuple(error["loc"])
+        value = error.get("input")
+        # A list item is reported under its index; the message is about the field
+        if len(loc) > 1 and isinstance(loc[-1], int):
+            loc = loc[:-1]
+            value = _body_value(body, loc, value)
+        message = FIELD_MESSAGES.get((loc[-1], error["type"])) if loc else None
+        if message is None:
+            reworded.append(error)
+            continue
+        if loc in fields_done:
+            # One message per field, as when each field had its own validator
+            continue
+        fields_done.add(loc)
+        message = message.format(input=error.get("input"))
+        reworded.append({
+            "type": "value_error",
+            "loc": loc,
+            "msg": f"Value error, {message}",
+            "input": value,
+            "ctx": {"error": ValueError(message)}
+        })
+    return reworded
+
+def _body_value(body, loc: tuple, default):
+    """The request body value at an error location such as ("body", "meal_types")"""
+    if not loc or loc[0] != "body":
+        return default
+    value = body
+    for key in loc[1:]:
+        try:
+            value = value[key]
+        except (KeyError, IndexError, TypeError):
+            return default
+    return value
+
+PASSWORD_CHARACTER_CLASSES = [re.compile(pattern) for pattern in (r'[A-Z]', r'[a-z]', r'\d', r'[!@#$%^&*(),.?":{}|<>]')]
+NON_DIGITS = re.compile(r'[^\d]')
+
 # Authentication Schemas
 class UserBase(BaseModel):
-    full_name: str
+    full_name: PersonName
     email: EmailStr
 
-    @validator('full_name')
-    def validate_full_name(cls, v):
-        if not v or len(v.strip()) < 2:
-            raise ValueError('Full name must be at least 2 characters long')
-        if len(v) > 100:
-            raise ValueError('Full name must be less than 100 characters')
-        # Only allow letters, spaces, and common punctuation
-        if not re.match(r'^[a-zA-Z\s\-\'\.]+$', v):
-            raise ValueError('Full name contains invalid characters')
-        return v.strip()
-
 class UserCreate(UserBase):
-    password: str
+    password: Annotated[str, StringConstraints(min_length=8)]
 
-    @validator('password')
+    @field_validator('password')
+    @classmethod
     def validate_password(cls, v):
-        if len(v) < 8:
-            raise ValueError('Password must be at least 8 characters long')
-        
         # Check for uppercase, lowercase, number, and special character
-        has_upper = bool(re.search(r'[A-Z]', v))
-        has_lower = bool(re.search(r'[a-z]', v))
-        has_digit = bool(re.search(r'\d', v))
-        has_special = bool(re.search(r'[!@#$%^&*(),.?":{}|<>]', v))
-        
-        if not all([has_upper, has_lower, has_digit, has_special]):
+        if not all(pattern.search(v) for pattern in PASSWORD_CHARACTER_CLASSES):
             raise ValueError('Password must contain uppercase, lowercase, number, and special character')
-        
         return v
 
 class UserLogin(BaseModel):
@@ -44,15 +108,14 @@ class UserLogin(BaseModel):
     password: str
 
 class User(UserBase):
+    model_config = ConfigDict(from_attributes=True)
+
     id: int
     is_active: bool
     is_admin: bool
     created_at: datetime
     updated_at: Optional[datetime] = None
 
-    class Config:
-        from_attributes = True
-
 class Token(BaseModel):
     access_token: str
     token_type: str
@@ -63,69 +126,31 @@ class TokenData(BaseModel):
 
 # Subscription Schemas
 class SubscriptionBase(BaseModel):
-    name: str
+    name: PersonName
     phone: str
-    plan: str
-    meal_types: List[str]
-    delivery_days: List[str]
-    allergies: Optional[str] = None
-
-    @validator('name')
-    def validate_name(cls, v):
-        if not v or len(v.strip()) < 2:
-            raise ValueError('Name must be at least 2 characters long')
-        if len(v) > 100:
-            raise ValueError('Name must be less than 100 characters')
-        # Only allow letters, spaces, and common punctuation
-        if not re.match(r'^[a-zA-Z\s\-\'\.]+$', v):
-            raise ValueError('Name contains invalid characters')
-        return v.strip()
-
-    @validator('phone')
+    plan: PlanType
+    meal_types: MealTypes
+    delivery_days: DeliveryDays
+    allergies: Optional[Annotated[str, StringConstraints(max_length=500)]] = None
+
+    @field_validator('phone')
+    @classmethod
     def validate_phone(cls, v):
         # Remove spaces and special characters
-        clean_phone = re.sub(r'[^\d]', '', v)
+        clean_phone = NON_DIGITS.sub('', v)
         if len(clean_phone) < 10 or len(clean_phone) > 13:
             raise ValueError('Phone number must be between 10-13 digits')
         return clean_phone
 
-    @validator('plan')
-    def validate_plan(cls, v):
-        valid_plans = ['diet', 'protein', 'royal']
-        if v not in valid_plans:
-            raise ValueError(f'Plan must be one of: {valid_plans}')
-        return v
-
-    @validator('meal_types')
-    def validate_meal_types(cls, v):
-        valid_meal_types = ['breakfast', 'lunch', 'dinner']
-        if not v:
-            raise ValueError('At least one meal type must be selected')
-        for meal_type in v:
-            if meal_type not in valid_meal_types:
-                raise ValueError(f'Invalid meal type: {meal_type}')
-        return v
-
-    @validator('delivery_days')
-    def validate_delivery_days(cls, v):
-        valid_days = ['monday', 'tuesday', 'wednesday', 'thursday', 'friday', 'saturday', 'sunday']
-        if not v:
-            raise ValueError('At least one delivery day must be selected')
-        for day in v:
-            if day not in valid_days:
-                raise ValueError(f'Invalid delivery day: {day}')
-        return v
-
-    @validator('allergies')
-    def validate_allergies(cls, v):
-        if v is not None and len(v) > 500:
-            raise ValueError('Allergies field must be less than 500 characters')
-        return v
-
 class SubscriptionCreate(SubscriptionBase):
     total_price: float
 
 class Subscription(SubscriptionBase):
+    model_config = ConfigDict(from_attributes=True)
+
+    # Rows store these as JSON text, which pydantic-core decodes
+    meal_types: Union[MealTypes, Json[MealTypes]]
+    delivery_days: Union[DeliveryDays, Json[DeliveryDays]]
     id: int
     user_id: int
     total_price: float
@@ -135,101 +160,56 @@ class Subscription(SubscriptionBase):
     created_at: datetime
     updated_at: Optional[datetime] = None
 
-    class Config:
-        from_attributes = True
+# Reused by list endpoints, so each list is validated and encoded in one call
+SubscriptionList = TypeAdapter(List[Subscription])
 
 # Testimonial Schemas
 class TestimonialBase(BaseModel):
-    name: str
-    message: str
-    rating: int
-
-    @validator('name')
-    def validate_name(cls, v):
-        if not v or len(v.strip()) < 2:
-            raise ValueError('Name must be at least 2 characters long')
-        if len(v) > 100:
-            raise ValueError('Name must be less than 100 characters')
-        # Only allow letters, spaces, and common punctuation
-        if not re.match(r'^[a-zA-Z\s\-\'\.]+$', v):
-            raise ValueError('Name contains invalid characters')
-        return v.strip()
-
-    @validator('message')
-    def validate_message(cls, v):
-        if not v or len(v.strip()) < 10:
-            raise ValueError('Message must be at least 10 characters long')
-        if len(v) > 1000:
-            raise ValueError('Message must be less than 1000 characters')
-        return v.strip()
-
-    @validator('rating')
-    def validate_rating(cls, v):
-        if v < 1 or v > 5:
-            raise ValueError('Rating must be between 1 and 5')
-        return v
+    name: PersonName
+    message: Annotated[str, StringConstraints(strip_whitespace=True, min_length=10, max_length=1000)]
+    rating: Rating
 
 class TestimonialCreate(TestimonialBase):
     pass
 
 class Testimonial(TestimonialBase):
+    model_config = ConfigDict(from_attributes=True)
+
     id: int
     user_id: int
     is_approved: bool
     created_at: datetime
 
-    class Config:
-        from_attributes = True
+class TestimonialSearchResult(Testimonial):
+    score: float
+
+class PendingTestimonial(Testimonial):
+    spam_score: Optional[float] = None
+    # Stored as JSON text
+    spam_reasons: Optional[Union[List[str], Json[List[str]]]] = None
+
+TestimonialList = TypeAdapter(List[Testimonial])
+PendingTestimonialList = TypeAdapter(List[PendingTestimonial])
 
 # Meal Plan Schemas
 class MealPlanBase(BaseModel):
-    name: str
-    description: str
-    price_per_meal: float
-    plan_type: str
+    name: Annotated[str, StringConstraints(strip_whitespace=True, min_length=2, max_length=100)]
+    description: Annotated[str, StringConstraints(strip_whitespace=True, min_length=10, max_length=500)]
+    price_per_meal: Annotated[float, Field(gt=0)]
+    plan_type: PlanType
     features: Optional[List[str]] = None
 
-    @validator('name')
-    def validate_name(cls, v):
-        if not v or len(v.strip()) < 2:
-            raise ValueError('Name must be at least 2 characters long')
-        if len(v) > 100:
-            raise ValueError('Name must be less than 100 characters')
-        return v.strip()
-
-    @validator('description')
-    def validate_description(cls, v):
-        if not v or len(v.strip()) < 10:
-            raise ValueError('Description must be at least 10 characters long')
-        if len(v) > 500:
-            raise ValueError('Description must be less than 500 characters')
-        return v.strip()
-
-    @validator('price_per_meal')
-    def validate_price(cls, v):
-        if v <= 0:
-            raise ValueError('Price must be greater than 0')
-        return v
-
-    @validator('plan_type')
-    def validate_plan_type(cls, v):
-        valid_types = ['diet', 'protein', 'royal']
-        if v not in valid_types:
-            raise ValueError(f'Plan type must be one of: {valid_types}')
-        return v
-
 class MealPlanCreate(MealPlanBase):
     pass
 
 class MealPlan(MealPlanBase):
+    model_config = ConfigDict(from_attributes=True)
+
     id: int
     is_active: bool
     created_at: datetime
     updated_at: Optional[datetime] = None
 
-    class Config:
-        from_attributes = True
-
 # Response Schemas
 class SubscriptionResponse(BaseModel):
     success: bool
@@ -241,11 +221,44 @@ class TestimonialResponse(BaseModel):
     message: str
     testimonial: Optional[Testimonial] = None
 
+class TestimonialBulkRequest(BaseModel):
+    # At most 5000 testimonials can be moderated at once
+    ids: Optional[Annotated[List[int], Field(max_length=5000)]] = None
+    # Filter on pending testimonials, used when ids is not given
+    rating: Optional[Rating] = None
+    created_before: Optional[datetime] = None
+
+class TestimonialBulkOutcome(BaseModel):
+    id: int
+    status: str
+
+class TestimonialBulkResponse(BaseModel):
+    success: bool
+    message: str
+    counts: Dict[str, int]
+    # Testimonials matching the filter beyond the ones processed
+    remaining: int = 0
+    results: List[TestimonialBulkOutcome]
+
+class TestimonialSearchResponse(BaseModel):
+    success: bool
+    message: str
+    data: List[TestimonialSearchResult]
+    next_cursor: Optional[str] = None
+
 class MealPlanResponse(BaseModel):
     success: bool
     message: str
     meal_plan: Optional[MealPlan] = None
 
+class MealPlanImportResponse(BaseModel):
+    success: bool
+    message: str
+    created: int
+    updated: int
+    total: int
+    catalog_version: int
+
 class ListResponse(BaseModel):
     success: bool
     message: str
@@ -262,9 +275,10 @@ class PauseSubscriptionRequest(BaseModel):
     pause_start_date: date
     pause_end_date: date
 
-    @validator('pause_end_date')
-    def validate_pause_dates(cls, v, values):
-        if 'pause_start_date' in values and v <= values['pause_start_date']:
+    @field_validator('pause_end_date')
+    @classmethod
+    def validate_pause_dates(cls, v, info: ValidationInfo):
+        if 'pause_start_date' in info.data and v <= info.data['pause_start_date']:
             raise ValueError('Pause end date must be after pause start date')
         return v
 
@@ -279,4 +293,47 @@ class DashboardMetrics(BaseModel):
 class AdminDashboardResponse(BaseModel):
     success: bool
     message: str
-    metrics: DashboardMetrics 
\ No newline at end of file
+    metrics: DashboardMetrics
+
+class CohortRetention(BaseModel):
+    cohort: str
+    plan: str
+    size: int
+    retained: List[int]
+    retention: List[float]
+    churned: int
+    churn_rate: float
+    paused: int
+
+class CohortAnalyticsResponse(BaseModel):
+    success: bool
+    message: str
+    months: int
+    cohorts: List[CohortRetention]
+
+class ForecastDay(BaseModel):
+    date: date
+    revenue: float
+    meals: int
+    deliveries: int
+
+class RevenueForecastResponse(BaseModel):
+    success: bool
+    message: str
+    start_date: date
+    end_date: date
+    total_revenue: float
+    total_meals: int
+    days: List[ForecastDay]
+
+class ProductionDay(BaseModel):
+    date: date
+    portions: Dict[str, Dict[str, int]]
+    total_portions: int
+
+class ProductionForecastResponse(BaseModel):
+    success: bool
+    message: str
+    start_date: date
+    end_date: date
+    days: List[ProductionDay]
\ No newline at end of file
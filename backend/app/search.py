@@ -0,0 +1,148 @@
+import base64
+import json
+import re
+from typing import List, Optional, Tuple
+
+from sqlalchemy import text
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session
+
+# SQLite: external-content FTS5 table over testimonials, kept in sync by triggers.
+# Only name/message changes touch the index; approvals do not.
+SQLITE_SETUP = [
+    """
+    CREATE VIRTUAL TABLE IF NOT EXISTS testimonials_fts USING fts5(
+        name, message, content='testimonials', content_rowid='id'
+    )
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS testimonials_fts_ai AFTER INSERT ON testimonials BEGIN
+        INSERT INTO testimonials_fts(rowid, name, message) VALUES (new.id, new.name, new.message);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS testimonials_fts_ad AFTER DELETE ON testimonials BEGIN
+        INSERT INTO testimonials_fts(testimonials_fts, rowid, name, message)
+        VALUES ('delete', old.id, old.name, old.message);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS testimonials_fts_au AFTER UPDATE OF name, message ON testimonials BEGIN
+        INSERT INTO testimonials_fts(testimonials_fts, rowid, name, message)
+        VALUES ('delete', old.id, old.name, old.message);
+        INSERT INTO testimonials_fts(rowid, name, message) VALUES (new.id, new.name, new.message);
+    END
+    """
+]
+
+# PostgreSQL: expression GIN index, so no extra column or triggers are needed
+POSTGRES_DOCUMENT = "to_tsvector('english', coalesce(t.name, '') || ' ' || coalesce(t.message, ''))"
+POSTGRES_SETUP = [
+    "CREATE INDEX IF NOT EXISTS ix_testimonials_search ON testimonials USING GIN ("
+    + POSTGRES_DOCUMENT.replace("t.", "") + ")"
+]
+
+# Lower score ranks first on both backends
+SQLITE_SEARCH = """
+    WITH matches AS (
+        SELECT rowid AS id, bm25(testimonials_fts) AS score
+        FROM testimonials_fts
+        WHERE testimonials_fts MATCH :query
+    )
+    SELECT t.id, t.user_id, t.name, t.message, t.rating, t.is_approved, t.created_at, m.score
+    FROM matches m JOIN testimonials t ON t.id = m.id
+    WHERE {filters}
+    ORDER BY m.score, t.id
+    LIMIT :limit
+"""
+
+POSTGRES_SEARCH = """
+    WITH matches AS (
+        SELECT t.id, -ts_rank(""" + POSTGRES_DOCUMENT + """, plainto_tsquery('english', :query)) AS score
+        FROM testimonials t
+        WHERE """ + POSTGRES_DOCUMENT + """ @@ plainto_tsquery('english', :query)
+    )
+    SELECT t.id, t.user_id, t.name, t.message, t.rating, t.is_approved, t.created_at, m.score
+    FROM matches m JOIN testimonials t ON t.id = m.id
+    WHERE {filters}
+    ORDER BY m.score, t.id
+    LIMIT :limit
+"""
+
+def setup_testimonial_search(engine: Engine):
+    """Create the full-text index for testimonials if it does not exist yet"""
+    dialect_name = engine.dialect.name
+    with engine.begin() as connection:
+        if dialect_name == "sqlite":
+            exists = connection.execute(
+                text("SELECT 1 FROM sqlite_master WHERE name = 'testimonials_fts'")
+            ).first()
+            for statement in SQLITE_SETUP:
+                connection.execute(text(statement))
+            if not exists:
+                # Index testimonials written before the table existed
+                connection.execute(text("INSERT INTO testimonials_fts(testimonials_fts) VALUES ('rebuild')"))
+        elif dialect_name == "postgresql":
+            for statement in POSTGRES_SETUP:
+                connection.execute(text(statement))
+
+def to_match_query(query: str) -> str:
+    """Turn free text into an FTS5 query matching all words, last one as a prefix"""
+    words = re.findall(r"\w+", query)
+    if not words:
+        return ""
+    terms = [f'"{word}"' for word in words]
+    terms[-1] += "*"
+    return " ".join(terms)
+
+def encode_cursor(score: float, testimonial_id: int) -> str:
+    return base64.urlsafe_b64encode(json.dumps([score, testimonial_id]).encode()).decode()
+
+def decode_cursor(cursor: str) -> Tuple[float, int]:
+    score, testimonial_id = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+    return float(score), int(testimonial_id)
+
+def search_testimonials(
+    db: Session,
+    query: str,
+    rating: Optional[int] = None,
+    approved: Optional[bool] = None,
+    cursor: Optional[str] = None,
+    limit: int = 20
+) -> Tuple[List[dict], Optional[str]]:
+    """Ranked full-text search over testimonials with keyset (cursor) pagination.
+
+    Returns the page of matches and the cursor for the next page, if any.
+    """
+    dialect_name = db.get_bind().dialect.name
+    if dialect_name == "sqlite":
+        statement = SQLITE_SEARCH
+        query = to_match_query(query)
+    elif dialect_name == "postgresql":
+        statement = POSTGRES_SEARCH
+    else:
+        raise ValueError(f"Full-text search is not supported on {dialect_name}")
+
+    if not query.strip():
+        return [], None
+
+    filters = ["1 = 1"]
+    params = {"query": query, "limit": limit + 1}
+    if rating is not None:
+        filters.append("t.rating = :rating")
+        params["rating"] = rating
+    if approved is not None:
+        filters.append("t.is_approved = :approved")
+        params["approved"] = approved
+    if cursor:
+        params["after_score"], params["after_id"] = decode_cursor(cursor)
+        filters.append("(m.score > :after_score OR (m.score = :after_score AND t.id > :after_id))")
+
+    rows = db.execute(text(statement.format(filters=" AND ".join(filters))), params).mappings().all()
+
+    results = [dict(row) for row in rows[:limit]]
+    next_cursor = None
+    if len(rows) > limit:
+        last = results[-1]
+        next_cursor = encode_cursor(last["score"], last["id"])
+    return results, next_cursor
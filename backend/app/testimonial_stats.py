@@ -0,0 +1,91 @@
+from typing import Dict, Optional
+
+from sqlalchemy import func, case, and_
+from sqlalchemy.orm import Session
+
+from .models import Testimonial, TestimonialStats
+
+STATS_ID = 1
+
+STAR_COLUMNS = ["star_1", "star_2", "star_3", "star_4", "star_5"]
+
+COUNTER_COLUMNS = ["total", "approved", "pending", "rating_sum"] + STAR_COLUMNS
+
+def testimonial_contribution(is_approved: bool, rating: int) -> Dict[str, int]:
+    """Counter values contributed by a single testimonial"""
+    contribution = {"total": 1, "approved": 0, "pending": 0, "rating_sum": 0}
+    if is_approved:
+        contribution["approved"] = 1
+        contribution["rating_sum"] = rating
+        if 1 <= rating <= 5:
+            contribution[f"star_{rating}"] = 1
+    else:
+        contribution["pending"] = 1
+    return contribution
+
+def sum_contributions(contributions) -> Dict[str, int]:
+    """Add up several contributions so a batch is applied as one delta"""
+    total = {}
+    for contribution in contributions:
+        for column, value in contribution.items():
+            total[column] = total.get(column, 0) + value
+    return total
+
+def apply_stats_delta(db: Session, before: Optional[Dict[str, int]], after: Optional[Dict[str, int]]):
+    """Move the counters from one contribution to another in the current transaction.
+
+    Uses an in-place UPDATE (column = column + delta) so concurrent writers
+    do not overwrite each other. The caller commits.
+    """
+    before = before or {}
+    after = after or {}
+    delta = {}
+    for column in COUNTER_COLUMNS:
+        change = after.get(column, 0) - before.get(column, 0)
+        if change:
+            delta[getattr(TestimonialStats, column)] = getattr(TestimonialStats, column) + change
+    if not delta:
+        return
+
+    updated = db.query(TestimonialStats).filter(TestimonialStats.id == STATS_ID).update(
+        delta, synchronize_session=False
+    )
+    if not updated:
+        # Counters have never been built; a recount includes this change once flushed
+        db.flush()
+        rebuild_testimonial_stats(db)
+
+def recount_testimonial_stats(db: Session) -> Dict[str, int]:
+    """Compute all counters from the testimonials table in one aggregate query"""
+    approved = Testimonial.is_approved == True
+    columns = [
+        func.count(Testimonial.id),
+        func.coalesce(func.sum(case((approved, 1), else_=0)), 0),
+        func.coalesce(func.sum(case((approved, 0), else_=1)), 0),
+        func.coalesce(func.sum(case((approved, Testimonial.rating), else_=0)), 0)
+    ] + [
+        func.coalesce(func.sum(case((and_(approved, Testimonial.rating == star), 1), else_=0)), 0)
+        for star in range(1, 6)
+    ]
+    row = db.query(*columns).one()
+    return {column: int(value) for column, value in zip(COUNTER_COLUMNS, row)}
+
+def rebuild_testimonial_stats(db: Session) -> TestimonialStats:
+    """Overwrite the counters row with a full recount. The caller commits."""
+    counts = recount_testimonial_stats(db)
+    stats = db.get(TestimonialStats, STATS_ID)
+    if stats is None:
+        stats = TestimonialStats(id=STATS_ID)
+        db.add(stats)
+    for column, value in counts.items():
+        setattr(stats, column, value)
+    db.flush()
+    return stats
+
+def read_testimonial_stats(db: Session) -> TestimonialStats:
+    """Return the counters row, building it on first use"""
+    stats = db.get(TestimonialStats, STATS_ID)
+    if stats is None:
+        stats = rebuild_testimonial_stats(db)
+        db.commit()
+    return stats
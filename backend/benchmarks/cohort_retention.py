@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+"""
+Benchmark the cohort retention endpoint against a row-by-row reference
+Seeds a throwaway database, times GET /dashboard/admin/analytics/cohorts and
+checks its matrix against one built in Python from every subscription row
+
+    python benchmarks/cohort_retention.py --subscriptions 300000
+"""
+
+import sys
+import os
+import argparse
+import shutil
+import tempfile
+import time
+from datetime import date, datetime
+from typing import Optional
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+REPEAT = 3
+
+def best_ms(function) -> float:
+    timings = []
+    for _ in range(REPEAT):
+        started = time.perf_counter()
+        function()
+        timings.append(time.perf_counter() - started)
+    return min(timings) * 1000
+
+def month_index(moment: datetime) -> int:
+    return moment.year * 12 + moment.month - 1
+
+def row_by_row(db, months: int, plan: Optional[str] = None) -> dict:
+    """(cohort, plan) -> (size, retained) from ORM rows, the way it was done before aggregating in SQL"""
+    from app.models import Subscription
+
+    today = date.today()
+    current_month = today.year * 12 + today.month - 1
+    first_month = current_month - months + 1
+    cohort_start = datetime(first_month // 12, first_month % 12 + 1, 1)
+
+    cells = {}
+    query = db.query(Subscription).filter(Subscription.created_at >= cohort_start)
+    if plan:
+        query = query.filter(Subscription.plan == plan)
+    for subscription in query.yield_per(10000):
+        cohort = month_index(subscription.created_at)
+        label = f"{cohort // 12}-{cohort % 12 + 1:02d}"
+        cell = cells.setdefault((label, subscription.plan), {"size": 0, "churn": [0] * (current_month - cohort + 1)})
+        cell["size"] += 1
+        if not subscription.is_active:
+            churned = subscription.cancelled_at or subscription.created_at
+            cell["churn"][min(max(month_index(churned) - cohort, 0), len(cell["churn"]) - 1)] += 1
+
+    matrix = {}
+    for key, cell in cells.items():
+        remaining, retained = cell["size"], []
+        for churned in cell["churn"]:
+            remaining -= churned
+            retained.append(remaining)
+        matrix[key] = (cell["size"], retained)
+    return matrix
+
+def run(args) -> list:
+    from fastapi.testclient import TestClient
+    from app.auth import create_access_token
+    from app.database import SessionLocal
+    from app.main import app
+    from app.models import User
+    from load_test import ADMIN_EMAIL
+
+    db = SessionLocal()
+    try:
+        admin = db.query(User).filter(User.email == ADMIN_EMAIL).one()
+        headers = {"Authorization": f"Bearer {create_access_token({'sub': str(admin.id)})}"}
+        results = []
+        with TestClient(app, base_url="http://localhost") as client:
+            for months, plan in ((12, None), (12, "protein"), (60, None)):
+                url = f"/dashboard/admin/analytics/cohorts?months={months}" + (f"&plan={plan}" if plan else "")
+                response = client.get(url, headers=headers)
+                assert response.status_code == 200, response.text
+                cohorts = response.json()["cohorts"]
+
+                reference = row_by_row(db, months, plan)
+                endpoint = {(row["cohort"], row["plan"]): (row["size"], row["retained"]) for row in cohorts}
+                results.append({
+                    "label": f"months={months}" + (f" plan={plan}" if plan else ""),
+                    "cohorts": len(cohorts),
+                    "matches": endpoint == reference,
+                    "endpoint_ms": best_ms(lambda: client.get(url, headers=headers)),
+                    "row_by_row_ms": best_ms(lambda: row_by_row(db, months, plan))
+                })
+        return results
+    finally:
+        db.close()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--subscriptions", type=int, default=300000)
+    parser.add_argument("--users", type=int, default=5000)
+    args = parser.parse_args()
+
+    # Read by the app at import time; the database goes to the current
+    # directory, so change to it before anything imports the app
+    os.environ["LOG_LEVEL"] = "warning"
+    os.environ["MODERATION_WORKER"] = "external"
+    workdir = tempfile.mkdtemp(prefix="cohort_retention-")
+    os.chdir(workdir)
+    try:
+        from load_test import seed_database
+        seed_database(os.path.join(workdir, "sea_catering.db"), args.users, args.subscriptions, 0, seed=42)
+        results = run(args)
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    print(f"Cohort retention over {args.subscriptions} subscriptions, best of {REPEAT}")
+    for result in results:
+        status = "✅" if result["matches"] else "❌ differs from the reference"
+        print(f"   {result['label']:22} {result['cohorts']:4} cohorts   endpoint {result['endpoint_ms']:8.1f} ms   "
+              f"row by row {result['row_by_row_ms']:8.1f} ms   {status}")
+    if not all(result["matches"] for result in results):
+        sys.exit(1)
\ No newline at end of file
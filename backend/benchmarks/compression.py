@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+"""
+Benchmark response compression: CPU time spent vs bytes and transfer time saved
+Covers the list payloads admins load most and a delivery manifest
+"""
+
+import sys
+import os
+import csv
+import io
+import gzip
+import timeit
+from datetime import datetime, timedelta
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fastapi.encoders import jsonable_encoder
+
+from app.compression import Compressor
+from app.responses import FastJSONResponse
+from app.response_cache import brotli
+from app.schemas import ListResponse
+from json_encoding import sample_subscriptions, sample_testimonials
+
+# Slow mobile link used to turn saved bytes into saved time
+LINK_MBIT_PER_SECOND = 1.5
+
+REPEAT = 5
+
+def sample_users(count: int):
+    created = datetime(2025, 1, 1, 9, 0, 0)
+    return {
+        "success": True,
+        "message": "Users retrieved successfully",
+        "data": [
+            {
+                "id": i,
+                "full_name": f"Customer Name {i}",
+                "email": f"customer{i}@example.com",
+                "is_active": True,
+                "is_admin": i == 1,
+                "created_at": created + timedelta(hours=i),
+                "updated_at": None
+            }
+            for i in range(count)
+        ],
+        "total": count
+    }
+
+def sample_manifest(count: int) -> bytes:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(["subscription_id", "name", "phone", "plan", "meal_types", "allergies"])
+    for i in range(count):
+        writer.writerow([i, f"Customer {i}", f"08123456{i % 10000:04d}", ("diet", "protein", "royal")[i % 3],
+                         "breakfast dinner", "peanuts" if i % 5 == 0 else ""])
+    return buffer.getvalue().encode()
+
+def codecs():
+    levels = [("gzip-1", lambda body: gzip.compress(body, 1, mtime=0)),
+              ("gzip-6", lambda body: gzip.compress(body, 6, mtime=0)),
+              ("gzip-9", lambda body: gzip.compress(body, 9, mtime=0))]
+    if brotli is not None:
+        levels += [("br-4", lambda body: brotli.compress(body, quality=4)),
+                   ("br-11", lambda body: brotli.compress(body, quality=11))]
+    return levels
+
+def benchmark(label: str, body: bytes):
+    print(f"{label}: {len(body)} bytes, {len(body) * 8 / (LINK_MBIT_PER_SECOND * 1000):.0f} ms at {LINK_MBIT_PER_SECOND} Mbit/s")
+    for name, compress in codecs():
+        size = len(compress(body))
+        cpu = min(timeit.repeat(lambda: compress(body), number=1, repeat=REPEAT))
+        saved = (len(body) - size) * 8 / (LINK_MBIT_PER_SECOND * 1000)
+        print(f"   {name:7} {size:8} bytes ({size / len(body):6.1%})  cpu {cpu * 1000:7.2f} ms  transfer saved {saved:7.0f} ms")
+
+def benchmark_stream(label: str, body: bytes, chunk_size: int):
+    """Compression as the middleware does it for streamed bodies, flushing every chunk"""
+    chunks = [body[i:i + chunk_size] for i in range(0, len(body), chunk_size)]
+
+    def compress():
+        compressor = Compressor("gzip")
+        return b"".join(compressor.compress(chunk, flush=True) for chunk in chunks) + compressor.finish()
+
+    size = len(compress())
+    cpu = min(timeit.repeat(compress, number=1, repeat=REPEAT))
+    print(f"{label}: {len(chunks)} chunks of {chunk_size} bytes")
+    print(f"   stream  {size:8} bytes ({size / len(body):6.1%})  cpu {cpu * 1000:7.2f} ms")
+
+if __name__ == "__main__":
+    if brotli is None:
+        print("brotli is not installed; only gzip is measured")
+    benchmark("500 subscriptions", FastJSONResponse(jsonable_encoder(sample_subscriptions(500))).body)
+    benchmark("100 users", FastJSONResponse(jsonable_encoder(sample_users(100))).body)
+    testimonials = sample_testimonials(100)
+    benchmark("100 testimonials", FastJSONResponse(jsonable_encoder(ListResponse(
+        success=True,
+        message="Testimonials retrieved successfully",
+        data=testimonials,
+        total=len(testimonials)
+    ))).body)
+    manifest = sample_manifest(10000)
+    benchmark("10000-row manifest (csv)", manifest)
+    benchmark_stream("10000-row manifest streamed with gzip-6", manifest, len(manifest) // 10)
\ No newline at end of file
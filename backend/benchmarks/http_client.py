@@ -0,0 +1,71 @@
+"""
+Minimal keep-alive HTTP/1.1 client over asyncio streams, for the load tests.
+Dependency free so benchmarks run anywhere the app does.
+"""
+
+import asyncio
+import json
+from typing import Dict, Optional, Tuple
+
+class HTTPConnection:
+    """One persistent connection; requests on it are sent one at a time"""
+
+    def __init__(self, host: str, port: int, headers: Optional[Dict[str, str]] = None):
+        self.host = host
+        self.port = port
+        self.headers = {"Host": f"localhost:{port}", "Accept-Encoding": "gzip", **(headers or {})}
+        self._reader: Optional[asyncio.StreamReader] = None
+        self._writer: Optional[asyncio.StreamWriter] = None
+
+    async def _connect(self):
+        self._reader, self._writer = await asyncio.open_connection(self.host, self.port)
+
+    async def request(
+        self,
+        method: str,
+        path: str,
+        json_body=None,
+        headers: Optional[Dict[str, str]] = None
+    ) -> Tuple[int, bytes]:
+        """Send a request and read the whole (still encoded) body"""
+        if self._writer is None:
+            await self._connect()
+        body = b"" if json_body is None else json.dumps(json_body).encode()
+        lines = [f"{method} {path} HTTP/1.1"]
+        for name, value in {**self.headers, **(headers or {})}.items():
+            lines.append(f"{name}: {value}")
+        if json_body is not None:
+            lines.append("Content-Type: application/json")
+        lines.append(f"Content-Length: {len(body)}")
+        self._writer.write(("\r\n".join(lines) + "\r\n\r\n").encode() + body)
+        await self._writer.drain()
+
+        head = await self._reader.readuntil(b"\r\n\r\n")
+        status_line, *header_lines = head.decode("latin-1").split("\r\n")
+        status = int(status_line.split(" ", 2)[1])
+        response_headers = {}
+        for line in header_lines:
+            if line:
+                name, _, value = line.partition(":")
+                response_headers[name.strip().lower()] = value.strip()
+
+        if response_headers.get("transfer-encoding") == "chunked":
+            chunks = []
+            while True:
+                size = int((await self._reader.readuntil(b"\r\n")).split(b";")[0], 16)
+                chunk = await self._reader.readexactly(size + 2)
+                if size == 0:
+                    break
+                chunks.append(chunk[:-2])
+            content = b"".join(chunks)
+        else:
+            content = await self._reader.readexactly(int(response_headers.get("content-length", 0)))
+
+        if response_headers.get("connection") == "close":
+            await self.close()
+        return status, content
+
+    async def close(self):
+        if self._writer is not None:
+            self._writer.close()
+            self._writer = self._reader = None
\ No newline at end of file
@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+"""
+Benchmark JSON encoding of representative subscription and testimonial lists
+Compares FastAPI's JSONResponse with FastJSONResponse and checks the bytes match
+"""
+
+import sys
+import os
+import timeit
+from datetime import date, datetime, timedelta, timezone
+from typing import List
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+from pydantic import TypeAdapter
+
+from app.responses import FastJSONResponse, orjson
+from app.schemas import ListResponse, Subscription, Testimonial
+
+ROWS = 500
+REPEAT = 5
+
+def sample_subscriptions(count: int):
+    created = datetime(2025, 1, 1, 8, 30, 15, 123456, tzinfo=timezone.utc)
+    return [
+        Subscription.model_construct(
+            id=i,
+            user_id=i % 97,
+            name=f"Customer {i}",
+            phone=f"08123456{i:04d}",
+            plan=("diet", "protein", "royal")[i % 3],
+            meal_types=["breakfast", "dinner"],
+            delivery_days=["monday", "wednesday", "friday"],
+            allergies="peanuts, shellfish" if i % 5 == 0 else None,
+            total_price=1161000.0 + i * 0.5,
+            is_active=i % 11 != 0,
+            pause_start_date=date(2025, 3, 1) if i % 7 == 0 else None,
+            pause_end_date=date(2025, 3, 14) if i % 7 == 0 else None,
+            created_at=created + timedelta(minutes=i),
+            updated_at=None
+        )
+        for i in range(count)
+    ]
+
+def sample_testimonials(count: int):
+    created = datetime(2025, 1, 1, 12, 0, 0)
+    return [
+        Testimonial.model_construct(
+            id=i,
+            user_id=i % 97,
+            name=f"Reviewer {i}",
+            message="Enak sekali, pengiriman tepat waktu! Très bon — 美味しい &amp; healthy meals every week.",
+            rating=i % 5 + 1,
+            is_approved=True,
+            created_at=created + timedelta(seconds=i * 37)
+        )
+        for i in range(count)
+    ]
+
+def benchmark(label: str, payload, adapter: TypeAdapter):
+    content = jsonable_encoder(payload)
+    standard = JSONResponse(content).body
+    fast = FastJSONResponse(content).body
+    if standard != fast:
+        print(f"❌ {label}: FastJSONResponse output differs from JSONResponse")
+        return False
+    if adapter.dump_json(payload) != standard:
+        print(f"❌ {label}: response_model output differs from JSONResponse")
+        return False
+
+    standard_time = min(timeit.repeat(lambda: JSONResponse(content), number=1, repeat=REPEAT * 20))
+    fast_time = min(timeit.repeat(lambda: FastJSONResponse(content), number=1, repeat=REPEAT * 20))
+    encode_time = min(timeit.repeat(lambda: jsonable_encoder(payload), number=1, repeat=REPEAT))
+    dump_time = min(timeit.repeat(lambda: adapter.dump_json(payload), number=1, repeat=REPEAT * 20))
+    print(f"✅ {label} ({len(standard)} bytes, identical output)")
+    print(f"   jsonable_encoder:  {encode_time * 1000:8.2f} ms")
+    print(f"   JSONResponse:      {standard_time * 1000:8.2f} ms")
+    print(f"   FastJSONResponse:  {fast_time * 1000:8.2f} ms ({standard_time / fast_time:.1f}x)")
+    # What routes with a response_model use on FastAPI versions that dump JSON via Pydantic
+    print(f"   Pydantic dump_json: {dump_time * 1000:7.2f} ms (validated model to bytes in one step)")
+    return True
+
+if __name__ == "__main__":
+    if orjson is None:
+        print("❌ orjson is not installed; FastJSONResponse falls back to the stdlib encoder")
+        sys.exit(1)
+    subscriptions = sample_subscriptions(ROWS)
+    testimonials = sample_testimonials(ROWS)
+    success = all([
+        benchmark(f"{ROWS} subscriptions", subscriptions, TypeAdapter(List[Subscription])),
+        benchmark(f"{ROWS} testimonials", ListResponse(
+            success=True,
+            message="Testimonials retrieved successfully",
+            data=testimonials,
+            total=len(testimonials)
+        ), TypeAdapter(ListResponse))
+    ])
+    if not success:
+        sys.exit(1)
\ No newline at end of file
@@ -0,0 +1,125 @@
+#!/usr/bin/env python3
+"""
+Spike test of the per-route-group concurrency limits: a flood of logins
+hits the API while a few readers fetch the public meal plans and
+testimonials. Runs once with every limit off and once with the defaults,
+and prints reader latency and how many requests got 503 or timed out.
+
+    python benchmarks/load_shedding.py --spike 120 --duration 20
+"""
+
+import sys
+import os
+import argparse
+import asyncio
+import shutil
+import signal
+import subprocess
+import tempfile
+import time
+from typing import Dict, List
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.concurrency import DEFAULT_ROUTE_GROUP_LIMITS
+from http_client import HTTPConnection
+from load_test import PASSWORD, seed_database, summarize, wait_until_ready
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Client-side timeout, like a browser or load balancer giving up
+REQUEST_TIMEOUT_SECONDS = 10
+
+READER_PATHS = ["/meal-plans/", "/testimonials/"]
+
+class Tally:
+    def __init__(self):
+        self.latencies: List[float] = []
+        self.shed = 0
+        self.timeouts = 0
+        self.errors = 0
+
+async def client_loop(port: int, label: str, request, stop_at: float, tallies: Dict[str, Tally]):
+    tally = tallies.setdefault(label, Tally())
+    connection = HTTPConnection("127.0.0.1", port, {"Accept-Encoding": "identity"})
+    try:
+        while time.monotonic() < stop_at:
+            started = time.monotonic()
+            try:
+                status, _ = await asyncio.wait_for(request(connection), REQUEST_TIMEOUT_SECONDS)
+            except asyncio.TimeoutError:
+                tally.timeouts += 1
+                await connection.close()
+                continue
+            except (OSError, asyncio.IncompleteReadError):
+                tally.errors += 1
+                await connection.close()
+                continue
+            if status == 200:
+                tally.latencies.append(time.monotonic() - started)
+            elif status == 503:
+                tally.shed += 1
+                # Back off briefly instead of hammering
+                await asyncio.sleep(0.1)
+            else:
+                tally.errors += 1
+    finally:
+        await connection.close()
+
+async def spike(args, emails: List[str]) -> Dict[str, Tally]:
+    await wait_until_ready(args.port)
+    tallies: Dict[str, Tally] = {}
+    stop_at = time.monotonic() + args.duration
+
+    def login(index: int):
+        body = {"email": emails[index % len(emails)], "password": PASSWORD}
+        return lambda connection: connection.request("POST", "/auth/login", json_body=body)
+
+    def read(path: str):
+        return lambda connection: connection.request("GET", path)
+
+    await asyncio.gather(
+        *(client_loop(args.port, "POST /auth/login", login(i), stop_at, tallies) for i in range(args.spike)),
+        *(client_loop(args.port, f"GET {path}", read(path), stop_at, tallies)
+          for path in (READER_PATHS[i % len(READER_PATHS)] for i in range(args.readers)))
+    )
+    return tallies
+
+def run_phase(args, workdir: str, emails: List[str], limits: bool) -> Dict[str, Tally]:
+    env = dict(os.environ, PORT=str(args.port), LOG_LEVEL="warning", MODERATION_WORKER="external")
+    if not limits:
+        env.update({f"CONCURRENCY_{group.upper()}": "0" for group in DEFAULT_ROUTE_GROUP_LIMITS})
+    server = subprocess.Popen(
+        [sys.executable, os.path.join(BACKEND_DIR, "run.py"), "--production", "--workers", "1"],
+        cwd=workdir, env=env, stdout=subprocess.DEVNULL
+    )
+    try:
+        return asyncio.run(spike(args, emails))
+    finally:
+        server.send_signal(signal.SIGTERM)
+        server.wait(timeout=60)
+
+def print_phase(title: str, tallies: Dict[str, Tally], duration: float):
+    print(title)
+    print(f"   {'endpoint':22} {'ok':>6} {'p50 ms':>9} {'p99 ms':>9} {'503':>6} {'timeout':>8} {'errors':>7}")
+    for label, tally in sorted(tallies.items()):
+        stats = summarize(tally.latencies, tally.errors, duration)
+        print(f"   {label:22} {stats['requests']:6} {stats['p50_ms']:9.1f} {stats['p99_ms']:9.1f} "
+              f"{tally.shed:6} {tally.timeouts:8} {tally.errors:7}")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Spike test of the per-route-group concurrency limits")
+    parser.add_argument("--spike", type=int, default=120, help="Connections flooding POST /auth/login")
+    parser.add_argument("--readers", type=int, default=4, help="Connections reading public pages")
+    parser.add_argument("--duration", type=float, default=20)
+    parser.add_argument("--users", type=int, default=200)
+    parser.add_argument("--port", type=int, default=8767)
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix="sea-shedding-")
+    try:
+        emails = seed_database(os.path.join(workdir, "sea_catering.db"), args.users, 1000, 500, seed=42)
+        for limits in (False, True):
+            tallies = run_phase(args, workdir, emails, limits)
+            print_phase("Default route group limits" if limits else "No limits", tallies, args.duration)
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
\ No newline at end of file
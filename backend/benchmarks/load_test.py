@@ -0,0 +1,295 @@
+#!/usr/bin/env python3
+"""
+End-to-end load test: seed a throwaway database, boot the API in production
+mode against it, replay a realistic traffic mix and write throughput and
+p50/p95/p99 latency per endpoint to a JSON result file.
+
+    python benchmarks/load_test.py                      # run, write benchmarks/results/
+    python benchmarks/load_test.py --compare old.json new.json
+"""
+
+import sys
+import os
+import argparse
+import asyncio
+import json
+import platform
+import random
+import shutil
+import signal
+import subprocess
+import tempfile
+import time
+from datetime import datetime, timezone
+from typing import List
+from urllib.parse import urlencode
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import create_engine, select
+
+from app.models import User
+from generate_data import DAYS, DEFAULT_PASSWORD as PASSWORD, MEAL_TYPES, generate
+from http_client import HTTPConnection
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+RESULTS_DIR = os.path.join(BACKEND_DIR, "benchmarks", "results")
+
+ADMIN_EMAIL = "admin@loadtest.example.com"
+
+PLANS = ["diet", "protein", "royal"]
+
+# (endpoint label, weight) of the replayed traffic mix
+TRAFFIC_MIX = [
+    ("GET /testimonials/", 30),
+    ("GET /subscriptions/", 30),
+    ("GET /meal-plans/", 12),
+    ("POST /subscriptions/", 12),
+    ("GET /dashboard/admin/metrics", 6),
+    ("GET /subscriptions/calculate-price/", 8),
+    ("POST /auth/login", 2)
+]
+
+def seed_database(path: str, users: int, subscriptions: int, testimonials: int, seed: int) -> List[str]:
+    """Fill a new SQLite database with generate_data plus an admin; returns the customers' emails"""
+    engine = create_engine(f"sqlite:///{path}")
+    try:
+        generate(engine, users, subscriptions, testimonials, meal_plans=3, seed=seed)
+        with engine.begin() as connection:
+            hashed_password = connection.execute(select(User.hashed_password).limit(1)).scalar()
+            connection.execute(User.__table__.insert(), [{
+                "full_name": "Load Test Admin", "email": ADMIN_EMAIL, "hashed_password": hashed_password,
+                "is_active": True, "is_admin": True
+            }])
+            return list(connection.execute(
+                select(User.email).where(User.is_admin == False, User.is_active == True).order_by(User.id)
+            ).scalars())
+    finally:
+        engine.dispose()
+
+def percentile(sorted_values, fraction: float) -> float:
+    """Nearest-rank percentile of an already sorted list"""
+    if not sorted_values:
+        return 0.0
+    rank = max(int(round(fraction * len(sorted_values) + 0.5)) - 1, 0)
+    return sorted_values[min(rank, len(sorted_values) - 1)]
+
+def summarize(latencies, errors: int, seconds: float) -> dict:
+    values = sorted(latencies)
+    return {
+        "requests": len(values),
+        "errors": errors,
+        "throughput_rps": round(len(values) / seconds, 1),
+        "mean_ms": round(sum(values) / len(values) * 1000, 2) if values else 0.0,
+        "p50_ms": round(percentile(values, 0.50) * 1000, 2),
+        "p95_ms": round(percentile(values, 0.95) * 1000, 2),
+        "p99_ms": round(percentile(values, 0.99) * 1000, 2),
+        "max_ms": round(values[-1] * 1000, 2) if values else 0.0
+    }
+
+class VirtualUser:
+    """A logged-in customer on one keep-alive connection, replaying the traffic mix"""
+
+    def __init__(self, index: int, port: int, emails: List[str], token: str, admin_token: str, seed: int):
+        self.index = index
+        self.emails = emails
+        self.connection = HTTPConnection("127.0.0.1", port)
+        self.auth = {"Authorization": f"Bearer {token}"}
+        self.admin_auth = {"Authorization": f"Bearer {admin_token}"}
+        self.random = random.Random(seed * 1000 + index)
+
+    async def call(self, label: str) -> int:
+        connection = self.connection
+        if label == "GET /testimonials/":
+            return (await connection.request("GET", "/testimonials/"))[0]
+        if label == "GET /subscriptions/":
+            return (await connection.request("GET", "/subscriptions/", headers=self.auth))[0]
+        if label == "GET /meal-plans/":
+            return (await connection.request("GET", "/meal-plans/"))[0]
+        if label == "POST /subscriptions/":
+            return (await connection.request("POST", "/subscriptions/", json_body={
+                "name": "Load Test Customer",
+                "phone": "081234567890",
+                "plan": self.random.choice(PLANS),
+                "meal_types": self.random.sample(MEAL_TYPES, self.random.randint(1, 3)),
+                "delivery_days": self.random.sample(DAYS, self.random.randint(1, 7))
+            }, headers=self.auth))[0]
+        if label == "GET /dashboard/admin/metrics":
+            return (await connection.request("GET", "/dashboard/admin/metrics", headers=self.admin_auth))[0]
+        if label == "GET /subscriptions/calculate-price/":
+            query = urlencode({
+                "plan": self.random.choice(PLANS),
+                "meal_types": json.dumps(self.random.sample(MEAL_TYPES, self.random.randint(1, 3))),
+                "delivery_days": json.dumps(self.random.sample(DAYS, self.random.randint(1, 7)))
+            })
+            return (await connection.request("GET", f"/subscriptions/calculate-price/?{query}", headers=self.auth))[0]
+        if label == "POST /auth/login":
+            return (await connection.request("POST", "/auth/login", json_body={
+                "email": self.random.choice(self.emails), "password": PASSWORD
+            }))[0]
+        raise ValueError(f"Unknown endpoint {label}")
+
+    async def run(self, start_at: float, stop_at: float, results: dict):
+        labels = [label for label, _ in TRAFFIC_MIX]
+        weights = [weight for _, weight in TRAFFIC_MIX]
+        try:
+            while True:
+                label = self.random.choices(labels, weights)[0]
+                started = time.monotonic()
+                if started >= stop_at:
+                    break
+                try:
+                    status = await self.call(label)
+                except (OSError, asyncio.IncompleteReadError):
+                    status = 0
+                    await self.connection.close()
+                finished = time.monotonic()
+                if started >= start_at:
+                    latencies, errors = results.setdefault(label, ([], [0]))
+                    if 200 <= status < 300:
+                        latencies.append(finished - started)
+                    else:
+                        errors[0] += 1
+        finally:
+            await self.connection.close()
+
+async def login(port: int, email: str) -> str:
+    connection = HTTPConnection("127.0.0.1", port, {"Accept-Encoding": "identity"})
+    try:
+        status, body = await connection.request("POST", "/auth/login", json_body={"email": email, "password": PASSWORD})
+        if status != 200:
+            raise RuntimeError(f"Login for {email} failed with {status}: {body[:200]!r}")
+        return json.loads(body)["access_token"]
+    finally:
+        await connection.close()
+
+async def wait_until_ready(port: int, timeout: float = 60):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        connection = HTTPConnection("127.0.0.1", port)
+        try:
+            if (await connection.request("GET", "/health"))[0] == 200:
+                return
+        except OSError:
+            await asyncio.sleep(0.2)
+        finally:
+            await connection.close()
+    raise RuntimeError("API did not start")
+
+async def replay(args, emails: List[str]) -> dict:
+    await wait_until_ready(args.port)
+    admin_token = await login(args.port, ADMIN_EMAIL)
+    tokens = [await login(args.port, emails[i % len(emails)]) for i in range(args.connections)]
+
+    start_at = time.monotonic() + args.warmup
+    stop_at = start_at + args.duration
+    results = {}
+    await asyncio.gather(*(
+        VirtualUser(i, args.port, emails, tokens[i], admin_token, args.seed).run(start_at, stop_at, results)
+        for i in range(args.connections)
+    ))
+    return results
+
+def git_revision() -> dict:
+    def git(*command):
+        return subprocess.run(["git", *command], cwd=BACKEND_DIR, capture_output=True, text=True).stdout.strip()
+    return {"commit": git("rev-parse", "--short", "HEAD") or "unknown", "dirty": bool(git("status", "--porcelain", "--", "."))}
+
+def run(args) -> str:
+    workdir = tempfile.mkdtemp(prefix="sea-load-")
+    print(f"Seeding {args.users} users, {args.subscriptions} subscriptions, {args.testimonials} testimonials...")
+    emails = seed_database(os.path.join(workdir, "sea_catering.db"), args.users, args.subscriptions, args.testimonials, args.seed)
+
+    env = dict(os.environ, PORT=str(args.port), LOG_LEVEL="warning", MODERATION_WORKER="external")
+    server = subprocess.Popen(
+        [sys.executable, os.path.join(BACKEND_DIR, "run.py"), "--production", "--workers", str(args.workers)],
+        cwd=workdir, env=env, stdout=subprocess.DEVNULL
+    )
+    try:
+        print(f"Replaying traffic over {args.connections} connections for {args.duration:.0f}s (+{args.warmup:.0f}s warm-up)...")
+        results = asyncio.run(replay(args, emails))
+    finally:
+        server.send_signal(signal.SIGTERM)
+        server.wait(timeout=60)
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    revision = git_revision()
+    endpoints = {label: summarize(latencies, errors[0], args.duration) for label, (latencies, errors) in sorted(results.items())}
+    report = {
+        "meta": {
+            **revision,
+            "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpus": os.cpu_count(),
+            "workers": args.workers,
+            "connections": args.connections,
+            "duration_seconds": args.duration,
+            "warmup_seconds": args.warmup,
+            "seed": args.seed,
+            "dataset": {"users": args.users, "subscriptions": args.subscriptions, "testimonials": args.testimonials}
+        },
+        "total": summarize(
+            [latency for latencies, _ in results.values() for latency in latencies],
+            sum(errors[0] for _, errors in results.values()),
+            args.duration
+        ),
+        "endpoints": endpoints
+    }
+
+    output = args.output or os.path.join(RESULTS_DIR, f"load_test-{revision['commit']}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, "w") as f:
+        json.dump(report, f, indent=2, sort_keys=True)
+        f.write("\n")
+    print_report(report)
+    print(f"Results written to {output}")
+    return output
+
+def print_report(report: dict):
+    print(f"{'endpoint':38} {'req/s':>8} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'errors':>7}")
+    for label, stats in list(report["endpoints"].items()) + [("total", report["total"])]:
+        print(f"{label:38} {stats['throughput_rps']:8.1f} {stats['p50_ms']:8.2f} {stats['p95_ms']:8.2f} "
+              f"{stats['p99_ms']:8.2f} {stats['errors']:7}")
+
+def compare(old_path: str, new_path: str):
+    """Print per-endpoint changes between two result files"""
+    with open(old_path) as f:
+        old = json.load(f)
+    with open(new_path) as f:
+        new = json.load(f)
+    print(f"{old['meta']['commit']} -> {new['meta']['commit']}")
+    print(f"{'endpoint':38} {'req/s':>16} {'p50':>16} {'p95':>16} {'p99':>16}")
+
+    def change(before: float, after: float) -> str:
+        return f"{after:9.1f} ({(after - before) / before:+6.1%})" if before else f"{after:9.1f}        "
+
+    labels = sorted(set(old["endpoints"]) | set(new["endpoints"]))
+    for label in labels + ["total"]:
+        before = old["total"] if label == "total" else old["endpoints"].get(label)
+        after = new["total"] if label == "total" else new["endpoints"].get(label)
+        if not before or not after:
+            print(f"{label:38} only in {'new' if after else 'old'} results")
+            continue
+        print(f"{label:38} " + " ".join(
+            change(before[key], after[key]) for key in ("throughput_rps", "p50_ms", "p95_ms", "p99_ms")
+        ))
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="End-to-end load test of the SEA Catering API")
+    parser.add_argument("--compare", nargs=2, metavar=("OLD", "NEW"), help="Compare two result files and exit")
+    parser.add_argument("--workers", type=int, default=1)
+    parser.add_argument("--connections", type=int, default=32)
+    parser.add_argument("--duration", type=float, default=30)
+    parser.add_argument("--warmup", type=float, default=5)
+    parser.add_argument("--users", type=int, default=500)
+    parser.add_argument("--subscriptions", type=int, default=20000)
+    parser.add_argument("--testimonials", type=int, default=2000)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--port", type=int, default=8766)
+    parser.add_argument("--output", help="Result file (default: benchmarks/results/load_test-<commit>.json)")
+    args = parser.parse_args()
+
+    if args.compare:
+        compare(*args.compare)
+    else:
+        run(args)
\ No newline at end of file
@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+"""
+Benchmark GET /subscriptions/ latency while stdout is a slow sink
+Each write to stdout blocks, like a full pipe to a log collector would
+
+    python benchmarks/logging_overhead.py --subscriptions 20 --write-ms 1
+"""
+
+import sys
+import os
+import argparse
+import json
+import shutil
+import tempfile
+import time
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+class SlowStream:
+    """Text stream whose writes take write_ms each"""
+
+    def __init__(self, write_ms: float):
+        self.delay = write_ms / 1000
+        self.writes = 0
+
+    def write(self, text: str) -> int:
+        time.sleep(self.delay)
+        self.writes += 1
+        return len(text)
+
+    def flush(self):
+        pass
+
+def percentile(sorted_values, fraction: float) -> float:
+    return sorted_values[min(int(len(sorted_values) * fraction), len(sorted_values) - 1)]
+
+def seed(subscriptions: int) -> str:
+    from app.database import SessionLocal
+    from app.auth import create_access_token
+    from app.models import Subscription, User
+
+    db = SessionLocal()
+    try:
+        user = User(full_name="Budi Santoso", email="budi@example.com", hashed_password="x")
+        db.add(user)
+        db.flush()
+        db.add_all([
+            Subscription(
+                user_id=user.id, name="Budi Santoso", phone="6281234567890", plan="protein",
+                meal_types=json.dumps(["breakfast", "lunch"]), delivery_days=json.dumps(["monday", "friday"]),
+                allergies="peanuts", total_price=688000.0
+            )
+            for _ in range(subscriptions)
+        ])
+        db.commit()
+        return create_access_token({"sub": str(user.id)})
+    finally:
+        db.close()
+
+def run(args) -> dict:
+    from fastapi.testclient import TestClient
+    from app.main import app
+
+    sink = SlowStream(args.write_ms)
+    stdout = sys.stdout
+    sys.stdout = sink
+    try:
+        with TestClient(app, base_url="http://localhost") as client:
+            headers = {"Authorization": f"Bearer {seed(args.subscriptions)}"}
+            for _ in range(args.warmup):
+                client.get("/subscriptions/", headers=headers)
+            latencies = []
+            for _ in range(args.requests):
+                started = time.perf_counter()
+                response = client.get("/subscriptions/", headers=headers)
+                latencies.append(time.perf_counter() - started)
+                assert response.status_code == 200, response.text
+    finally:
+        sys.stdout = stdout
+    latencies.sort()
+    return {
+        "p50_ms": percentile(latencies, 0.5) * 1000,
+        "p95_ms": percentile(latencies, 0.95) * 1000,
+        "p99_ms": percentile(latencies, 0.99) * 1000,
+        "writes": sink.writes
+    }
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--subscriptions", type=int, default=20, help="Subscriptions of the requesting user")
+    parser.add_argument("--requests", type=int, default=300)
+    parser.add_argument("--warmup", type=int, default=20)
+    parser.add_argument("--write-ms", type=float, default=1.0, help="Time each write to stdout takes")
+    parser.add_argument("--log-level", default=os.getenv("LOG_LEVEL", "info"))
+    args = parser.parse_args()
+
+    # Read by the app at import time; the database goes to the current directory
+    os.environ["LOG_LEVEL"] = args.log_level
+    os.environ["MODERATION_WORKER"] = "external"
+    workdir = tempfile.mkdtemp(prefix="logging_overhead-")
+    os.chdir(workdir)
+    try:
+        result = run(args)
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    print(f"GET /subscriptions/ with {args.subscriptions} subscriptions, "
+          f"{args.write_ms:g} ms per stdout write, LOG_LEVEL={args.log_level}")
+    print(f"   p50 {result['p50_ms']:7.2f} ms   p95 {result['p95_ms']:7.2f} ms   p99 {result['p99_ms']:7.2f} ms")
+    print(f"   {result['writes']} writes to stdout")
\ No newline at end of file
@@ -0,0 +1,53 @@
+#!/usr/bin/env python3
+"""
+Benchmark the per-request cost of MetricsMiddleware
+Drives a minimal ASGI app directly, with and without the middleware
+"""
+
+import sys
+import os
+import asyncio
+import time
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.metrics import MetricsMiddleware, RequestMetrics
+
+REQUESTS = 200000
+
+class Route:
+    path = "/subscriptions/{subscription_id}"
+
+async def endpoint(scope, receive, send):
+    scope["route"] = Route
+    await send({"type": "http.response.start", "status": 200, "headers": []})
+    await send({"type": "http.response.body", "body": b"{}"})
+
+async def receive():
+    return {"type": "http.request", "body": b""}
+
+async def send(message):
+    pass
+
+async def drive(app) -> float:
+    scope = {"type": "http", "method": "GET", "path": "/subscriptions/1"}
+    start = time.perf_counter()
+    for _ in range(REQUESTS):
+        await app(dict(scope), receive, send)
+    return (time.perf_counter() - start) / REQUESTS
+
+def benchmark_record() -> float:
+    metrics = RequestMetrics()
+    start = time.perf_counter()
+    for i in range(REQUESTS):
+        metrics.record_request("GET", "/subscriptions/{subscription_id}", 200, 0.004)
+    return (time.perf_counter() - start) / REQUESTS
+
+if __name__ == "__main__":
+    bare = min(asyncio.run(drive(endpoint)) for _ in range(3))
+    wrapped = min(asyncio.run(drive(MetricsMiddleware(endpoint))) for _ in range(3))
+    record = min(benchmark_record() for _ in range(3))
+    print(f"{REQUESTS} requests through a minimal ASGI app")
+    print(f"   without metrics:   {bare * 1e6:6.2f} us/request")
+    print(f"   with metrics:      {wrapped * 1e6:6.2f} us/request")
+    print(f"   overhead:          {(wrapped - bare) * 1e6:6.2f} us/request")
+    print(f"   record_request():  {record * 1e6:6.2f} us")
\ No newline at end of file
@@ -0,0 +1,242 @@
+#!/usr/bin/env python3
+"""
+Micro-benchmarks of the auth helpers, schema validators and price calculation
+Compares each case with the stored baseline and exits with 1 when one regressed
+
+    python benchmarks/micro.py              # compare with benchmarks/micro_baseline.json
+    python benchmarks/micro.py --save       # record a new baseline
+    python benchmarks/micro.py --save -k schemas.   # re-record only the matching cases
+"""
+
+import sys
+import os
+import argparse
+import gc
+import json
+import platform
+import subprocess
+import time
+from datetime import date, datetime, timedelta, timezone
+from types import SimpleNamespace
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from pydantic import ValidationError
+
+from app.auth import (
+    create_access_token, sanitize_input, validate_email, validate_password, validate_phone, verify_token
+)
+from app.routes.subscriptions import calculate_total_price
+from app.schemas import (
+    MealPlanCreate, PauseSubscriptionRequest, Subscription, SubscriptionBase, TestimonialBulkRequest,
+    TestimonialCreate, UserCreate
+)
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+BASELINE_PATH = os.path.join(BACKEND_DIR, "benchmarks", "micro_baseline.json")
+
+# Each repeat runs a case for about this long; the fastest repeat counts
+REPEAT_SECONDS = 0.02
+REPEAT = 9
+
+# Passes over all cases; a case keeps its fastest pass, so a burst of load
+# from other processes has to hit every pass to skew it
+PASSES = 3
+
+# Cases over the threshold are measured again this many times before they
+# count as a regression, so a noisy neighbour does not fail the run
+RETRIES = 2
+
+# Slowdown beyond which a case fails, relative to the baseline
+DEFAULT_THRESHOLD = 0.25
+
+MESSAGE = (
+    "Makanannya enak dan selalu datang tepat waktu. The <b>protein plan</b> keeps me full "
+    "through long workdays & the portions are generous. Highly recommended for busy people!"
+)
+HOSTILE_MESSAGE = '<script>alert("x")</script><img src=x onerror=alert(1)> javascript:void(0) Nice food!'
+SUBSCRIPTION = {
+    "name": "Budi Santoso",
+    "phone": "+62 812-3456-7890",
+    "plan": "protein",
+    "meal_types": ["breakfast", "lunch", "dinner"],
+    "delivery_days": ["monday", "tuesday", "wednesday", "thursday", "friday"],
+    "allergies": "peanuts, shellfish"
+}
+SUBSCRIPTION_ROW = SimpleNamespace(
+    id=42,
+    user_id=7,
+    total_price=2580000.0,
+    is_active=True,
+    pause_start_date=date(2025, 3, 1),
+    pause_end_date=date(2025, 3, 14),
+    created_at=datetime(2025, 1, 1, 8, 30, tzinfo=timezone.utc),
+    updated_at=None,
+    **{**SUBSCRIPTION, "phone": "6281234567890"}
+)
+TOKEN = create_access_token({"sub": "42"}, timedelta(minutes=30))
+TAMPERED_TOKEN = TOKEN[:-4] + ("AAAA" if not TOKEN.endswith("AAAA") else "BBBB")
+
+def expect_invalid(model, data):
+    try:
+        model(**data)
+    except ValidationError:
+        return
+    raise AssertionError(f"{model.__name__} accepted invalid input")
+
+# name -> zero-argument callable with representative input
+CASES = {
+    "auth.sanitize_input[name]": lambda: sanitize_input("Budi Santoso"),
+    "auth.sanitize_input[message]": lambda: sanitize_input(MESSAGE),
+    "auth.sanitize_input[hostile]": lambda: sanitize_input(HOSTILE_MESSAGE),
+    "auth.validate_email[valid]": lambda: validate_email("budi.santoso42@example.com"),
+    "auth.validate_email[invalid]": lambda: validate_email("budi.santoso42@example"),
+    "auth.validate_phone": lambda: validate_phone("+62 812-3456-7890"),
+    "auth.validate_password": lambda: validate_password("Password123!"),
+    "auth.create_access_token": lambda: create_access_token({"sub": "42"}, timedelta(minutes=30)),
+    "auth.verify_token[valid]": lambda: verify_token(TOKEN),
+    "auth.verify_token[tampered]": lambda: verify_token(TAMPERED_TOKEN),
+    "schemas.UserCreate": lambda: UserCreate(full_name="Budi Santoso", email="budi@example.com", password="Password123!"),
+    "schemas.SubscriptionBase": lambda: SubscriptionBase(**SUBSCRIPTION),
+    "schemas.SubscriptionBase[invalid]": lambda: expect_invalid(SubscriptionBase, {**SUBSCRIPTION, "plan": "gold"}),
+    "schemas.Subscription[from_attributes]": lambda: Subscription.model_validate(SUBSCRIPTION_ROW),
+    "schemas.TestimonialCreate": lambda: TestimonialCreate(name="Budi Santoso", message=MESSAGE, rating=5),
+    "schemas.MealPlanCreate": lambda: MealPlanCreate(
+        name="Protein Plan", description="High protein meals for active people",
+        price_per_meal=40000, plan_type="protein", features=["High protein", "Lean meats"]
+    ),
+    "schemas.PauseSubscriptionRequest": lambda: PauseSubscriptionRequest(
+        pause_start_date="2025-03-01", pause_end_date="2025-03-14"
+    ),
+    "schemas.TestimonialBulkRequest": lambda: TestimonialBulkRequest(ids=list(range(100))),
+    "calculate_total_price": lambda: calculate_total_price(
+        "royal", ["breakfast", "lunch", "dinner"], ["monday", "wednesday", "friday", "saturday"]
+    )
+}
+
+def calibration():
+    """Fixed pure-Python workload; results are stored relative to it so
+    baselines carry over between machines of different speed"""
+    total = 0
+    for i in range(200):
+        total += len(str(i)) * (i % 7)
+    return total
+
+def measure(function) -> float:
+    """Fastest of REPEAT timed runs with the garbage collector off, in nanoseconds per call"""
+    gc_was_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        return _measure(function)
+    finally:
+        if gc_was_enabled:
+            gc.enable()
+
+def _measure(function) -> float:
+    number = 1
+    while True:
+        started = time.perf_counter()
+        for _ in range(number):
+            function()
+        elapsed = time.perf_counter() - started
+        if elapsed >= REPEAT_SECONDS / 10:
+            break
+        number *= 10
+    number = max(int(number * REPEAT_SECONDS / elapsed), 1)
+
+    best = float("inf")
+    for _ in range(REPEAT):
+        started = time.perf_counter()
+        for _ in range(number):
+            function()
+        best = min(best, (time.perf_counter() - started) / number)
+    return best * 1e9
+
+def git_commit() -> str:
+    result = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=BACKEND_DIR, capture_output=True, text=True)
+    return result.stdout.strip() or "unknown"
+
+def run(selected, passes: int = PASSES) -> dict:
+    calibration_ns = float("inf")
+    best = {name: float("inf") for name in selected}
+    for _ in range(passes):
+        calibration_ns = min(calibration_ns, measure(calibration))
+        for name in selected:
+            best[name] = min(best[name], measure(CASES[name]))
+    cases = {name: {"ns": round(ns, 1), "relative": round(ns / calibration_ns, 4)} for name, ns in best.items()}
+    return {
+        "meta": {
+            "commit": git_commit(),
+            "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "platform": platform.platform()
+        },
+        "calibration_ns": round(calibration_ns, 1),
+        "cases": cases
+    }
+
+def compare(results: dict, baseline: dict, threshold: float) -> bool:
+    """Print each case against the baseline; False if any slowed down beyond threshold"""
+    print(f"{'case':40} {'ns/call':>10} {'baseline':>10} {'change':>8}")
+    passed = True
+    for name, case in results["cases"].items():
+        before = baseline["cases"].get(name)
+        if before is None:
+            print(f"{name:40} {case['ns']:10.0f} {'-':>10} {'new':>8}")
+            continue
+        # Relative to the calibration loop, so a slower machine is not a regression
+        change = case["relative"] / before["relative"] - 1
+        for _ in range(RETRIES if change > threshold else 0):
+            ns = measure(CASES[name])
+            if ns < case["ns"]:
+                case.update(ns=round(ns, 1), relative=round(ns / results["calibration_ns"], 4))
+            change = case["relative"] / before["relative"] - 1
+            if change <= threshold:
+                break
+        status = ""
+        if change > threshold:
+            status = "  ❌ regression"
+            passed = False
+        elif change < -threshold:
+            status = "  ✅ faster"
+        expected = before["relative"] * results["calibration_ns"]
+        print(f"{name:40} {case['ns']:10.0f} {expected:10.0f} {change:+8.1%}{status}")
+    return passed
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--save", action="store_true",
+                        help="Store the results as the new baseline; with -k, only for the matching cases")
+    parser.add_argument("--baseline", default=BASELINE_PATH)
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD,
+                        help=f"Allowed slowdown before failing (default {DEFAULT_THRESHOLD * 100:.0f}%%)")
+    parser.add_argument("-k", dest="keyword", default="", help="Only run cases whose name contains this")
+    args = parser.parse_args()
+
+    selected = [name for name in CASES if args.keyword in name]
+    # A baseline is measured with twice the passes, so it is not itself an outlier
+    results = run(selected, PASSES * 2 if args.save else PASSES)
+
+    if args.save:
+        if args.keyword and os.path.exists(args.baseline):
+            # Other cases keep their recorded numbers, which stay comparable
+            # since each is stored relative to its own run's calibration
+            with open(args.baseline) as f:
+                saved = json.load(f)
+            saved["cases"].update(results["cases"])
+            results = dict(results, cases=saved["cases"])
+        with open(args.baseline, "w") as f:
+            json.dump(results, f, indent=2)
+            f.write("\n")
+        for name in selected:
+            print(f"{name:40} {results['cases'][name]['ns']:10.0f} ns")
+        print(f"✅ Baseline saved to {args.baseline}")
+    elif not os.path.exists(args.baseline):
+        print(f"❌ No baseline at {args.baseline}; run with --save first")
+        sys.exit(1)
+    else:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        if not compare(results, baseline, args.threshold):
+            print(f"❌ Slower than the baseline by more than {args.threshold:.0%}")
+            sys.exit(1)
+        print(f"✅ No regressions beyond {args.threshold:.0%}")
\ No newline at end of file
@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+"""
+Benchmark the revenue forecast endpoint against a per-subscription reference
+Seeds a throwaway database, times GET /dashboard/admin/forecast/revenue for
+several horizons and checks every day against totals computed by walking
+each subscription's delivery days in Python
+
+    python benchmarks/revenue_forecast.py --subscriptions 300000
+"""
+
+import sys
+import os
+import argparse
+import json
+import shutil
+import tempfile
+import time
+from datetime import date, timedelta
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+REPEAT = 3
+
+HORIZON_WEEKS = [4, 13, 26]
+
+def best_ms(function) -> float:
+    timings = []
+    for _ in range(REPEAT):
+        started = time.perf_counter()
+        function()
+        timings.append(time.perf_counter() - started)
+    return min(timings) * 1000
+
+def per_subscription(db, start_date: date, end_date: date) -> dict:
+    """date -> [revenue, meals, deliveries], one subscription at a time"""
+    from app.forecasting import DAY_NAMES, WEEKS_PER_MONTH
+    from app.models import Subscription
+
+    horizon = [start_date + timedelta(days=offset) for offset in range((end_date - start_date).days + 1)]
+    by_weekday = {weekday: [day for day in horizon if day.weekday() == weekday] for weekday in range(7)}
+    totals = {day: [0.0, 0, 0] for day in horizon}
+    rows = db.query(
+        Subscription.delivery_days, Subscription.meal_types, Subscription.total_price,
+        Subscription.pause_start_date, Subscription.pause_end_date
+    ).filter(Subscription.is_active == True)
+    for delivery_days, meal_types, total_price, pause_start, pause_end in rows.yield_per(10000):
+        if pause_start is not None and pause_end is None:
+            continue
+        weekdays = {DAY_NAMES.index(day) for day in json.loads(delivery_days) if day in DAY_NAMES}
+        if not weekdays:
+            continue
+        revenue = total_price / (len(weekdays) * WEEKS_PER_MONTH)
+        meals = len(json.loads(meal_types))
+        for weekday in weekdays:
+            for day in by_weekday[weekday]:
+                if pause_start is not None and pause_start <= day <= pause_end:
+                    continue
+                total = totals[day]
+                total[0] += revenue
+                total[1] += meals
+                total[2] += 1
+    return totals
+
+def matches(days: list, reference: dict) -> bool:
+    for day in days:
+        revenue, meals, deliveries = reference[date.fromisoformat(day["date"])]
+        if day["meals"] != meals or day["deliveries"] != deliveries or abs(day["revenue"] - revenue) > 0.01:
+            return False
+    return len(days) == len(reference)
+
+def run(args) -> list:
+    from fastapi.testclient import TestClient
+    from app.auth import create_access_token
+    from app.database import SessionLocal
+    from app.main import app
+    from app.models import User
+    from load_test import ADMIN_EMAIL
+
+    db = SessionLocal()
+    try:
+        admin = db.query(User).filter(User.email == ADMIN_EMAIL).one()
+        headers = {"Authorization": f"Bearer {create_access_token({'sub': str(admin.id)})}"}
+        start_date = date.today()
+        results = []
+        with TestClient(app, base_url="http://localhost") as client:
+            for weeks in HORIZON_WEEKS:
+                url = f"/dashboard/admin/forecast/revenue?weeks={weeks}&start_date={start_date}"
+                response = client.get(url, headers=headers)
+                assert response.status_code == 200, response.text
+                end_date = start_date + timedelta(weeks=weeks) - timedelta(days=1)
+                started = time.perf_counter()
+                reference = per_subscription(db, start_date, end_date)
+                # Slow enough that one run is representative
+                per_subscription_ms = (time.perf_counter() - started) * 1000
+                results.append({
+                    "weeks": weeks,
+                    "matches": matches(response.json()["days"], reference),
+                    "endpoint_ms": best_ms(lambda: client.get(url, headers=headers)),
+                    "per_subscription_ms": per_subscription_ms
+                })
+        return results
+    finally:
+        db.close()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--subscriptions", type=int, default=300000)
+    parser.add_argument("--users", type=int, default=5000)
+    args = parser.parse_args()
+
+    # Read by the app at import time; the database goes to the current
+    # directory, so change to it before anything imports the app
+    os.environ["LOG_LEVEL"] = "warning"
+    os.environ["MODERATION_WORKER"] = "external"
+    workdir = tempfile.mkdtemp(prefix="revenue_forecast-")
+    os.chdir(workdir)
+    try:
+        from load_test import seed_database
+        seed_database(os.path.join(workdir, "sea_catering.db"), args.users, args.subscriptions, 0, seed=42)
+        results = run(args)
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    print(f"Revenue forecast over {args.subscriptions} subscriptions, endpoint best of {REPEAT}")
+    for result in results:
+        status = "✅" if result["matches"] else "❌ differs from the reference"
+        print(f"   {result['weeks']:3} weeks   endpoint {result['endpoint_ms']:8.1f} ms   "
+              f"per subscription {result['per_subscription_ms']:8.1f} ms   {status}")
+    if not all(result["matches"] for result in results):
+        sys.exit(1)
\ No newline at end of file
@@ -0,0 +1,157 @@
+#!/usr/bin/env python3
+"""
+Benchmark validation and serialization of 1,000-item subscription and testimonial lists
+Times the schemas on their own, then the list endpoints end to end
+
+    python benchmarks/schema_lists.py --items 1000
+"""
+
+import sys
+import os
+import argparse
+import json
+import shutil
+import tempfile
+import time
+from datetime import date, datetime, timedelta, timezone
+from types import SimpleNamespace
+from typing import List
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from pydantic import TypeAdapter
+
+from app.schemas import Subscription, SubscriptionBase, Testimonial, TestimonialCreate
+
+REPEAT = 15
+
+MEAL_TYPES = [["breakfast", "lunch"], ["lunch", "dinner"], ["breakfast", "lunch", "dinner"]]
+DELIVERY_DAYS = [["monday", "wednesday", "friday"], ["monday", "tuesday", "wednesday", "thursday", "friday"]]
+
+def subscription_input(i: int) -> dict:
+    return {
+        "name": f"Budi Santoso {'ABCDEFGH'[i % 8]}",
+        "phone": f"+62 812-{i % 10000:04d}-7890",
+        "plan": ("diet", "protein", "royal")[i % 3],
+        "meal_types": MEAL_TYPES[i % 3],
+        "delivery_days": DELIVERY_DAYS[i % 2],
+        "allergies": "peanuts, shellfish" if i % 4 == 0 else None
+    }
+
+def subscription_row(i: int, created: datetime) -> SimpleNamespace:
+    """Stands in for an ORM row, as read from the database"""
+    data = subscription_input(i)
+    return SimpleNamespace(
+        id=i + 1, user_id=1, total_price=688000.0, is_active=i % 10 != 0,
+        pause_start_date=date(2025, 3, 1) if i % 7 == 0 else None,
+        pause_end_date=date(2025, 3, 14) if i % 7 == 0 else None,
+        created_at=created - timedelta(hours=i), updated_at=None,
+        **{**data, "phone": "6281234567890", "meal_types": json.dumps(data["meal_types"]),
+           "delivery_days": json.dumps(data["delivery_days"])}
+    )
+
+def testimonial_input(i: int) -> dict:
+    return {
+        "name": f"Siti Rahayu {'ABCDEFGH'[i % 8]}",
+        "message": "Makanannya enak dan selalu datang tepat waktu, porsinya pas untuk kerja seharian.",
+        "rating": i % 5 + 1
+    }
+
+def testimonial_row(i: int, created: datetime) -> SimpleNamespace:
+    return SimpleNamespace(id=i + 1, user_id=i % 50 + 1, is_approved=i % 3 != 0,
+                           created_at=created - timedelta(hours=i), **testimonial_input(i))
+
+def best_ms(function) -> float:
+    timings = []
+    for _ in range(REPEAT):
+        started = time.perf_counter()
+        function()
+        timings.append(time.perf_counter() - started)
+    return min(timings) * 1000
+
+def schema_cases(items: int) -> dict:
+    created = datetime(2025, 6, 1, 8, 0, tzinfo=timezone.utc)
+    subscription_inputs = [subscription_input(i) for i in range(items)]
+    testimonial_inputs = [testimonial_input(i) for i in range(items)]
+    subscription_rows = [subscription_row(i, created) for i in range(items)]
+    testimonial_rows = [testimonial_row(i, created) for i in range(items)]
+
+    subscription_inputs_adapter = TypeAdapter(List[SubscriptionBase])
+    testimonial_inputs_adapter = TypeAdapter(List[TestimonialCreate])
+    subscriptions_adapter = TypeAdapter(List[Subscription])
+    testimonials_adapter = TypeAdapter(List[Testimonial])
+
+    return {
+        "subscriptions: validate request bodies": lambda: subscription_inputs_adapter.validate_python(subscription_inputs),
+        "subscriptions: rows to JSON": lambda: subscriptions_adapter.dump_json(
+            subscriptions_adapter.validate_python(subscription_rows, from_attributes=True)
+        ),
+        "testimonials: validate request bodies": lambda: testimonial_inputs_adapter.validate_python(testimonial_inputs),
+        "testimonials: rows to JSON": lambda: testimonials_adapter.dump_json(
+            testimonials_adapter.validate_python(testimonial_rows, from_attributes=True)
+        )
+    }
+
+def seed(items: int) -> str:
+    from app.auth import create_access_token
+    from app.database import SessionLocal
+    from app.models import Subscription as SubscriptionModel, Testimonial as TestimonialModel, User
+
+    created = datetime(2025, 6, 1, 8, 0, tzinfo=timezone.utc)
+    db = SessionLocal()
+    try:
+        user = User(full_name="Budi Santoso", email="budi@example.com", hashed_password="x")
+        db.add(user)
+        db.flush()
+        for i in range(items):
+            row = vars(subscription_row(i, created))
+            row.pop("id")
+            db.add(SubscriptionModel(**{**row, "user_id": user.id}))
+            row = vars(testimonial_row(i, created))
+            row.pop("id")
+            db.add(TestimonialModel(**{**row, "user_id": user.id}))
+        db.commit()
+        return create_access_token({"sub": str(user.id)})
+    finally:
+        db.close()
+
+def endpoint_cases(items: int) -> dict:
+    """Request time of the list endpoints against a temporary SQLite database"""
+    from fastapi.testclient import TestClient
+    from app.main import app
+
+    results = {}
+    with TestClient(app, base_url="http://localhost") as client:
+        headers = {"Authorization": f"Bearer {seed(items)}"}
+        requests = {
+            "GET /subscriptions/": ("/subscriptions/", headers),
+            # The public feed pages at most 100; a user's own list is returned whole
+            "GET /testimonials/my": ("/testimonials/my", headers)
+        }
+        for name, (url, request_headers) in requests.items():
+            response = client.get(url, headers=request_headers)
+            assert response.status_code == 200, response.text
+            results[name] = best_ms(lambda: client.get(url, headers=request_headers))
+    return results
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--items", type=int, default=1000, help="Items per list")
+    parser.add_argument("--skip-endpoints", action="store_true", help="Only time the schemas")
+    args = parser.parse_args()
+
+    print(f"{args.items} items per list, best of {REPEAT}")
+    for name, function in schema_cases(args.items).items():
+        print(f"   {name:45} {best_ms(function):8.2f} ms")
+
+    if not args.skip_endpoints:
+        # Read by the app at import time; the database goes to the current directory
+        os.environ["MODERATION_WORKER"] = "external"
+        workdir = tempfile.mkdtemp(prefix="schema_lists-")
+        os.chdir(workdir)
+        try:
+            timings = endpoint_cases(args.items)
+        finally:
+            shutil.rmtree(workdir, ignore_errors=True)
+        print(f"Endpoints, best of {REPEAT}")
+        for name, ms in timings.items():
+            print(f"   {name:45} {ms:8.2f} ms")
\ No newline at end of file
@@ -0,0 +1,143 @@
+#!/usr/bin/env python3
+"""
+Benchmark database connection checkouts and hold times under concurrent load
+Clients replay a mix of authenticated reads, writes and requests rejected
+before their first query; each response body takes send-ms to reach the
+client, like a slow network would
+
+    python benchmarks/session_hold.py --clients 32 --duration 15 --send-ms 5
+"""
+
+import sys
+import os
+import argparse
+import asyncio
+import random
+import shutil
+import tempfile
+import threading
+import time
+from typing import List
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# (method, path, authenticated, body) with weights; the last three are
+# rejected before any query (no token, bad token, invalid body)
+TRAFFIC_MIX = [
+    (("GET", "/subscriptions/", True, None), 30),
+    (("GET", "/testimonials/", False, None), 20),
+    (("GET", "/auth/me", True, None), 15),
+    (("POST", "/subscriptions/", True, {
+        "name": "Load Test Customer", "phone": "081234567890", "plan": "protein",
+        "meal_types": ["lunch"], "delivery_days": ["monday", "thursday"]
+    }), 10),
+    (("GET", "/subscriptions/", False, None), 10),
+    (("GET", "/auth/me", "bad", None), 10),
+    (("POST", "/auth/login", False, {"email": "not-an-email"}), 5)
+]
+
+class HoldRecorder:
+    """Counts checkouts of the app's engine and times how long each is held"""
+
+    def __init__(self, engine):
+        from sqlalchemy import event
+        self.holds: List[float] = []
+        self.checkouts = 0
+        self.lock = threading.Lock()
+        event.listen(engine, "checkout", self.checkout)
+        event.listen(engine, "checkin", self.checkin)
+
+    def checkout(self, dbapi_connection, connection_record, connection_proxy):
+        connection_record.info["benchmark_checkout"] = time.perf_counter()
+        with self.lock:
+            self.checkouts += 1
+
+    def checkin(self, dbapi_connection, connection_record):
+        start = connection_record.info.pop("benchmark_checkout", None)
+        if start is not None:
+            with self.lock:
+                self.holds.append(time.perf_counter() - start)
+
+def slow_sends(app, send_ms: float):
+    """Wrap an ASGI app so every response body message takes send_ms"""
+    delay = send_ms / 1000
+
+    async def wrapped(scope, receive, send):
+        async def slow_send(message):
+            if message["type"] == "http.response.body":
+                await asyncio.sleep(delay)
+            await send(message)
+        await app(scope, receive, slow_send)
+    return wrapped
+
+async def client_loop(client, index: int, token: str, stop_at: float, latencies: List[float], errors: List[int]):
+    randomness = random.Random(index)
+    requests, weights = zip(*TRAFFIC_MIX)
+    while time.monotonic() < stop_at:
+        method, path, authenticated, body = randomness.choices(requests, weights)[0]
+        headers = {}
+        if authenticated is True:
+            headers["Authorization"] = f"Bearer {token}"
+        elif authenticated == "bad":
+            headers["Authorization"] = "Bearer not-a-token"
+        started = time.perf_counter()
+        response = await client.request(method, path, headers=headers, json=body)
+        latencies.append(time.perf_counter() - started)
+        if response.status_code >= 500:
+            errors.append(response.status_code)
+
+async def run(args, emails: List[str]) -> dict:
+    import httpx
+    from app.database import engine
+    from app.main import app
+    from load_test import PASSWORD, summarize
+
+    recorder = HoldRecorder(engine)
+    latencies: List[float] = []
+    errors: List[int] = []
+    transport = httpx.ASGITransport(app=slow_sends(app, args.send_ms))
+    async with app.router.lifespan_context(app):
+        async with httpx.AsyncClient(transport=transport, base_url="http://localhost", timeout=60) as client:
+            tokens = []
+            for email in emails[:args.clients]:
+                response = await client.post("/auth/login", json={"email": email, "password": PASSWORD})
+                assert response.status_code == 200, response.text
+                tokens.append(response.json()["access_token"])
+            recorder.holds.clear()
+            recorder.checkouts = 0
+            stop_at = time.monotonic() + args.duration
+            await asyncio.gather(*(
+                client_loop(client, i, tokens[i % len(tokens)], stop_at, latencies, errors)
+                for i in range(args.clients)
+            ))
+    return {"requests": summarize(latencies, len(errors), args.duration),
+            "holds": summarize(recorder.holds, 0, args.duration), "checkouts": recorder.checkouts,
+            "held_seconds": sum(recorder.holds)}
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--clients", type=int, default=32, help="Concurrent clients")
+    parser.add_argument("--duration", type=float, default=15)
+    parser.add_argument("--send-ms", type=float, default=5, help="Time each response body takes to send")
+    parser.add_argument("--users", type=int, default=200)
+    args = parser.parse_args()
+
+    # Read by the app at import time; the database goes to the current
+    # directory, so change to it before anything imports the app
+    os.environ["LOG_LEVEL"] = "warning"
+    os.environ["MODERATION_WORKER"] = "external"
+    workdir = tempfile.mkdtemp(prefix="session_hold-")
+    os.chdir(workdir)
+    try:
+        from load_test import seed_database
+        emails = seed_database(os.path.join(workdir, "sea_catering.db"), args.users, 1000, 500, seed=42)
+        result = asyncio.run(run(args, emails))
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    requests, holds = result["requests"], result["holds"]
+    print(f"{args.clients} clients for {args.duration:g}s, {args.send_ms:g} ms per response body send")
+    print(f"   requests   {requests['requests']:7}   {requests['throughput_rps']:7.1f} rps   "
+          f"p50 {requests['p50_ms']:7.2f} ms   p99 {requests['p99_ms']:7.2f} ms   5xx {requests['errors']}")
+    print(f"   checkouts  {result['checkouts']:7}   {result['checkouts'] / max(requests['requests'], 1):7.2f} per request")
+    print(f"   held       p50 {holds['p50_ms']:7.2f} ms   p99 {holds['p99_ms']:7.2f} ms   "
+          f"total {result['held_seconds']:.2f} s ({result['held_seconds'] / args.duration:.2f} connections busy on average)")
\ No newline at end of file
@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+"""
+Benchmark the per-request cost of building responses for static-ish endpoints
+Compares encoding the payload on every request, as the routes did before,
+with serving the pre-serialized body from the response cache
+
+    python benchmarks/static_responses.py --plans 20
+"""
+
+import sys
+import os
+import argparse
+import timeit
+from datetime import datetime, timedelta
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fastapi import Request
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+
+from app.main import ROOT_INFO, SECURITY_INFO
+from app.response_cache import CachedBody, brotli, cached_response
+from app.routes.meal_plans import PLAN_PRICES
+from app.schemas import ListResponse, MealPlan
+
+REPEAT = 5
+
+ACCEPT_ENCODINGS = [("identity", ""), ("gzip", "gzip, deflate"), ("br", "gzip, deflate, br")]
+
+def request_with(accept_encoding: str) -> Request:
+    headers = [(b"accept-encoding", accept_encoding.encode())] if accept_encoding else []
+    return Request({"type": "http", "method": "GET", "path": "/", "headers": headers})
+
+def sample_meal_plans(count: int):
+    created = datetime(2025, 1, 1, 9, 0, 0)
+    return [
+        MealPlan.model_construct(
+            id=i,
+            name=f"Menu Sehat {i}",
+            description="Balanced weekly menu with fresh vegetables, lean protein and rice.",
+            price_per_meal=(30000.0, 40000.0, 60000.0)[i % 3],
+            plan_type=("diet", "protein", "royal")[i % 3],
+            features=["Low calorie", "Fresh ingredients", "Nutritionist approved"],
+            is_active=True,
+            created_at=created + timedelta(days=i),
+            updated_at=None
+        )
+        for i in range(count)
+    ]
+
+def per_request_us(function, number: int) -> float:
+    return min(timeit.repeat(function, number=number, repeat=REPEAT)) / number * 1e6
+
+def benchmark(label: str, render, number: int) -> bool:
+    """render() builds the body the way the route did before the cache"""
+    before = render()
+    entry = CachedBody(before.body).precompress()
+    if cached_response(request_with(""), entry).body != before.body:
+        print(f"❌ {label}: cached body differs from the per-request response")
+        return False
+
+    print(f"✅ {label} ({len(before.body)} bytes, identical output)")
+    before_time = per_request_us(render, number)
+    print(f"   encode per request:       {before_time:7.2f} us")
+    for name, accept_encoding in ACCEPT_ENCODINGS:
+        if name == "br" and brotli is None:
+            continue
+        request = request_with(accept_encoding)
+        cached_time = per_request_us(lambda: cached_response(request, entry), number)
+        print(f"   cached, {name:8}          {cached_time:7.2f} us ({before_time / cached_time:.1f}x)")
+    return True
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--plans", type=int, default=20, help="Meal plans in the list page")
+    parser.add_argument("--number", type=int, default=20000, help="Requests per timing run")
+    args = parser.parse_args()
+
+    prices = {
+        "success": True,
+        "prices": PLAN_PRICES,
+        "formula": "Total Price = Plan Price × Number of Meal Types × Number of Delivery Days × 4.3"
+    }
+    plans = sample_meal_plans(args.plans)
+
+    def meal_plan_page():
+        # What response_model=ListResponse produced for the returned model
+        return JSONResponse(jsonable_encoder(ListResponse(
+            success=True,
+            message="Meal plans retrieved successfully",
+            data=plans,
+            total=len(plans)
+        )))
+
+    print(f"{args.number} requests per run, best of {REPEAT}")
+    success = all([
+        benchmark("GET /", lambda: JSONResponse(jsonable_encoder(ROOT_INFO)), args.number),
+        benchmark("GET /security", lambda: JSONResponse(jsonable_encoder(SECURITY_INFO)), args.number),
+        benchmark("GET /meal-plans/prices/", lambda: JSONResponse(jsonable_encoder(prices)), args.number),
+        benchmark(f"GET /meal-plans/ ({args.plans} plans)", meal_plan_page, args.number)
+    ])
+    if not success:
+        sys.exit(1)
\ No newline at end of file
@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+"""
+Benchmark the public testimonial feed with and without the response cache
+Readers page through GET /testimonials/, favouring the first pages, some
+revalidating with If-None-Match, while an admin approves a testimonial every
+few requests; reports the cache hit rate and latency of both runs
+
+    python benchmarks/testimonial_feed.py --testimonials 2000 --requests 2000 --approve-every 200
+"""
+
+import sys
+import os
+import argparse
+import random
+import shutil
+import tempfile
+import time
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+PAGE_SIZE = 20
+
+class FeedCacheCounter:
+    """Counts feed lookups in the response cache that found an entry"""
+
+    def __init__(self, cache, group: str):
+        self.hits = 0
+        self.lookups = 0
+        lookup = cache.get
+
+        def counting_get(key):
+            entry = lookup(key)
+            if key[0] == group:
+                self.lookups += 1
+                self.hits += entry is not None
+            return entry
+        cache.get = counting_get
+
+def replay(client, args, admin_headers: dict, pending: list) -> dict:
+    from load_test import summarize
+
+    randomness = random.Random(args.seed)
+    etags = {}
+    latencies = []
+    errors = not_modified = approvals = 0
+    started = time.perf_counter()
+    for i in range(args.requests):
+        if args.approve_every and i % args.approve_every == args.approve_every - 1 and pending:
+            response = client.put(f"/testimonials/{pending.pop()}/approve", headers=admin_headers)
+            assert response.status_code == 200, response.text
+            approvals += 1
+        page = min(int(randomness.expovariate(1 / args.mean_page)), args.pages - 1)
+        headers = {"Accept-Encoding": "gzip"}
+        if page in etags and randomness.random() < args.revalidate:
+            headers["If-None-Match"] = etags[page]
+        request_started = time.perf_counter()
+        response = client.get(f"/testimonials/?skip={page * PAGE_SIZE}&limit={PAGE_SIZE}", headers=headers)
+        latencies.append(time.perf_counter() - request_started)
+        if response.status_code == 304:
+            not_modified += 1
+        elif response.status_code == 200:
+            etags[page] = response.headers["etag"]
+        else:
+            errors += 1
+    result = summarize(latencies, errors, time.perf_counter() - started)
+    result.update(not_modified=not_modified, approvals=approvals)
+    return result
+
+def run(args) -> dict:
+    from fastapi.testclient import TestClient
+    from app.auth import create_access_token
+    from app.database import SessionLocal
+    from app.main import app
+    from app.models import Testimonial, User
+    from app.response_cache import response_cache
+    from app.routes.testimonials import FEED_CACHE_GROUP
+    from load_test import ADMIN_EMAIL
+
+    db = SessionLocal()
+    try:
+        admin = db.query(User).filter(User.email == ADMIN_EMAIL).one()
+        pending = [testimonial_id for testimonial_id, in db.query(Testimonial.id).filter(Testimonial.is_approved == False)]
+    finally:
+        db.close()
+    admin_headers = {"Authorization": f"Bearer {create_access_token({'sub': str(admin.id)})}"}
+    random.Random(args.seed).shuffle(pending)
+    counter = FeedCacheCounter(response_cache, FEED_CACHE_GROUP)
+
+    results = {}
+    with TestClient(app, base_url="http://localhost") as client:
+        for label, max_entries in (("without cache", 0), ("with cache", response_cache.max_entries)):
+            # With no room for entries every lookup misses and each page is rendered
+            response_cache.max_entries = max_entries
+            response_cache.invalidate(FEED_CACHE_GROUP)
+            counter.hits = counter.lookups = 0
+            results[label] = replay(client, args, admin_headers, pending)
+            results[label]["hit_rate"] = counter.hits / max(counter.lookups, 1)
+    return results
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--testimonials", type=int, default=2000)
+    parser.add_argument("--requests", type=int, default=2000, help="Feed requests per run")
+    parser.add_argument("--pages", type=int, default=25, help="Feed pages readers can reach")
+    parser.add_argument("--mean-page", type=float, default=2, help="Average page readers stop at")
+    parser.add_argument("--revalidate", type=float, default=0.3, help="Share of repeat reads sending If-None-Match")
+    parser.add_argument("--approve-every", type=int, default=200, help="Requests between approvals (0: none)")
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    # Read by the app at import time; the database goes to the current
+    # directory, so change to it before anything imports the app
+    os.environ["LOG_LEVEL"] = "warning"
+    os.environ["MODERATION_WORKER"] = "external"
+    workdir = tempfile.mkdtemp(prefix="testimonial_feed-")
+    os.chdir(workdir)
+    try:
+        from load_test import seed_database
+        seed_database(os.path.join(workdir, "sea_catering.db"), 200, 0, args.testimonials, seed=args.seed)
+        results = run(args)
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    print(f"{args.requests} feed requests over {args.pages} pages of {PAGE_SIZE}, "
+          f"{args.testimonials} testimonials, an approval every {args.approve_every} requests")
+    for label, result in results.items():
+        print(f"   {label:14} hit rate {result['hit_rate']:6.1%}   {result['throughput_rps']:7.1f} rps   "
+              f"p50 {result['p50_ms']:6.2f} ms   p95 {result['p95_ms']:6.2f} ms   p99 {result['p99_ms']:6.2f} ms   "
+              f"304 {result['not_modified']}   approvals {result['approvals']}   errors {result['errors']}")
\ No newline at end of file
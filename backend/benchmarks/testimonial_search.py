@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+"""
+Benchmark testimonial search: LIKE scans vs the full-text index, offset vs cursor paging
+Seeds a throwaway SQLite database and runs the queries directly, without HTTP
+
+    python benchmarks/testimonial_search.py --testimonials 200000 --pages 50
+"""
+
+import sys
+import os
+import argparse
+import re
+import shutil
+import tempfile
+import time
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import create_engine, text
+from sqlalchemy.orm import Session
+
+from app.models import Testimonial
+from app.search import SQLITE_SEARCH, search_testimonials, setup_testimonial_search, to_match_query
+
+REPEAT = 3
+PAGE_SIZE = 20
+
+# A word only in the testimonials added by add_rare_testimonials
+RARE_WORD = "rendang"
+
+QUERIES = [RARE_WORD, "spicy", "protein plan", "fresh meals"]
+
+# What search looked like without an index: every word as a substring of name or message
+LIKE_SEARCH = """
+    SELECT t.id, t.user_id, t.name, t.message, t.rating, t.is_approved, t.created_at
+    FROM testimonials t
+    WHERE {filters}
+    ORDER BY t.id
+    LIMIT :limit OFFSET :offset
+"""
+
+OFFSET_SEARCH = SQLITE_SEARCH.replace("LIMIT :limit", "LIMIT :limit OFFSET :offset").format(filters="1 = 1")
+
+def best_ms(function) -> float:
+    timings = []
+    for _ in range(REPEAT):
+        started = time.perf_counter()
+        function()
+        timings.append(time.perf_counter() - started)
+    return min(timings) * 1000
+
+def add_rare_testimonials(engine, count: int):
+    with engine.begin() as connection:
+        user_id = connection.execute(text("SELECT user_id FROM testimonials LIMIT 1")).scalar()
+        connection.execute(Testimonial.__table__.insert(), [{
+            "user_id": user_id, "name": "Siti Rahayu", "rating": 5, "is_approved": True,
+            "message": f"The {RARE_WORD} on Fridays is the best I have had outside Padang."
+        } for _ in range(count)])
+
+def like_page(session: Session, query: str, offset: int):
+    words = re.findall(r"\w+", query)
+    filters = [f"(t.name LIKE :w{i} OR t.message LIKE :w{i})" for i in range(len(words))]
+    params = {f"w{i}": f"%{word}%" for i, word in enumerate(words)}
+    params.update(limit=PAGE_SIZE, offset=offset)
+    return session.execute(text(LIKE_SEARCH.format(filters=" AND ".join(filters))), params).all()
+
+def count_matches(session: Session, query: str) -> int:
+    return session.execute(
+        text("SELECT count(*) FROM testimonials_fts WHERE testimonials_fts MATCH :query"),
+        {"query": to_match_query(query)}
+    ).scalar()
+
+def compare_matching(session: Session):
+    print(f"First page of {PAGE_SIZE} (LIKE pages are unranked, in id order)")
+    for query in QUERIES:
+        like = best_ms(lambda: like_page(session, query, 0))
+        fts = best_ms(lambda: search_testimonials(session, query, limit=PAGE_SIZE))
+        print(f"   {query!r:16} {count_matches(session, query):8} matches   "
+              f"LIKE {like:8.2f} ms   FTS {fts:8.2f} ms")
+
+def walk_with_offset(session: Session, query: str, pages: int):
+    match = to_match_query(query)
+    for page in range(pages):
+        session.execute(text(OFFSET_SEARCH), {"query": match, "limit": PAGE_SIZE, "offset": page * PAGE_SIZE}).all()
+
+def walk_with_cursor(session: Session, query: str, pages: int):
+    cursor = None
+    for _ in range(pages):
+        _, cursor = search_testimonials(session, query, cursor=cursor, limit=PAGE_SIZE)
+        if cursor is None:
+            break
+
+def compare_paging(session: Session, query: str, pages: int):
+    print(f"Paging through {pages} pages of {query!r} ({count_matches(session, query)} matches)")
+    match = to_match_query(query)
+    offset = best_ms(lambda: walk_with_offset(session, query, pages))
+    cursor = best_ms(lambda: walk_with_cursor(session, query, pages))
+    last_offset = best_ms(lambda: session.execute(text(OFFSET_SEARCH), {
+        "query": match, "limit": PAGE_SIZE, "offset": (pages - 1) * PAGE_SIZE
+    }).all())
+    print(f"   offset   {offset:9.2f} ms total   page {pages} alone {last_offset:8.2f} ms")
+    print(f"   cursor   {cursor:9.2f} ms total")
+    like_total = best_ms(lambda: [like_page(session, query, page * PAGE_SIZE) for page in range(pages)])
+    print(f"   LIKE     {like_total:9.2f} ms total (offset, unranked)")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--testimonials", type=int, default=200000)
+    parser.add_argument("--rare", type=int, default=20, help="Testimonials containing the rare word")
+    parser.add_argument("--pages", type=int, default=50, help="Pages to walk in the paging comparison")
+    parser.add_argument("--paging-query", default="spicy")
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix="testimonial_search-")
+    try:
+        from load_test import seed_database
+        path = os.path.join(workdir, "sea_catering.db")
+        seed_database(path, 1000, 0, args.testimonials, seed=42)
+        engine = create_engine(f"sqlite:///{path}")
+        setup_testimonial_search(engine)
+        add_rare_testimonials(engine, args.rare)
+        with Session(engine) as session:
+            compare_matching(session)
+            compare_paging(session, args.paging_query, args.pages)
+        engine.dispose()
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
\ No newline at end of file
@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+"""
+Load test of run.py production mode: throughput with 1 to N workers on this host
+Starts the server for each worker count, drives it over keep-alive connections,
+then stops it with SIGTERM and checks that it shuts down cleanly.
+The server uses ./sea_catering.db, so run this from a directory with a test database
+
+Every worker opens that same SQLite file, and SQLite lets one writer at a
+time lock the whole database, so database-bound paths (writes especially)
+do not scale with workers here. The default path is served from the
+in-memory meal plan catalog and measures the HTTP and worker layer only.
+Showing scaling of database work needs a server database such as
+PostgreSQL, which DATABASE_URL in app/database.py does not point to yet.
+"""
+
+import sys
+import os
+import argparse
+import asyncio
+import signal
+import subprocess
+import time
+
+from http_client import HTTPConnection
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+async def client(port: int, path: str, deadline: float, counts: dict):
+    connection = HTTPConnection("127.0.0.1", port, {"Accept-Encoding": "identity"})
+    try:
+        while time.monotonic() < deadline:
+            status, _ = await connection.request("GET", path)
+            counts["ok" if status == 200 else "failed"] += 1
+    finally:
+        await connection.close()
+
+async def drive(port: int, path: str, connections: int, seconds: float) -> dict:
+    counts = {"ok": 0, "failed": 0}
+    deadline = time.monotonic() + seconds
+    await asyncio.gather(*(client(port, path, deadline, counts) for _ in range(connections)))
+    return counts
+
+def wait_until_ready(port: int, timeout: float = 30):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            asyncio.run(drive(port, "/health", 1, 0.01))
+            return
+        except OSError:
+            time.sleep(0.2)
+    raise RuntimeError("server did not start")
+
+def measure(workers: int, port: int, path: str, connections: int, seconds: float):
+    env = dict(os.environ, PORT=str(port), LOG_LEVEL="warning")
+    server = subprocess.Popen(
+        [sys.executable, os.path.join(BACKEND_DIR, "run.py"), "--production", "--workers", str(workers)],
+        env=env
+    )
+    try:
+        wait_until_ready(port)
+        counts = asyncio.run(drive(port, path, connections, seconds))
+    finally:
+        started = time.monotonic()
+        server.send_signal(signal.SIGTERM)
+        code = server.wait(timeout=60)
+    print(f"   {workers} worker(s): {counts['ok'] / seconds:8.0f} req/s  "
+          f"failed {counts['failed']}  shutdown {time.monotonic() - started:.1f}s (exit {code})")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--max-workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--path", default="/meal-plans/")
+    parser.add_argument("--connections", type=int, default=64)
+    parser.add_argument("--seconds", type=float, default=10)
+    parser.add_argument("--port", type=int, default=8765)
+    args = parser.parse_args()
+
+    print(f"GET {args.path} with {args.connections} connections for {args.seconds:.0f}s "
+          f"({os.cpu_count()} CPUs; the load generator shares them)")
+    print("   All workers share one SQLite file; database-bound paths will not scale with workers")
+    worker_counts = sorted({1, args.max_workers} | {n for n in (2, 4, 8) if n < args.max_workers})
+    for workers in worker_counts:
+        measure(workers, args.port, args.path, args.connections, args.seconds)
\ No newline at end of file
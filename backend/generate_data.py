@@ -0,0 +1,340 @@
+#!/usr/bin/env python3
+"""
+Script to fill a database with synthetic users, subscriptions, testimonials and meal plans
+Rows are bulk inserted with Core statements, one transaction per table. The same
+seed and --today produce the same rows.
+"""
+
+import sys
+import os
+import argparse
+import json
+import random
+import time
+from datetime import date, datetime, timedelta
+from itertools import combinations
+from typing import Dict, List, Optional, Tuple
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from sqlalchemy import create_engine, func, select
+from sqlalchemy.engine import Connection, Engine
+from sqlalchemy.orm import sessionmaker
+
+from app.database import DATABASE_URL, add_missing_columns
+from app.models import Base, Subscription, Testimonial, User
+from app.auth import get_password_hash
+from app.catalog import bump_catalog_version, bump_version_on_connection
+from app.manifests import MANIFEST_VERSION
+from app.meal_plan_import import upsert_meal_plans
+from app.routes.subscriptions import calculate_total_price
+from app.routes.testimonials import FEED_CACHE_GROUP
+from app.schemas import MealPlanCreate
+from app.search import setup_testimonial_search
+from app.testimonial_stats import rebuild_testimonial_stats
+
+# Rows per executemany() call; bounds memory while a table is being written
+INSERT_BATCH_SIZE = 20000
+
+# Every generated account shares this password (hashed once per run)
+DEFAULT_PASSWORD = "Password123!"
+
+FIRST_NAMES = [
+    "Adi", "Agus", "Ahmad", "Andi", "Anisa", "Ayu", "Bayu", "Budi", "Citra", "Dedi", "Desi", "Dewi",
+    "Dian", "Dimas", "Eka", "Fajar", "Fitri", "Gilang", "Hendra", "Indah", "Intan", "Joko", "Kartika",
+    "Lestari", "Maya", "Mega", "Nanda", "Nur", "Putri", "Rani", "Reza", "Rizki", "Sari", "Siti",
+    "Taufik", "Tika", "Wahyu", "Wulan", "Yoga", "Yuni"
+]
+LAST_NAMES = [
+    "Hidayat", "Kusuma", "Lestari", "Nugroho", "Pratama", "Purnama", "Putra", "Rahman", "Saputra",
+    "Setiawan", "Siregar", "Santoso", "Simanjuntak", "Sutanto", "Wibowo", "Wijaya", "Gunawan",
+    "Halim", "Hakim", "Harahap", "Irawan", "Kurniawan", "Nasution", "Permana", "Susanto"
+]
+
+MEAL_TYPES = ["breakfast", "lunch", "dinner"]
+DAYS = ["monday", "tuesday", "wednesday", "thursday", "friday", "saturday", "sunday"]
+
+# Relative popularity of each plan, meal type combination and delivery schedule
+PLAN_WEIGHTS = {"diet": 45, "protein": 35, "royal": 20}
+MEAL_TYPE_WEIGHTS = {
+    ("lunch",): 20, ("dinner",): 14, ("breakfast",): 6, ("lunch", "dinner"): 25,
+    ("breakfast", "lunch"): 12, ("breakfast", "dinner"): 5, ("breakfast", "lunch", "dinner"): 18
+}
+# Any of the 127 day sets can occur; these common schedules get extra weight
+COMMON_SCHEDULES = {
+    ("monday", "tuesday", "wednesday", "thursday", "friday"): 35,
+    tuple(DAYS): 15,
+    ("monday", "wednesday", "friday"): 15,
+    ("saturday", "sunday"): 5
+}
+ANY_SCHEDULE_WEIGHT = 30
+
+ALLERGIES = ["peanuts", "shellfish", "dairy", "gluten", "eggs", "soy", "peanuts, shellfish", "lactose intolerant"]
+
+# Share of subscriptions cancelled, and of the remaining ones with a pause window
+INACTIVE_RATE = 0.15
+PAUSE_RATE = 0.08
+ALLERGY_RATE = 0.12
+
+RATING_WEIGHTS = {5: 45, 4: 30, 3: 13, 2: 7, 1: 5}
+APPROVAL_RATE = 0.8
+MESSAGE_OPENERS = [
+    "Fresh meals, delivered on time every week.",
+    "I have been subscribed for a few months now.",
+    "The portions are generous and the food is tasty.",
+    "Healthy eating finally fits my busy schedule.",
+    "Ordering was easy and the packaging is neat.",
+    "My whole family enjoys the weekly menu."
+]
+MESSAGE_DETAILS = [
+    "The protein plan keeps me full through long workdays.",
+    "Delivery was late once, but support sorted it quickly.",
+    "The menu changes often enough that I never get bored.",
+    "The diet plan helped me lose weight without feeling hungry.",
+    "Some dishes were a bit too spicy for me.",
+    "The royal plan is pricey but worth it for special weeks."
+]
+MESSAGE_CLOSERS = [
+    "Highly recommended!",
+    "Would order again.",
+    "Keep up the good work.",
+    "Thank you SEA Catering!",
+    "Good value overall.",
+    ""
+]
+
+# (name, plan type, price per meal, features); prices match calculate_total_price
+STANDARD_MEAL_PLANS = [
+    ("Diet Plan", "diet", 30000, ["Low calorie", "High fiber", "Nutritionist approved"]),
+    ("Protein Plan", "protein", 40000, ["High protein", "Lean meats", "Post-workout friendly"]),
+    ("Royal Plan", "royal", 60000, ["Premium ingredients", "Chef specials", "Dessert included"])
+]
+MEAL_PLAN_VARIANTS = ["Vegetarian", "Keto", "Family", "Low Sodium", "Halal", "Mediterranean", "Office", "Athlete"]
+
+def weighted(weights: Dict) -> Tuple[list, list]:
+    """(values, cumulative weights) for random.choices"""
+    values, cumulative, total = [], [], 0
+    for value, weight in weights.items():
+        total += weight
+        values.append(value)
+        cumulative.append(total)
+    return values, cumulative
+
+def schedule_weights() -> Dict[Tuple[str, ...], float]:
+    all_schedules = [days for size in range(1, 8) for days in combinations(DAYS, size)]
+    weights = {days: ANY_SCHEDULE_WEIGHT / len(all_schedules) for days in all_schedules}
+    for days, weight in COMMON_SCHEDULES.items():
+        weights[days] += weight
+    return weights
+
+def batches(total: int):
+    for start in range(0, total, INSERT_BATCH_SIZE):
+        yield start, min(INSERT_BATCH_SIZE, total - start)
+
+def report(table: str, count: int, started: float):
+    seconds = time.perf_counter() - started
+    print(f"   {table}: {count} rows in {seconds:.1f}s ({count / seconds if seconds else 0:,.0f} rows/s)")
+
+def generate_users(connection: Connection, rnd: random.Random, count: int, hashed_password: str,
+                   anchor: datetime, history_days: int):
+    """Customers with unique emails; ids continue after the existing ones"""
+    first_id = (connection.execute(select(func.max(User.id))).scalar() or 0) + 1
+    history = history_days * 24 * 3600
+    for start, size in batches(count):
+        rows = []
+        for user_id in range(first_id + start, first_id + start + size):
+            first, last = rnd.choice(FIRST_NAMES), rnd.choice(LAST_NAMES)
+            rows.append({
+                "id": user_id,
+                "full_name": f"{first} {last}",
+                "email": f"{first.lower()}.{last.lower()}{user_id}@example.com",
+                "hashed_password": hashed_password,
+                "is_active": rnd.random() >= 0.02,
+                "is_admin": False,
+                "created_at": anchor - timedelta(seconds=int(history * rnd.random()))
+            })
+        connection.execute(User.__table__.insert(), rows)
+
+def generate_subscriptions(connection: Connection, rnd: random.Random, count: int,
+                           customers: List[Tuple[int, str]], anchor: datetime, history_days: int):
+    """Subscriptions with realistic plan, meal and schedule mixes, cancellations and pauses"""
+    plans, plan_weights = weighted(PLAN_WEIGHTS)
+    meal_sets, meal_weights = weighted(MEAL_TYPE_WEIGHTS)
+    schedules, schedule_cumulative = weighted(schedule_weights())
+    # JSON text and price of every combination, computed once instead of per row
+    meal_json = [json.dumps(list(meals)) for meals in meal_sets]
+    schedule_json = [json.dumps(list(days)) for days in schedules]
+    prices = {
+        (plan, m, s): calculate_total_price(plan, list(meal_sets[m]), list(schedules[s]))
+        for plan in plans for m in range(len(meal_sets)) for s in range(len(schedules))
+    }
+    meal_indexes, schedule_indexes = range(len(meal_sets)), range(len(schedules))
+    today = anchor.date()
+    history = history_days * 24 * 3600
+
+    for _, size in batches(count):
+        plan_column = rnd.choices(plans, cum_weights=plan_weights, k=size)
+        meal_column = rnd.choices(meal_indexes, cum_weights=meal_weights, k=size)
+        schedule_column = rnd.choices(schedule_indexes, cum_weights=schedule_cumulative, k=size)
+        rows = []
+        for plan, m, s in zip(plan_column, meal_column, schedule_column):
+            user_id, name = customers[rnd.randrange(len(customers))]
+            is_active = rnd.random() >= INACTIVE_RATE
+            # Squaring skews sign-ups towards recent dates, like a growing business
+            created_at = anchor - timedelta(seconds=int(history * rnd.random() ** 2))
+            # Cancelled some time between sign-up and the anchor
+            cancelled_at = None if is_active else created_at + timedelta(
+                seconds=int((anchor - created_at).total_seconds() * rnd.random())
+            )
+            pause_start = pause_end = None
+            if is_active and rnd.random() < PAUSE_RATE:
+                # Past, current and upcoming pause windows
+                pause_start = today + timedelta(days=rnd.randint(-45, 30))
+                pause_end = pause_start + timedelta(days=rnd.randint(3, 28))
+            rows.append({
+                "user_id": user_id,
+                "name": name,
+                "phone": f"08{rnd.randrange(100000000, 10000000000)}",
+                "plan": plan,
+                "meal_types": meal_json[m],
+                "delivery_days": schedule_json[s],
+                "allergies": rnd.choice(ALLERGIES) if rnd.random() < ALLERGY_RATE else None,
+                "total_price": prices[(plan, m, s)],
+                "is_active": is_active,
+                "pause_start_date": pause_start,
+                "pause_end_date": pause_end,
+                "cancelled_at": cancelled_at,
+                "created_at": created_at,
+                "updated_at": cancelled_at
+            })
+        connection.execute(Subscription.__table__.insert(), rows)
+    if count:
+        bump_version_on_connection(connection, MANIFEST_VERSION)
+
+def generate_testimonials(connection: Connection, rnd: random.Random, count: int,
+                          customers: List[Tuple[int, str]], anchor: datetime, history_days: int):
+    """Testimonials skewed towards good ratings, most of them already approved"""
+    ratings, rating_weights = weighted(RATING_WEIGHTS)
+    history = history_days * 24 * 3600
+    for _, size in batches(count):
+        rows = []
+        for rating in rnd.choices(ratings, cum_weights=rating_weights, k=size):
+            user_id, name = customers[rnd.randrange(len(customers))]
+            message = " ".join(part for part in (
+                rnd.choice(MESSAGE_OPENERS), rnd.choice(MESSAGE_DETAILS), rnd.choice(MESSAGE_CLOSERS)
+            ) if part)
+            rows.append({
+                "user_id": user_id,
+                "name": name,
+                "message": message,
+                "rating": rating,
+                "is_approved": rnd.random() < APPROVAL_RATE,
+                "created_at": anchor - timedelta(seconds=int(history * rnd.random()))
+            })
+        connection.execute(Testimonial.__table__.insert(), rows)
+    if count:
+        bump_version_on_connection(connection, FEED_CACHE_GROUP)
+
+def meal_plan_rows(rnd: random.Random, count: int) -> List[MealPlanCreate]:
+    """The three standard plans, then variants of them"""
+    meal_plans = []
+    for i in range(count):
+        name, plan_type, price, features = STANDARD_MEAL_PLANS[i % len(STANDARD_MEAL_PLANS)]
+        if i >= len(STANDARD_MEAL_PLANS):
+            variant = MEAL_PLAN_VARIANTS[(i // len(STANDARD_MEAL_PLANS) - 1) % len(MEAL_PLAN_VARIANTS)]
+            round_number = (i // len(STANDARD_MEAL_PLANS) - 1) // len(MEAL_PLAN_VARIANTS)
+            name = f"{variant} {name}" + (f" {round_number + 1}" if round_number else "")
+            price = price + rnd.randrange(-5, 10) * 1000
+        meal_plans.append(MealPlanCreate(
+            name=name,
+            description=f"{name}: weekly {plan_type} meals prepared fresh by our chefs",
+            price_per_meal=price,
+            plan_type=plan_type,
+            features=features
+        ))
+    return meal_plans
+
+def generate(engine: Engine, users: int, subscriptions: int, testimonials: int, meal_plans: int,
+             seed: int = 42, password: str = DEFAULT_PASSWORD, history_days: int = 365,
+             today: Optional[date] = None) -> Dict[str, int]:
+    """Insert synthetic rows; subscriptions and testimonials go to all existing customers"""
+    Base.metadata.create_all(bind=engine)
+    add_missing_columns(engine)
+    setup_testimonial_search(engine)
+    # Timestamps count back from midnight, so a rerun on the same day is identical
+    anchor = datetime.combine(today or date.today(), datetime.min.time())
+    # Separate streams, so changing one volume leaves the other tables unchanged
+    streams = {table: random.Random(f"{seed}:{table}") for table in ("users", "subscriptions", "testimonials", "meal_plans")}
+
+    hashed_password = get_password_hash(password)  # bcrypt once instead of per user
+    started = time.perf_counter()
+    with engine.begin() as connection:
+        generate_users(connection, streams["users"], users, hashed_password, anchor, history_days)
+    report("users", users, started)
+
+    with engine.connect() as connection:
+        customers = connection.execute(
+            select(User.id, User.full_name).where(User.is_admin == False).order_by(User.id)
+        ).all()
+    if (subscriptions or testimonials) and not customers:
+        raise ValueError("No customers to attach subscriptions and testimonials to; generate users first")
+    customers = [tuple(row) for row in customers]
+
+    started = time.perf_counter()
+    with engine.begin() as connection:
+        generate_subscriptions(connection, streams["subscriptions"], subscriptions, customers, anchor, history_days)
+    report("subscriptions", subscriptions, started)
+
+    started = time.perf_counter()
+    with engine.begin() as connection:
+        generate_testimonials(connection, streams["testimonials"], testimonials, customers, anchor, history_days)
+    report("testimonials", testimonials, started)
+
+    # Meal plans go through the importer's upsert, so reruns update instead of failing on names
+    db = sessionmaker(bind=engine)()
+    try:
+        if testimonials:
+            rebuild_testimonial_stats(db)
+        if meal_plans:
+            upsert_meal_plans(db, meal_plan_rows(streams["meal_plans"], meal_plans))
+            bump_catalog_version(db)
+        db.commit()
+    finally:
+        db.close()
+
+    return {"users": users, "subscriptions": subscriptions, "testimonials": testimonials, "meal_plans": meal_plans}
+
+def main(args) -> bool:
+    engine = create_engine(args.database_url)
+    try:
+        print(f"=== Generating synthetic data (seed {args.seed}) ===")
+        started = time.perf_counter()
+        generate(
+            engine, args.users, args.subscriptions, args.testimonials, args.meal_plans,
+            seed=args.seed, password=args.password, history_days=args.history_days, today=args.today
+        )
+        print(f"✅ Done in {time.perf_counter() - started:.1f}s")
+        if args.users:
+            print(f"   Generated users log in with the password {args.password}")
+        return True
+    except Exception as e:
+        print(f"❌ Error generating data: {str(e)}")
+        return False
+    finally:
+        engine.dispose()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Fill a database with synthetic SEA Catering data")
+    parser.add_argument("--users", type=int, default=1000)
+    parser.add_argument("--subscriptions", type=int, default=10000)
+    parser.add_argument("--testimonials", type=int, default=2000)
+    parser.add_argument("--meal-plans", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--history-days", type=int, default=365, help="Spread of created_at into the past")
+    parser.add_argument("--today", type=date.fromisoformat, default=None,
+                        help="Date (YYYY-MM-DD) the data is generated as of, so a seed gives the same rows on any day; defaults to today")
+    parser.add_argument("--password", default=DEFAULT_PASSWORD, help="Password of every generated user")
+    parser.add_argument("--database-url", default=DATABASE_URL)
+    args = parser.parse_args()
+
+    if not main(args):
+        sys.exit(1)
\ No newline at end of file
@@ -0,0 +1,53 @@
+#!/usr/bin/env python3
+"""
+Script to import meal plans from a JSON or CSV file
+Plans are upserted by name, so the same file can be imported again safely
+"""
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from app.database import SessionLocal, engine
+from app.models import Base
+from app.catalog import bump_catalog_version
+from app.meal_plan_import import parse_meal_plans, upsert_meal_plans
+
+def import_meal_plans(path: str):
+    """Upsert every meal plan in the file in a single transaction"""
+    Base.metadata.create_all(bind=engine)
+    db = SessionLocal()
+    
+    try:
+        file_format = "csv" if path.lower().endswith(".csv") else "json"
+        with open(path, encoding="utf-8-sig") as f:
+            meal_plans = parse_meal_plans(f.read(), file_format)
+        
+        if not meal_plans:
+            print("❌ Error: No meal plans found in file")
+            return False
+        
+        counts = upsert_meal_plans(db, meal_plans)
+        bump_catalog_version(db)
+        db.commit()
+        
+        print(f"✅ Imported {counts['total']} meal plans")
+        print(f"   Created: {counts['created']}")
+        print(f"   Updated: {counts['updated']}")
+        return True
+        
+    except Exception as e:
+        db.rollback()
+        print(f"❌ Error importing meal plans: {str(e)}")
+        return False
+    
+    finally:
+        db.close()
+
+if __name__ == "__main__":
+    if len(sys.argv) != 2:
+        print("Usage: python import_meal_plans.py <meal_plans.json|meal_plans.csv>")
+        sys.exit(1)
+    success = import_meal_plans(sys.argv[1])
+    if not success:
+        sys.exit(1)
\ No newline at end of file
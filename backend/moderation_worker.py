@@ -0,0 +1,21 @@
+#!/usr/bin/env python3
+"""
+Script to run the testimonial moderation worker as a separate process
+Start the API with MODERATION_WORKER=external when using this script
+"""
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from app.database import engine
+from app.models import Base
+from app.moderation import moderation_worker
+
+if __name__ == "__main__":
+    Base.metadata.create_all(bind=engine)
+    print("Moderation worker started, press Ctrl+C to stop")
+    try:
+        moderation_worker.run()
+    except KeyboardInterrupt:
+        print("Moderation worker stopped")
@@ -0,0 +1,57 @@
+#!/usr/bin/env python3
+"""
+Script to rebuild the testimonial statistics counters
+Run this after importing or editing testimonials outside the API
+"""
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from app.database import SessionLocal, engine
+from app.models import Base, TestimonialStats
+from app.testimonial_stats import STATS_ID, COUNTER_COLUMNS, recount_testimonial_stats, rebuild_testimonial_stats
+
+def rebuild_stats(check_only: bool = False):
+    """Recount testimonial statistics and report any drift"""
+    Base.metadata.create_all(bind=engine)
+    db = SessionLocal()
+    
+    try:
+        counts = recount_testimonial_stats(db)
+        stats = db.get(TestimonialStats, STATS_ID)
+        
+        drift = {}
+        for column in COUNTER_COLUMNS:
+            stored = getattr(stats, column) if stats else None
+            if stored != counts[column]:
+                drift[column] = (stored, counts[column])
+        
+        if not drift:
+            print("✅ Testimonial statistics are up to date")
+            return True
+        
+        for column, (stored, actual) in drift.items():
+            print(f"   {column}: stored {stored}, actual {actual}")
+        
+        if check_only:
+            print("❌ Testimonial statistics are out of date")
+            return False
+        
+        rebuild_testimonial_stats(db)
+        db.commit()
+        print("✅ Testimonial statistics rebuilt")
+        return True
+        
+    except Exception as e:
+        db.rollback()
+        print(f"❌ Error rebuilding testimonial statistics: {str(e)}")
+        return False
+    
+    finally:
+        db.close()
+
+if __name__ == "__main__":
+    success = rebuild_stats(check_only="--check" in sys.argv[1:])
+    if not success:
+        sys.exit(1)
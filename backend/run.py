@@ -1,10 +1,169 @@
+import argparse
+import os
+import signal
+import sys
+import time
+
 import uvicorn
 
-if __name__ == "__main__":
+def env_int(name: str, default: int) -> int:
+    value = os.getenv(name)
+    return int(value) if value else default
+
+# Production settings, all overridable from the environment
+HOST = os.getenv("HOST", "0.0.0.0")
+PORT = env_int("PORT", 8000)
+WORKERS = env_int("WEB_CONCURRENCY", os.cpu_count() or 1)
+BACKLOG = env_int("BACKLOG", 2048)
+# Longer than the usual 60s idle timeout of a load balancer in front of us
+KEEP_ALIVE_SECONDS = env_int("KEEP_ALIVE_SECONDS", 75)
+# Time in-flight requests get to finish after SIGTERM
+GRACEFUL_TIMEOUT_SECONDS = env_int("GRACEFUL_TIMEOUT_SECONDS", 30)
+LOG_LEVEL = os.getenv("LOG_LEVEL", "info")
+
+def run_development():
     uvicorn.run(
         "app.main:app",
         host="0.0.0.0",
         port=8000,
         reload=True,
         log_level="info"
-    ) 
\ No newline at end of file
+    )
+
+def production_config(app) -> uvicorn.Config:
+    return uvicorn.Config(
+        app,
+        host=HOST,
+        port=PORT,
+        loop="uvloop",
+        http="httptools",
+        backlog=BACKLOG,
+        timeout_keep_alive=KEEP_ALIVE_SECONDS,
+        timeout_graceful_shutdown=GRACEFUL_TIMEOUT_SECONDS,
+        proxy_headers=True,
+        access_log=False,
+        log_level=LOG_LEVEL
+    )
+
+def run_worker(config: uvicorn.Config, sockets) -> int:
+    """Body of a forked worker: serve on the inherited socket until SIGTERM"""
+    from app.database import engine
+    # Never reuse connections opened before the fork
+    engine.dispose(close=False)
+    for sig in (signal.SIGTERM, signal.SIGINT):
+        signal.signal(sig, signal.SIG_DFL)
+    uvicorn.Server(config).run(sockets=sockets)
+    return 0
+
+def run_moderation(sockets) -> int:
+    """Body of the forked moderation process: score testimonials until SIGTERM"""
+    from app.database import engine
+    from app.moderation import moderation_worker
+    for sock in sockets:
+        sock.close()
+    engine.dispose(close=False)
+    for sig in (signal.SIGTERM, signal.SIGINT):
+        signal.signal(sig, signal.SIG_DFL)
+    moderation_worker.run()
+    return 0
+
+def run_production(workers: int):
+    """Preload the app, bind once, then fork workers sharing the listening socket.
+
+    SIGTERM or SIGINT is passed on to every worker; uvicorn then stops
+    accepting connections and lets in-flight requests finish for up to
+    GRACEFUL_TIMEOUT_SECONDS. Workers that die unexpectedly are replaced.
+
+    With several workers, testimonials are scored by one extra moderation
+    process instead of a thread in every worker, which would race to score
+    the same rows. MODERATION_WORKER=external leaves scoring to a separately
+    run moderation_worker.py.
+    """
+    fork_moderation = (
+        workers > 1 and hasattr(os, "fork") and os.getenv("MODERATION_WORKER", "thread") == "thread"
+    )
+    if fork_moderation:
+        # Read when the app is imported: keeps the thread out of the web workers
+        os.environ["MODERATION_WORKER"] = "external"
+
+    # Import errors surface once, here, and workers share the loaded code
+    from app.main import app
+    from app.database import add_missing_columns, engine
+    from app.models import Base
+    from app.search import setup_testimonial_search
+
+    # Create tables once here instead of racing in every worker's startup
+    Base.metadata.create_all(bind=engine)
+    add_missing_columns(engine)
+    setup_testimonial_search(engine)
+    engine.dispose()
+
+    config = production_config(app)
+    sockets = [config.bind_socket()]
+
+    if workers == 1 or not hasattr(os, "fork"):
+        uvicorn.Server(config).run(sockets=sockets)
+        return
+
+    children = {}
+    stopping = False
+
+    def spawn(role: str):
+        pid = os.fork()
+        if pid == 0:
+            os._exit(run_moderation(sockets) if role == "moderation" else run_worker(config, sockets))
+        children[pid] = (role, time.monotonic())
+
+    def stop(signum, frame):
+        nonlocal stopping
+        stopping = True
+        for pid in list(children):
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+
+    signal.signal(signal.SIGTERM, stop)
+    signal.signal(signal.SIGINT, stop)
+
+    print(f"Starting {workers} workers on {HOST}:{PORT} (pid {os.getpid()})")
+    for _ in range(workers):
+        spawn("web")
+    if fork_moderation:
+        spawn("moderation")
+
+    while children:
+        try:
+            pid, status = os.wait()
+        except ChildProcessError:
+            break
+        except InterruptedError:
+            continue
+        child = children.pop(pid, None)
+        if child is None or stopping:
+            continue
+        role, started = child
+        print(f"{role.capitalize()} worker {pid} exited with status {status}, restarting")
+        if time.monotonic() - started < 1:
+            # Crashing on startup; avoid a tight fork loop
+            time.sleep(1)
+        spawn(role)
+
+    for sock in sockets:
+        sock.close()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run the SEA Catering API")
+    parser.add_argument(
+        "--production",
+        action="store_true",
+        default=os.getenv("APP_ENV") == "production",
+        help="Multi-worker server without reload (default when APP_ENV=production)"
+    )
+    parser.add_argument("--workers", type=int, default=WORKERS, help="Worker processes in production mode")
+    args = parser.parse_args()
+
+    if args.production:
+        run_production(max(args.workers, 1))
+    else:
+        run_development()
\ No newline at end of file
@@ -0,0 +1,52 @@
+import os
+import sys
+import tempfile
+
+import pytest
+
+# The app reads these and resolves ./sea_catering.db when it is imported,
+# so every test session gets its own database in a throwaway directory
+os.environ.setdefault("MODERATION_WORKER", "external")
+os.environ.setdefault("LOG_LEVEL", "warning")
+os.chdir(tempfile.mkdtemp(prefix="sea-tests-"))
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fastapi.testclient import TestClient
+
+from app.auth import create_access_token
+from app.database import SessionLocal
+from app.main import app
+from app.models import User
+
+@pytest.fixture(scope="session")
+def client():
+    with TestClient(app, base_url="http://localhost") as client:
+        yield client
+
+@pytest.fixture
+def db(client):
+    session = SessionLocal()
+    try:
+        yield session
+    finally:
+        session.close()
+
+def make_user(db, email: str, is_admin: bool = False) -> User:
+    user = db.query(User).filter(User.email == email).first()
+    if user is None:
+        user = User(full_name="Budi Santoso", email=email, hashed_password="x", is_active=True, is_admin=is_admin)
+        db.add(user)
+        db.commit()
+        db.refresh(user)
+    return user
+
+def bearer(user: User) -> dict:
+    return {"Authorization": f"Bearer {create_access_token({'sub': str(user.id)})}"}
+
+@pytest.fixture
+def admin(db) -> User:
+    return make_user(db, "admin@example.com", is_admin=True)
+
+@pytest.fixture
+def customer(db) -> User:
+    return make_user(db, "customer@example.com")
@@ -0,0 +1,35 @@
+from datetime import datetime
+
+from app import models
+from app.routes import testimonials
+
+from conftest import bearer
+
+def test_filter_larger_than_the_cap_reports_what_is_left(client, db, admin, customer, monkeypatch):
+    monkeypatch.setattr(testimonials, "BULK_FILTER_LIMIT", 4)
+    ids = []
+    for number in range(10):
+        response = client.post("/testimonials/", headers=bearer(customer), json={
+            "name": "Siti Rahayu", "message": f"Porsinya pas dan rasanya konsisten #{number}", "rating": 4
+        })
+        assert response.status_code == 200, response.text
+        ids.append(response.json()["testimonial"]["id"])
+    # Older than anything other tests create, so the filter only matches these
+    db.query(models.Testimonial).filter(models.Testimonial.id.in_(ids)).update(
+        {models.Testimonial.created_at: datetime(2001, 1, 1)}, synchronize_session=False
+    )
+    db.commit()
+
+    processed, remaining = [], []
+    while not remaining or remaining[-1]:
+        response = client.put("/testimonials/admin/bulk/approve", headers=bearer(admin),
+                              json={"created_before": "2002-01-01T00:00:00"})
+        assert response.status_code == 200, response.text
+        body = response.json()
+        processed.append(body["counts"].get("approved", 0))
+        remaining.append(body["remaining"])
+
+    assert processed == [4, 4, 2]
+    assert remaining == [6, 2, 0]
+    db.expire_all()
+    assert all(db.get(models.Testimonial, testimonial_id).is_approved for testimonial_id in ids)
@@ -0,0 +1,53 @@
+from datetime import date, datetime, timedelta
+
+from app.models import Subscription
+
+from conftest import bearer
+
+def months_ago(months: int) -> datetime:
+    """Noon on the 15th of the month `months` before the current one"""
+    today = date.today()
+    index = today.year * 12 + today.month - 1 - months
+    return datetime(index // 12, index % 12 + 1, 15, 12)
+
+def add_subscription(db, user, plan: str, created_at: datetime, **columns) -> Subscription:
+    subscription = Subscription(
+        user_id=user.id, name="Budi Santoso", phone="081234567890", plan=plan,
+        meal_types='["lunch"]', delivery_days='["monday"]', total_price=129000.0,
+        created_at=created_at, **columns
+    )
+    db.add(subscription)
+    db.commit()
+    return subscription
+
+def cohort(client, admin, plan: str, label: str) -> dict:
+    response = client.get(f"/dashboard/admin/analytics/cohorts?months=6&plan={plan}", headers=bearer(admin))
+    assert response.status_code == 200, response.text
+    return next(row for row in response.json()["cohorts"] if row["cohort"] == label)
+
+def test_churn_is_dated_by_cancellation_not_last_edit(client, db, admin, customer):
+    signup = months_ago(2)
+    add_subscription(db, customer, "royal", signup, is_active=True)
+    add_subscription(
+        db, customer, "royal", signup, is_active=False,
+        cancelled_at=months_ago(1), updated_at=datetime.now()
+    )
+
+    row = cohort(client, admin, "royal", signup.strftime("%Y-%m"))
+    assert row["size"] == 2
+    assert row["retained"] == [2, 1, 1]
+    assert row["churned"] == 1
+
+def test_deactivating_records_cancellation_once(client, db, customer):
+    subscription = add_subscription(db, customer, "protein", months_ago(1), is_active=True)
+    url = f"/subscriptions/{subscription.id}/deactivate"
+
+    assert client.put(url, headers=bearer(customer)).status_code == 200
+    db.refresh(subscription)
+    cancelled_at = subscription.cancelled_at
+    assert cancelled_at is not None
+
+    # Deactivating again must not move the churn date
+    assert client.put(url, headers=bearer(customer)).status_code == 200
+    db.refresh(subscription)
+    assert subscription.cancelled_at == cancelled_at
\ No newline at end of file
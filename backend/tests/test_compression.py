@@ -0,0 +1,37 @@
+from fastapi.testclient import TestClient
+from starlette.applications import Starlette
+from starlette.responses import PlainTextResponse, Response
+from starlette.routing import Route
+
+from app.compression import CompressionMiddleware
+
+def vary(response) -> list:
+    return [value.strip().lower() for value in response.headers.get("vary", "").split(",") if value.strip()]
+
+def make_client() -> TestClient:
+    app = Starlette(routes=[
+        Route("/small", lambda request: PlainTextResponse("ok")),
+        Route("/large", lambda request: PlainTextResponse("sehat " * 500)),
+        Route("/cached", lambda request: PlainTextResponse("sehat " * 500, headers={"Vary": "Accept-Encoding"})),
+        Route("/image", lambda request: Response(b"\x89PNG" * 500, media_type="image/png")),
+    ])
+    app.add_middleware(CompressionMiddleware)
+    return TestClient(app)
+
+def test_compressible_responses_always_vary_on_encoding():
+    client = make_client()
+    for path, accept_encoding, encoded in (
+        ("/large", "gzip", True),
+        ("/large", "identity", False),
+        ("/small", "gzip", False),
+        ("/small", "identity", False),
+    ):
+        response = client.get(path, headers={"Accept-Encoding": accept_encoding})
+        assert (response.headers.get("content-encoding") == "gzip") == encoded, (path, accept_encoding)
+        assert vary(response) == ["accept-encoding"], (path, accept_encoding)
+
+def test_vary_is_not_repeated_or_added_to_other_types():
+    client = make_client()
+    for accept_encoding in ("gzip", "identity"):
+        assert vary(client.get("/cached", headers={"Accept-Encoding": accept_encoding})) == ["accept-encoding"]
+        assert vary(client.get("/image", headers={"Accept-Encoding": accept_encoding})) == []
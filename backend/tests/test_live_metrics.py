@@ -0,0 +1,150 @@
+import asyncio
+import json
+import random
+from datetime import date, timedelta
+
+import pytest
+
+from app import live_metrics
+from app.live_metrics import DashboardCounters
+from app.models import Subscription
+from app.routes import dashboard, subscriptions
+
+from conftest import bearer, make_user
+
+# Open /admin/live streams in the larger of the two runs
+SUBSCRIBERS = 300
+
+@pytest.fixture
+def fresh_counters(monkeypatch):
+    """Returns a function that wires a new counter set into every module using it"""
+    def install() -> DashboardCounters:
+        counters = DashboardCounters()
+        for module in (live_metrics, subscriptions, dashboard):
+            monkeypatch.setattr(module, "dashboard_counters", counters)
+        return counters
+    return install
+
+class LiveStreams:
+    """/admin/live streams opened through the endpoint, on a private event loop"""
+
+    def __init__(self, admin, db, count: int):
+        self.loop = asyncio.new_event_loop()
+        self.streams = self.loop.run_until_complete(self._open(admin, db, count))
+
+    async def _open(self, admin, db, count: int) -> list:
+        responses = [await dashboard.stream_dashboard_counters(current_admin=admin, db=db) for _ in range(count)]
+        return [response.body_iterator for response in responses]
+
+    def next_events(self) -> list:
+        """The next counters event of every stream, skipping keep-alive comments"""
+        async def next_event(stream):
+            while True:
+                chunk = await asyncio.wait_for(stream.__anext__(), timeout=5)
+                if chunk.startswith("event: counters"):
+                    return json.loads(chunk.split("data: ", 1)[1])
+
+        async def next_events():
+            return await asyncio.gather(*(next_event(stream) for stream in self.streams))
+
+        return self.loop.run_until_complete(next_events())
+
+    def close(self):
+        async def close_all():
+            await asyncio.gather(*(stream.aclose() for stream in self.streams))
+
+        self.loop.run_until_complete(close_all())
+        self.loop.close()
+
+def recount() -> dict:
+    # A separate instance, so the reference does not count as a load of the one under test
+    return DashboardCounters()._load()
+
+def drive_random_writes(client, headers: dict, streams: LiveStreams, seed: int) -> int:
+    """Write through the routes; every change must reach every stream. Returns events per stream."""
+    randomness = random.Random(seed)
+    created = []
+    expected = recount()
+    events = 0
+
+    for _ in range(40):
+        action = randomness.choice(["create", "create", "pause", "resume", "deactivate"])
+        if action == "create" or not created:
+            response = client.post("/subscriptions/", headers=headers, json={
+                "name": "Budi Santoso", "phone": "081234567890",
+                "plan": randomness.choice(["diet", "protein", "royal"]),
+                "meal_types": ["lunch"], "delivery_days": ["monday", "thursday"]
+            })
+            assert response.status_code == 200, response.text
+            created.append(response.json()["subscription"]["id"])
+        elif action == "pause":
+            start = date.today() + timedelta(days=randomness.choice([0, 0, 3]))
+            client.put(f"/subscriptions/{randomness.choice(created)}/pause", headers=headers, json={
+                "pause_start_date": start.isoformat(),
+                "pause_end_date": (start + timedelta(days=7)).isoformat()
+            })
+        else:
+            client.put(f"/subscriptions/{randomness.choice(created)}/{action}", headers=headers)
+
+        previous, expected = expected, recount()
+        if expected == pytest.approx(previous):
+            continue
+        received = streams.next_events()
+        events += 1
+        assert all(event == received[0] for event in received)
+        assert received[0]["counters"] == pytest.approx(expected)
+    return events
+
+def test_database_load_does_not_grow_with_subscribers(client, db, admin, fresh_counters):
+    headers = bearer(make_user(db, "live@example.com"))
+    loads, events = {}, {}
+
+    for count in (1, SUBSCRIBERS):
+        counters = fresh_counters()
+        streams = LiveStreams(admin, db, count)
+        try:
+            initial = streams.next_events()
+            assert all(event["counters"] == pytest.approx(recount()) for event in initial)
+            events[count] = drive_random_writes(client, headers, streams, seed=27)
+        finally:
+            streams.close()
+        assert counters.subscriber_count == 0
+        loads[count] = counters.db_loads
+
+    assert events[1] > 0 and events[SUBSCRIBERS] > 0
+    # One load serves every stream; writes update the counters in memory
+    assert loads == {1: 1, SUBSCRIBERS: 1}
+
+def test_resync_picks_up_changes_made_outside_the_routes(client, db, admin, fresh_counters, monkeypatch):
+    user = make_user(db, "live@example.com")
+    counters = fresh_counters()
+    # Each heartbeat calls current(), which recounts once the resync interval is up
+    monkeypatch.setattr(dashboard, "LIVE_HEARTBEAT_SECONDS", 0.01)
+    streams = LiveStreams(admin, db, 20)
+    try:
+        before = streams.next_events()[0]["counters"]
+
+        # A pause window that starts on its own moves a subscription from
+        # active to paused without any write passing through apply()
+        db.add(Subscription(
+            user_id=user.id, name="Budi Santoso", phone="081234567890", plan="diet",
+            meal_types='["lunch"]', delivery_days='["monday"]', total_price=129000.0,
+            pause_start_date=date.today() - timedelta(days=1), pause_end_date=date.today() + timedelta(days=1)
+        ))
+        db.commit()
+
+        # Within RESYNC_SECONDS the heartbeats are served from memory
+        streams.loop.run_until_complete(asyncio.sleep(0.1))
+        assert counters.db_loads == 1
+
+        counters._synced_at -= live_metrics.RESYNC_SECONDS
+        received = streams.next_events()
+    finally:
+        streams.close()
+
+    assert counters.db_loads == 2
+    for event in received:
+        assert event["counters"] == pytest.approx(recount())
+        assert event["counters"]["paused_subscriptions"] == before["paused_subscriptions"] + 1
+        assert event["deltas"]["paused_subscriptions"] == 1
+        assert event["deltas"]["new_today"] == 1
@@ -0,0 +1,150 @@
+import gzip
+import json
+import os
+from datetime import date, datetime, timedelta
+
+from app.catalog import bump_version_on_connection, read_catalog_version
+from app.database import engine
+from app.forecasting import DAY_NAMES
+from app.manifests import MANIFEST_DIR, MANIFEST_VERSION, manifest_snapshots, stream_manifest
+from app.models import Subscription
+
+from conftest import bearer
+
+def delivering_on(user, day: date, name: str) -> Subscription:
+    return Subscription(
+        user_id=user.id, name=name, phone="081234567890", plan="diet",
+        meal_types='["lunch"]', delivery_days=json.dumps([DAY_NAMES[day.weekday()]]), total_price=129000.0
+    )
+
+def manifest_names(client, admin, day: date) -> set:
+    response = client.get(f"/dashboard/admin/manifest?delivery_date={day}&format=ndjson", headers=bearer(admin))
+    assert response.status_code == 200, response.text
+    return {json.loads(line)["name"] for line in response.text.splitlines()}
+
+def test_subscription_writes_bump_the_shared_version(client, db, admin, customer):
+    day = date.today() + timedelta(days=14)
+    manifest_snapshots.ensure(day)
+    version = read_catalog_version(db, MANIFEST_VERSION)
+    assert manifest_snapshots.current_path(db, day, "ndjson") is not None
+
+    db.add(delivering_on(customer, day, "Dewi Lestari"))
+    db.commit()
+
+    assert read_catalog_version(db, MANIFEST_VERSION) == version + 1
+    assert manifest_snapshots.current_path(db, day, "ndjson") is None
+    assert "Dewi Lestari" in manifest_names(client, admin, day)
+
+def test_only_writes_that_can_change_a_manifest_bump_the_version(db, customer):
+    today = date.today()
+    subscription = delivering_on(customer, today, "Wayan Sudarsana")
+    db.add(subscription)
+    db.commit()
+
+    def bumps(change, load: bool = True) -> bool:
+        version = read_catalog_version(db, MANIFEST_VERSION)
+        if load:
+            # Like a route, which queries the subscription before changing it
+            db.refresh(subscription)
+        change()
+        db.commit()
+        return read_catalog_version(db, MANIFEST_VERSION) != version
+
+    def set_pause(start, end):
+        subscription.pause_start_date, subscription.pause_end_date = start, end
+
+    assert not bumps(lambda: setattr(subscription, "total_price", 150000.0))
+    assert not bumps(lambda: set_pause(today - timedelta(days=20), today - timedelta(days=10)))
+    assert bumps(lambda: set_pause(today + timedelta(days=3), today + timedelta(days=10)))
+    # Moving a future pause into the past puts the subscription back on those days
+    assert bumps(lambda: set_pause(today - timedelta(days=30), today - timedelta(days=25)))
+    assert bumps(lambda: setattr(subscription, "meal_types", '["lunch", "dinner"]'))
+
+    def cancel():
+        subscription.is_active, subscription.cancelled_at = False, datetime.now()
+
+    assert bumps(cancel)
+
+    # Old window not loaded: cannot tell, so it bumps
+    db.expire(subscription, ["pause_start_date", "pause_end_date"])
+    assert bumps(lambda: set_pause(today - timedelta(days=40), today - timedelta(days=35)), load=False)
+
+def test_snapshot_goes_stale_when_another_worker_writes(client, db, admin, customer):
+    day = date.today() + timedelta(days=15)
+    manifest_snapshots.ensure(day)
+    stale = manifest_snapshots.current_path(db, day, "csv")
+    assert stale is not None
+
+    # What the mapper event does for a subscription write in another worker process
+    with engine.begin() as connection:
+        bump_version_on_connection(connection, MANIFEST_VERSION)
+    db.expire_all()
+    assert manifest_snapshots.current_path(db, day, "csv") is None
+
+    # Rebuilding replaces the superseded file
+    manifest_snapshots.ensure(day)
+    assert manifest_snapshots.current_path(db, day, "csv") is not None
+    assert not os.path.exists(stale)
+    assert len([name for name in os.listdir(MANIFEST_DIR) if name.startswith(f"manifest-{day}-") and name.endswith(".csv")]) == 1
+
+def test_snapshots_are_served_precompressed(client, db, admin, customer):
+    day = date.today() + timedelta(days=16)
+    db.add(delivering_on(customer, day, "Agus Pratama"))
+    db.commit()
+    manifest_snapshots.ensure(day)
+    path = manifest_snapshots.current_path(db, day, "csv")
+    url = f"/dashboard/admin/manifest?delivery_date={day}&format=csv"
+    expected = "".join(stream_manifest(day, "csv")).encode()
+
+    response = client.get(url, headers={**bearer(admin), "Accept-Encoding": "gzip"})
+    assert response.status_code == 200
+    assert response.headers["content-encoding"] == "gzip"
+    # The stored file as-is: compressing on the fly would drop the length
+    assert response.headers["content-length"] == str(os.path.getsize(f"{path}.gz"))
+    assert gzip.decompress(open(f"{path}.gz", "rb").read()) == expected
+    assert response.content == expected
+
+    response = client.get(url, headers={**bearer(admin), "Accept-Encoding": "identity"})
+    assert "content-encoding" not in response.headers
+    assert response.headers["content-length"] == str(len(expected))
+    assert "Accept-Encoding" in response.headers["vary"]
+    assert response.content == expected
+
+def test_snapshot_removed_by_a_newer_build_is_still_served(client, db, admin, customer, monkeypatch):
+    day = date.today() + timedelta(days=17)
+    db.add(delivering_on(customer, day, "Putri Anggraini"))
+    db.commit()
+    manifest_snapshots.ensure(day)
+    expected = "".join(stream_manifest(day, "csv")).encode()
+    url = f"/dashboard/admin/manifest?delivery_date={day}&format=csv"
+    current_path, open_current = manifest_snapshots.current_path, manifest_snapshots.open_current
+
+    def remove_snapshot_files(day_to_remove):
+        for name in os.listdir(MANIFEST_DIR):
+            if name.startswith(f"manifest-{day_to_remove}-"):
+                os.remove(os.path.join(MANIFEST_DIR, name))
+
+    # Removed after the route found it current but before it was opened
+    def removed_after_check(session, snapshot_day, fmt):
+        path = current_path(session, snapshot_day, fmt)
+        remove_snapshot_files(snapshot_day)
+        return path
+
+    monkeypatch.setattr(manifest_snapshots, "current_path", removed_after_check)
+    response = client.get(url, headers=bearer(admin))
+    assert response.status_code == 200
+    assert response.content == expected
+    monkeypatch.undo()
+
+    # Removed after it was opened, while the response is being sent
+    manifest_snapshots.ensure(day)
+
+    def removed_after_open(session, snapshot_day, fmt, accept_encoding):
+        snapshot = open_current(session, snapshot_day, fmt, accept_encoding)
+        remove_snapshot_files(snapshot_day)
+        return snapshot
+
+    monkeypatch.setattr(manifest_snapshots, "open_current", removed_after_open)
+    response = client.get(url, headers=bearer(admin))
+    assert response.status_code == 200
+    assert response.content == expected
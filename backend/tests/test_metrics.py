@@ -0,0 +1,21 @@
+from app import auth
+
+from conftest import bearer
+
+def test_metrics_need_credentials(client, customer):
+    assert client.get("/metrics").status_code in (401, 403)
+    assert client.get("/metrics", headers={"Authorization": "Bearer not-a-token"}).status_code == 401
+    assert client.get("/metrics", headers=bearer(customer)).status_code == 403
+
+def test_admins_can_read_metrics(client, admin):
+    response = client.get("/metrics", headers=bearer(admin))
+    assert response.status_code == 200
+    assert "http_requests_total" in response.text
+
+def test_scrape_token(client, monkeypatch):
+    monkeypatch.setattr(auth, "METRICS_TOKEN", "scrape-secret")
+    assert client.get("/metrics", headers={"Authorization": "Bearer scrape-secret"}).status_code == 200
+    assert client.get("/metrics", headers={"Authorization": "Bearer scrape-secreT"}).status_code == 401
+
+    monkeypatch.setattr(auth, "METRICS_TOKEN", "")
+    assert client.get("/metrics", headers={"Authorization": "Bearer "}).status_code in (401, 403)
\ No newline at end of file
@@ -0,0 +1,30 @@
+from app import models
+from app.moderation import ModerationWorker
+
+from conftest import bearer
+
+def test_rejection_during_scoring_leaves_no_orphan_score(client, db, admin, customer):
+    ids = []
+    for message in ("Sayurnya segar, pengirimannya cepat", "Menu diet-nya bikin kenyang sampai sore"):
+        response = client.post("/testimonials/", headers=bearer(customer), json={
+            "name": "Rina Wijaya", "message": message, "rating": 5
+        })
+        assert response.status_code == 200, response.text
+        ids.append(response.json()["testimonial"]["id"])
+    rejected, kept = ids
+
+    worker = ModerationWorker()
+    score_batch = worker._score_batch
+
+    def reject_while_scoring(session, testimonials):
+        rows = score_batch(session, testimonials)
+        assert client.put(f"/testimonials/{rejected}/reject", headers=bearer(admin)).status_code == 200
+        return rows
+
+    worker._score_batch = reject_while_scoring
+    assert worker.score_pending() > 0
+
+    db.expire_all()
+    assert db.get(models.Testimonial, rejected) is None
+    assert db.get(models.TestimonialScore, rejected) is None
+    assert db.get(models.TestimonialScore, kept) is not None
@@ -0,0 +1,106 @@
+import json
+from datetime import date, datetime, timedelta
+
+from app import forecasting
+from app.models import Subscription
+
+from conftest import bearer
+
+DAYS = ["monday", "tuesday", "wednesday", "thursday", "friday", "saturday", "sunday"]
+
+def expected_portions(db, day: date) -> dict:
+    """Portions on a day, counted subscription by subscription"""
+    portions = {}
+    for subscription in db.query(Subscription).all():
+        if subscription.created_at.date() > day:
+            continue
+        if not subscription.is_active and subscription.cancelled_at.date() <= day:
+            continue
+        pause_start, pause_end = subscription.pause_start_date, subscription.pause_end_date
+        if pause_start and pause_start <= day and (pause_end is None or day <= pause_end):
+            continue
+        if DAYS[day.weekday()] not in json.loads(subscription.delivery_days):
+            continue
+        for meal_type in json.loads(subscription.meal_types):
+            key = (subscription.plan, meal_type)
+            portions[key] = portions.get(key, 0) + 1
+    return portions
+
+def forecast(client, admin, start: date, end: date) -> dict:
+    response = client.get(
+        f"/dashboard/admin/forecast/production?start_date={start}&end_date={end}", headers=bearer(admin)
+    )
+    assert response.status_code == 200, response.text
+    return {
+        date.fromisoformat(day["date"]): {
+            (plan, meal_type): count
+            for plan, meals in day["portions"].items() for meal_type, count in meals.items() if count
+        }
+        for day in response.json()["days"]
+    }
+
+def add_subscription(db, user, created_days_ago: int, **columns):
+    now = datetime.utcnow()
+    db.add(Subscription(
+        user_id=user.id, name="Budi Santoso", phone="081234567890",
+        plan=columns.pop("plan", "diet"), meal_types=columns.pop("meal_types", '["breakfast", "lunch"]'),
+        delivery_days=columns.pop("delivery_days", json.dumps(DAYS)), total_price=516000.0,
+        created_at=now - timedelta(days=created_days_ago), **columns
+    ))
+    db.commit()
+
+def test_production_counts_only_subscriptions_delivering_that_day(client, db, admin, customer):
+    today = date.today()
+    now = datetime.utcnow()
+    add_subscription(db, customer, 20)
+    add_subscription(db, customer, 12, plan="royal", is_active=False, cancelled_at=now - timedelta(days=4))
+    add_subscription(db, customer, 9, plan="protein", delivery_days='["monday", "thursday"]')
+    add_subscription(db, customer, 15, pause_start_date=today - timedelta(days=6))
+    add_subscription(db, customer, 15, meal_types='["dinner"]', pause_start_date=today - timedelta(days=8),
+                     pause_end_date=today - timedelta(days=3))
+
+    days = forecast(client, admin, today - timedelta(days=60), today + timedelta(days=10))
+    for day, portions in days.items():
+        assert portions == expected_portions(db, day), day
+
+    # No made-up history before the first subscription
+    first_day = min(subscription.created_at for subscription in db.query(Subscription).all()).date()
+    assert min(forecast(client, admin, first_day - timedelta(days=30), first_day + timedelta(days=2))) == first_day
+    assert forecast(client, admin, first_day - timedelta(days=30), first_day - timedelta(days=1)) == {}
+
+def test_cached_days_follow_subscription_writes(client, db, admin, customer, monkeypatch):
+    today = date.today()
+    yesterday = today - timedelta(days=1)
+    computed = []
+    compute = forecasting._compute_production
+    monkeypatch.setattr(
+        forecasting, "_compute_production",
+        lambda db, start, end: computed.append((start, end)) or compute(db, start, end)
+    )
+    before = forecast(client, admin, yesterday, today)
+
+    # Nothing written since: both days come from the cache
+    computed.clear()
+    assert forecast(client, admin, yesterday, today) == before
+    assert computed == []
+
+    # A price change leaves every manifest as it was
+    subscription = db.query(Subscription).filter(Subscription.is_active == True).first()
+    subscription.total_price += 1000
+    db.commit()
+    assert forecast(client, admin, yesterday, today) == before
+    assert computed == []
+
+    # Created today: shows up today, while yesterday stays as it was
+    add_subscription(db, customer, 0, plan="royal", meal_types='["dinner"]')
+    after = forecast(client, admin, yesterday, today)
+    assert computed == [(today, today)]
+    assert after[yesterday] == before[yesterday] == expected_portions(db, yesterday)
+    assert after[today] == expected_portions(db, today)
+    assert after[today].get(("royal", "dinner"), 0) == before[today].get(("royal", "dinner"), 0) + 1
+
+    # Pausing from today on takes it back out
+    added = db.query(Subscription).order_by(Subscription.id.desc()).first()
+    added.pause_start_date = today
+    db.commit()
+    assert forecast(client, admin, yesterday, today)[today] == before[today] == expected_portions(db, today)
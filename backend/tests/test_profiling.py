@@ -0,0 +1,14 @@
+from app.profiling import PROFILE_HEADER, create_profiling_token
+
+from conftest import bearer
+
+def test_profiling_token_is_not_a_login_session(client, admin):
+    token = create_profiling_token(admin.id)
+    response = client.get("/auth/users", headers={"Authorization": f"Bearer {token}"})
+    assert response.status_code == 401
+
+def test_profiling_token_profiles_requests(client, admin):
+    token = create_profiling_token(admin.id)
+    response = client.get("/auth/users", headers={**bearer(admin), PROFILE_HEADER.decode(): token})
+    assert response.status_code == 200
+    assert "x-profile-id" in response.headers
@@ -0,0 +1,91 @@
+import os
+import signal
+import socket
+import sqlite3
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.request
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+def child_pids(pid: int) -> set:
+    children = set()
+    for entry in os.listdir("/proc"):
+        if entry.isdigit():
+            try:
+                with open(f"/proc/{entry}/stat") as stat:
+                    # The parent pid follows the parenthesised command name
+                    if int(stat.read().rsplit(")", 1)[1].split()[1]) == pid:
+                        children.add(int(entry))
+            except (OSError, IndexError, ValueError):
+                pass
+    return children
+
+def start_production(workdir: str, port: int, moderation_worker: str) -> subprocess.Popen:
+    env = dict(os.environ, HOST="127.0.0.1", PORT=str(port), LOG_LEVEL="warning", MODERATION_WORKER=moderation_worker)
+    server = subprocess.Popen(
+        [sys.executable, os.path.join(BACKEND_DIR, "run.py"), "--production", "--workers", "2"],
+        cwd=workdir, env=env, stdout=subprocess.PIPE, stderr=subprocess.STDOUT
+    )
+    deadline = time.monotonic() + 30
+    while True:
+        assert server.poll() is None, server.stdout.read().decode()
+        try:
+            with urllib.request.urlopen(f"http://127.0.0.1:{port}/health", timeout=1) as response:
+                assert response.status == 200
+                return server
+        except OSError:
+            assert time.monotonic() < deadline, "API did not start"
+            time.sleep(0.2)
+
+def stop(server: subprocess.Popen) -> str:
+    server.send_signal(signal.SIGTERM)
+    try:
+        output, _ = server.communicate(timeout=30)
+    except subprocess.TimeoutExpired:
+        server.kill()
+        raise
+    assert server.returncode == 0
+    return output.decode()
+
+def test_production_mode_serves_and_stops_on_sigterm():
+    server = start_production(tempfile.mkdtemp(prefix="sea-run-"), free_port(), "external")
+    try:
+        assert len(child_pids(server.pid)) == 2
+    finally:
+        stop(server)
+
+def test_one_moderation_process_scores_for_all_workers():
+    workdir = tempfile.mkdtemp(prefix="sea-run-")
+    server = start_production(workdir, free_port(), "thread")
+    try:
+        # Two web workers and one moderation process
+        assert len(child_pids(server.pid)) == 3
+        with sqlite3.connect(os.path.join(workdir, "sea_catering.db")) as connection:
+            connection.execute(
+                "INSERT INTO users (full_name, email, hashed_password, is_active, is_admin) "
+                "VALUES ('Budi Santoso', 'run@example.com', 'x', 1, 0)"
+            )
+            connection.executemany(
+                "INSERT INTO testimonials (user_id, name, message, rating, is_approved, created_at) "
+                "VALUES (1, 'Budi Santoso', ?, 5, 0, CURRENT_TIMESTAMP)",
+                [(f"Makanannya enak sekali #{number}",) for number in range(50)]
+            )
+        deadline = time.monotonic() + 15
+        while True:
+            with sqlite3.connect(os.path.join(workdir, "sea_catering.db")) as connection:
+                scored = connection.execute("SELECT COUNT(*) FROM testimonial_scores").fetchone()[0]
+            if scored == 50:
+                break
+            assert time.monotonic() < deadline, f"{scored} of 50 testimonials scored"
+            time.sleep(0.2)
+    finally:
+        output = stop(server)
+    assert "Moderation worker failed" not in output
@@ -0,0 +1,40 @@
+from app.catalog import bump_catalog_version
+from app.routes.testimonials import FEED_CACHE_GROUP
+from app import models, testimonial_stats
+
+def feed_ids(response) -> set:
+    assert response.status_code == 200, response.text
+    return {testimonial["id"] for testimonial in response.json()["data"]}
+
+def test_feed_cache_follows_approvals_made_by_another_worker(client, db, customer):
+    testimonial = models.Testimonial(
+        user_id=customer.id, name="Budi Santoso", message="Makanannya enak sekali, selalu tepat waktu.",
+        rating=5, is_approved=False
+    )
+    db.add(testimonial)
+    testimonial_stats.apply_stats_delta(db, None, testimonial_stats.testimonial_contribution(False, testimonial.rating))
+    db.commit()
+
+    first = client.get("/testimonials/?limit=100")
+    assert testimonial.id not in feed_ids(first)
+    etag = first.headers["etag"]
+    assert client.get("/testimonials/?limit=100", headers={"If-None-Match": etag}).status_code == 304
+
+    # Approved in another process: this process's response cache is never told
+    testimonial.is_approved = True
+    testimonial_stats.apply_stats_delta(
+        db,
+        testimonial_stats.testimonial_contribution(False, testimonial.rating),
+        testimonial_stats.testimonial_contribution(True, testimonial.rating)
+    )
+    bump_catalog_version(db, FEED_CACHE_GROUP)
+    db.commit()
+
+    response = client.get("/testimonials/?limit=100", headers={"If-None-Match": etag})
+    assert testimonial.id in feed_ids(response)
+    assert response.headers["etag"] != etag
+
+def test_feed_paging_is_bounded(client):
+    for query in ("limit=-1", "limit=0", "limit=101", "skip=-1"):
+        assert client.get(f"/testimonials/?{query}").status_code == 422, query
+    assert len(client.get("/testimonials/").json()["data"]) <= 10
@@ -0,0 +1,40 @@
+import random
+
+from app import models
+from app.testimonial_stats import COUNTER_COLUMNS, STATS_ID, recount_testimonial_stats
+from rebuild_stats import rebuild_stats
+
+from conftest import bearer
+
+def stored_stats(db) -> dict:
+    db.expire_all()
+    stats = db.get(models.TestimonialStats, STATS_ID)
+    return {column: getattr(stats, column) for column in COUNTER_COLUMNS}
+
+def test_counters_match_recount_after_random_moderation(client, db, admin, customer):
+    randomness = random.Random(32)
+    admin_headers, customer_headers = bearer(admin), bearer(customer)
+    ids = []
+
+    for step in range(120):
+        action = randomness.choice(["create", "create", "approve", "reject", "bulk_approve", "bulk_reject"])
+        if action == "create" or not ids:
+            response = client.post("/testimonials/", headers=customer_headers, json={
+                "name": "Budi Santoso", "message": f"Makanannya enak sekali #{step}",
+                "rating": randomness.randint(1, 5)
+            })
+            assert response.status_code == 200, response.text
+            ids.append(response.json()["testimonial"]["id"])
+        elif action in ("approve", "reject"):
+            # Includes repeats and ids that were already rejected
+            testimonial_id = randomness.choice(ids)
+            client.put(f"/testimonials/{testimonial_id}/{action}", headers=admin_headers)
+        else:
+            chosen = randomness.sample(ids, min(len(ids), randomness.randint(1, 6)))
+            route = "approve" if action == "bulk_approve" else "reject"
+            response = client.put(f"/testimonials/admin/bulk/{route}", headers=admin_headers, json={"ids": chosen})
+            assert response.status_code == 200, response.text
+
+        assert stored_stats(db) == recount_testimonial_stats(db), f"drift after step {step} ({action})"
+
+    assert rebuild_stats(check_only=True)
\ No newline at end of file
@@ -0,0 +1,37 @@
+from conftest import bearer
+
+def messages(response) -> dict:
+    assert response.status_code == 422, response.text
+    return {error["loc"][-1]: error["msg"] for error in response.json()["detail"]}
+
+def test_subscription_errors_keep_the_api_wording(client, customer):
+    response = client.post("/subscriptions/", headers=bearer(customer), json={
+        "name": "B4di!", "phone": "0812345678", "plan": "gold",
+        "meal_types": [], "delivery_days": ["monday", "funday"], "allergies": "a" * 600
+    })
+    assert messages(response) == {
+        "name": "Value error, Name contains invalid characters",
+        "plan": "Value error, Plan must be one of: ['diet', 'protein', 'royal']",
+        "meal_types": "Value error, At least one meal type must be selected",
+        "delivery_days": "Value error, Invalid delivery day: funday",
+        "allergies": "Value error, Allergies field must be less than 500 characters"
+    }
+    days = next(error for error in response.json()["detail"] if error["loc"] == ["body", "delivery_days"])
+    assert days["input"] == ["monday", "funday"]
+
+def test_testimonial_and_registration_errors_keep_the_api_wording(client, customer, admin):
+    response = client.post("/testimonials/", headers=bearer(customer), json={"name": "B", "message": "short", "rating": 9})
+    assert messages(response) == {
+        "name": "Value error, Name must be at least 2 characters long",
+        "message": "Value error, Message must be at least 10 characters long",
+        "rating": "Value error, Rating must be between 1 and 5"
+    }
+
+    response = client.post("/auth/register", json={"full_name": "Budi 5antoso", "email": "budi@example.com", "password": "Ab1!"})
+    assert messages(response) == {
+        "full_name": "Value error, Full name contains invalid characters",
+        "password": "Value error, Password must be at least 8 characters long"
+    }
+
+    response = client.put("/testimonials/admin/bulk/approve", headers=bearer(admin), json={"rating": 0})
+    assert messages(response) == {"rating": "Value error, Rating must be between 1 and 5"}
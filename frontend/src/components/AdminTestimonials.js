@@ -8,6 +8,8 @@ const AdminTestimonials = ({ onClose }) => {
   const [loading, setLoading] = useState(true);
   const [error, setError] = useState(null);
   const [filter, setFilter] = useState('all'); // all, pending, approved, rejected
+  const [bulkRating, setBulkRating] = useState(''); // '' for any rating
+  const [bulkRunning, setBulkRunning] = useState(false);
 
   useEffect(() => {
     fetchTestimonials();
@@ -48,6 +50,41 @@ const AdminTestimonials = ({ onClose }) => {
     }
   };
 
+  const handleBulk = async (approve) => {
+    const action = approve ? 'approve' : 'reject';
+    const ratingText = bulkRating ? ` with a ${bulkRating}-star rating` : '';
+    if (!window.confirm(`Are you sure you want to ${action} all pending testimonials${ratingText}?`)) {
+      return;
+    }
+
+    // Testimonials submitted after the click are left for review
+    const selection = { created_before: new Date().toISOString() };
+    if (bulkRating) {
+      selection.rating = Number(bulkRating);
+    }
+
+    try {
+      setBulkRunning(true);
+      let processed = 0;
+      let remaining = 0;
+      // Each request handles a limited batch and reports how many more match
+      do {
+        const response = approve
+          ? await testimonialAPI.bulkApprove(selection)
+          : await testimonialAPI.bulkReject(selection);
+        processed += response.data.results.length;
+        remaining = response.data.remaining;
+      } while (remaining > 0);
+      fetchTestimonials();
+      alert(`${processed} testimonials ${approve ? 'approved' : 'rejected'} successfully!`);
+    } catch (err) {
+      fetchTestimonials();
+      alert(err.response?.data?.detail || `Failed to ${action} testimonials`);
+    } finally {
+      setBulkRunning(false);
+    }
+  };
+
   const renderStars = (rating) => {
     return Array.from({ length: 5 }, (_, index) => (
       <span 
@@ -115,6 +152,21 @@ const AdminTestimonials = ({ onClose }) => {
             <option value="rejected">Rejected</option>
           </select>
         </div>
+        <div className="bulk-controls">
+          <label>Bulk review pending:</label>
+          <select value={bulkRating} onChange={(e) => setBulkRating(e.target.value)} disabled={bulkRunning}>
+            <option value="">Any rating</option>
+            {[5, 4, 3, 2, 1].map((rating) => (
+              <option key={rating} value={rating}>{rating} stars</option>
+            ))}
+          </select>
+          <button className="btn-approve" onClick={() => handleBulk(true)} disabled={bulkRunning}>
+            Approve all
+          </button>
+          <button className="btn-reject" onClick={() => handleBulk(false)} disabled={bulkRunning}>
+            Reject all
+          </button>
+        </div>
         <div className="stats">
           <span className="stat-item">
             Total: {testimonials.length}
@@ -84,6 +84,9 @@ export const testimonialAPI = {
     api.get('/testimonials/admin/all', { params: { skip, limit } }),
   approve: (id) => api.put(`/testimonials/admin/${id}/approve`),
   reject: (id) => api.put(`/testimonials/admin/${id}/reject`),
+  // selection is { ids } or a filter on pending testimonials: { rating, created_before }
+  bulkApprove: (selection) => api.put('/testimonials/admin/bulk/approve', selection),
+  bulkReject: (selection) => api.put('/testimonials/admin/bulk/reject', selection),
 };
 
 // Meal Plans API calls